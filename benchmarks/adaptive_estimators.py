@@ -0,0 +1,130 @@
+"""Offline evaluation of the adaptive-layout displacement estimators.
+
+Replays recorded release points through every estimator and reports how many releases would have landed outside
+their intended key. Run from the repository root:
+
+    python -m benchmarks.adaptive_estimators touches.csv
+    python -m benchmarks.adaptive_estimators --synthetic 2000 --save touches.csv
+
+The input is a CSV file with the columns `stroke,key_group,x,y`. Each row is one release, where `x` and `y` are the
+release point in cm relative to the center of the intended key before any adaptive displacement. Rows are in stroke
+order; when a key group has several releases in one stroke, the last one is the one that updates the estimate, as in
+`KeyGroupWidget`.
+
+Only the per-key-group estimate is simulated; the averaging across key groups done by `AdaptiveTransformTable` and
+`MEAN_DEVIATION_FACTOR` is applied identically for every estimator and is left out.
+"""
+
+from argparse import ArgumentParser
+import csv
+from itertools import groupby
+import random
+
+from plover_touchscreen_stenotype.lib.keyboard_layout.DisplacementEstimator import DisplacementEstimator, DISPLACEMENT_ESTIMATORS
+
+
+Release = tuple[int, str, float, float]
+
+
+class _StaticEstimator(DisplacementEstimator):
+    """Baseline that never moves the keys"""
+
+    def estimate(self, current: tuple[float, float], observed: tuple[float, float]):
+        return current
+
+
+def read_releases(path: str) -> list[Release]:
+    with open(path, newline="") as file:
+        return [
+            (int(row["stroke"]), row["key_group"], float(row["x"]), float(row["y"]))
+            for row in csv.DictReader(file)
+        ]
+
+
+def write_releases(path: str, releases: list[Release]):
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(("stroke", "key_group", "x", "y"))
+        writer.writerows(releases)
+
+
+def synthetic_releases(n_strokes: int, *, seed: int=0) -> list[Release]:
+    """Generates releases from hands that drift slowly, with normal scatter and occasional stray touches."""
+
+    rng = random.Random(seed)
+    key_groups = tuple(f"group{i}" for i in range(8))
+    hand_positions = {key_group: [0., 0.] for key_group in key_groups}
+
+    releases: list[Release] = []
+    for stroke in range(n_strokes):
+        for key_group in key_groups:
+            position = hand_positions[key_group]
+            # Drift that tends back toward the keys' resting positions
+            position[0] = 0.99 * position[0] + rng.gauss(0, 0.05)
+            position[1] = 0.99 * position[1] + rng.gauss(0, 0.05)
+
+            if rng.random() > 0.4: continue
+
+            scatter = 1 if rng.random() < 0.05 else 0.35
+            releases.append((stroke, key_group, position[0] + rng.gauss(0, scatter), position[1] + rng.gauss(0, scatter)))
+
+    return releases
+
+
+def misstroke_rate(releases: list[Release], estimator_class: "type[DisplacementEstimator]", key_width: float, key_height: float):
+    estimators: dict[str, DisplacementEstimator] = {}
+    displacements: dict[str, tuple[float, float]] = {}
+
+    n_misses = 0
+
+    for _, stroke_releases in groupby(releases, key=lambda release: release[0]):
+        last_release_points: dict[str, tuple[float, float]] = {}
+
+        for _, key_group, x, y in stroke_releases:
+            current = displacements.get(key_group, (0., 0.))
+            if abs(x - current[0]) > key_width / 2 or abs(y - current[1]) > key_height / 2:
+                n_misses += 1
+
+            last_release_points[key_group] = (x, y)
+
+        for key_group, release_point in last_release_points.items():
+            if key_group not in estimators:
+                estimators[key_group] = estimator_class()
+            estimator = estimators[key_group]
+
+            current = displacements.get(key_group, (0., 0.))
+            displacements[key_group] = estimator.estimate(current, release_point)
+            estimator.commit(current, release_point)
+
+    return n_misses / len(releases) if releases else 0
+
+
+def main():
+    parser = ArgumentParser(description="Compares misstroke rates of the adaptive-layout displacement estimators")
+    parser.add_argument("path", nargs="?", help="CSV file of releases (stroke,key_group,x,y)")
+    parser.add_argument("--synthetic", type=int, metavar="N_STROKES", help="Generate releases instead of reading them")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="PATH", help="Write the generated releases to a CSV file")
+    parser.add_argument("--key-width", type=float, default=1.9, help="cm")
+    parser.add_argument("--key-height", type=float, default=2.1, help="cm")
+    args = parser.parse_args()
+
+    if args.synthetic is not None:
+        releases = synthetic_releases(args.synthetic, seed=args.seed)
+        if args.save is not None:
+            write_releases(args.save, releases)
+    elif args.path is not None:
+        releases = read_releases(args.path)
+    else:
+        parser.error("either a path or --synthetic is required")
+
+    estimator_classes: "dict[str, type[DisplacementEstimator]]" = {"Static": _StaticEstimator, **DISPLACEMENT_ESTIMATORS}
+
+    print(f"{len(releases)} releases")
+    for name, estimator_class in estimator_classes.items():
+        rate = misstroke_rate(releases, estimator_class, args.key_width, args.key_height)
+        print(f"{name:>16}: {rate:.2%} misstrokes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Import-time regression check for the plugin's entry points.
+
+Imports each module that `setup.cfg` registers with Plover in a fresh interpreter under `python -X importtime`, and
+reports its cumulative import time and which of the plugin's modules it loaded. The command and machine entry points
+should only load a small core; the GUI modules are loaded when the tool is opened. Run from the repository root:
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --repeat 10 --check
+
+With `--check`, exits with a nonzero status if an entry point imports any module it is not expected to.
+"""
+
+from argparse import ArgumentParser
+from statistics import median
+import subprocess
+import sys
+
+
+PACKAGE = "plover_touchscreen_stenotype"
+
+ENTRY_POINT_MODULES: dict[str, tuple[str, ...]] = {
+    # Entry point module: prefixes of modules it must not import
+    f"{PACKAGE}.commands": (
+        f"{PACKAGE}.Main",
+        f"{PACKAGE}.settings",
+        f"{PACKAGE}.widgets",
+        f"{PACKAGE}.lib",
+    ),
+    f"{PACKAGE}.NoneMachine": (
+        f"{PACKAGE}.Main",
+        f"{PACKAGE}.settings",
+        f"{PACKAGE}.widgets",
+        f"{PACKAGE}.lib",
+    ),
+    f"{PACKAGE}.Main": (
+        f"{PACKAGE}.widgets.SettingsDialog",
+        f"{PACKAGE}.widgets.FloatInput",
+        f"{PACKAGE}.widgets.keyboard",
+        f"{PACKAGE}.widgets.joysticks",
+        f"{PACKAGE}.lib.keyboard_layout.descriptors.",
+        f"{PACKAGE}.lib.joystick_layout",
+    ),
+}
+
+
+def import_times(module_name: str) -> dict[str, int]:
+    """Imports `module_name` in a new interpreter.
+
+    :returns: Cumulative import time in µs of every module that was imported, by module name
+    """
+
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"importing {module_name} failed:\n{process.stderr}")
+
+    times: dict[str, int] = {}
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:"): continue
+
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if not cumulative.strip().isdigit(): continue  # Header
+
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = ArgumentParser(description="Measures the import time of the plugin's entry points")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of fresh interpreters per entry point")
+    parser.add_argument("--check", action="store_true", help="Fail if an entry point imports modules it should not")
+    args = parser.parse_args()
+
+    n_violations = 0
+
+    for module_name, forbidden_prefixes in ENTRY_POINT_MODULES.items():
+        runs = [import_times(module_name) for _ in range(args.repeat)]
+
+        plugin_modules = sorted(name for name in runs[0] if name.startswith(PACKAGE))
+        violations = [name for name in plugin_modules if name.startswith(forbidden_prefixes)]
+        n_violations += len(violations)
+
+        total_ms = median(times[module_name] for times in runs) / 1000
+        print(f"{module_name}: {total_ms:.1f} ms (median of {args.repeat}), {len(plugin_modules)} plugin modules, {len(runs[0])} modules total")
+        for name in violations:
+            print(f"    unexpected import: {name}")
+
+    if args.check and n_violations > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
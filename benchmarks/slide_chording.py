@@ -0,0 +1,236 @@
+"""Measures how accurately and quickly keys are added to strokes made with sliding fingers.
+
+Generates synthetic strokes on a grid of keys: each finger lands on a key, slides in a straight line (easing in and
+out) to another key, rests there for a moment and is lifted. The intended stroke is the keys each finger lands and
+finishes on; any key passed over on the way is extra. Every stroke is run through the default mode, which adds every
+key a touch passes over, and through the `SlideFilter` used by "Skip keys that sliding fingers pass over". Reports the
+share of strokes that came out exactly as intended, the number of extra keys per stroke, how long after a finger
+arrived on its final key that key was added, and the time spent per touch point.
+
+Strokes are run twice: once with resting fingers still reported every sample, and once with resting fingers not
+reported at all until they are lifted, as many touchscreens do. The keyboard commits keys that a silent finger has
+dwelled on with a timer, which is simulated here at the deadlines given by the filter; the filter is also run without
+it for comparison. Run from the repository root:
+
+    python -m benchmarks.slide_chording
+    python -m benchmarks.slide_chording --strokes 2000 --dwell-time 100 --max-speed 4
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from random import Random
+from statistics import mean, median
+import math
+import time
+
+from plover_touchscreen_stenotype.lib.slide_filter import SlideFilter, SLIDE_DWELL_TIME, SLIDE_MAX_SPEED
+
+
+KEY_SIZE = 1.3
+"""cm"""
+N_ROWS = 3
+N_COLUMNS = 10
+
+SAMPLE_INTERVAL = 1000 / 120
+"""ms between touch points, as reported by a 120 Hz touchscreen"""
+POSITION_NOISE = 0.02
+"""cm"""
+
+
+@dataclass
+class Sample:
+    touch_id: int
+    timestamp: float
+    x: float
+    y: float
+    released: bool
+
+@dataclass
+class SyntheticStroke:
+    samples: list[Sample]
+    intended_keys: set[int]
+    arrival_times: dict[int, float]
+    """Time each touch reached its final key, by touch id"""
+    final_keys: dict[int, int]
+
+
+def key_at(x: float, y: float) -> "int | None":
+    column = math.floor(x / KEY_SIZE)
+    row = math.floor(y / KEY_SIZE)
+    if not (0 <= column < N_COLUMNS and 0 <= row < N_ROWS):
+        return None
+    return row * N_COLUMNS + column
+
+def key_center(key: int):
+    row, column = divmod(key, N_COLUMNS)
+    return (column + 0.5) * KEY_SIZE, (row + 0.5) * KEY_SIZE
+
+
+def generate_stroke(random: Random, report_resting: bool=True) -> SyntheticStroke:
+    """
+        :param report_resting: Whether to keep sampling fingers that have stopped moving. If not, a resting finger
+            is next reported when it is lifted.
+    """
+
+    n_fingers = random.randint(1, 4)
+    start_keys = random.sample(range(N_ROWS * N_COLUMNS), n_fingers)
+
+    tracks: list[list[Sample]] = []
+    intended_keys: set[int] = set()
+    arrival_times: dict[int, float] = {}
+    final_keys: dict[int, int] = {}
+
+    for touch_id, start_key in enumerate(start_keys):
+        start_row, start_column = divmod(start_key, N_COLUMNS)
+        end_row = min(max(start_row + random.randint(-1, 1), 0), N_ROWS - 1)
+        end_column = min(max(start_column + random.choice((-3, -2, -1, 1, 2, 3)), 0), N_COLUMNS - 1)
+        end_key = end_row * N_COLUMNS + end_column
+
+        start_x, start_y = key_center(start_key)
+        end_x, end_y = key_center(end_key)
+        start_x += random.uniform(-0.3, 0.3) * KEY_SIZE
+        start_y += random.uniform(-0.3, 0.3) * KEY_SIZE
+        end_x += random.uniform(-0.3, 0.3) * KEY_SIZE
+        end_y += random.uniform(-0.3, 0.3) * KEY_SIZE
+
+        start_time = random.uniform(0, 40)
+        slide_time = math.hypot(end_x - start_x, end_y - start_y) / random.uniform(0.01, 0.04) # 10 to 40 cm/s
+        rest_time = random.uniform(60, 200)
+
+        intended_keys.update((start_key, end_key))
+        final_keys[touch_id] = end_key
+
+        track: list[Sample] = []
+        timestamp = start_time
+        while True:
+            progress = min((timestamp - start_time) / slide_time, 1)
+            eased = progress * progress * (3 - 2 * progress)
+            x = start_x + (end_x - start_x) * eased + random.gauss(0, POSITION_NOISE)
+            y = start_y + (end_y - start_y) * eased + random.gauss(0, POSITION_NOISE)
+
+            if touch_id not in arrival_times and key_at(x, y) == end_key and progress > 0.5:
+                arrival_times[touch_id] = timestamp
+
+            released = timestamp >= start_time + slide_time + rest_time
+            track.append(Sample(touch_id, timestamp, x, y, released))
+            if released: break
+
+            timestamp += SAMPLE_INTERVAL
+            if not report_resting and progress == 1:
+                timestamp = max(timestamp, start_time + slide_time + rest_time)
+
+        arrival_times.setdefault(touch_id, track[-1].timestamp)
+        tracks.append(track)
+
+    samples = sorted((sample for track in tracks for sample in track), key=lambda sample: sample.timestamp)
+    return SyntheticStroke(samples, intended_keys, arrival_times, final_keys)
+
+
+@dataclass
+class Result:
+    keys: set[int]
+    latencies: list[float]
+    """ms from each touch reaching its final key to that key being added"""
+
+def run_default(stroke: SyntheticStroke) -> Result:
+    keys: set[int] = set()
+    commit_times: dict[tuple[int, int], float] = {}
+
+    for sample in stroke.samples:
+        key = key_at(sample.x, sample.y)
+        if key is None: continue
+
+        keys.add(key)
+        commit_times.setdefault((sample.touch_id, key), sample.timestamp)
+
+    return Result(keys, latencies(stroke, commit_times))
+
+def run_slide_filter(stroke: SyntheticStroke, slide_filter: SlideFilter[int], dwell_timer: bool=True) -> Result:
+    """
+        :param dwell_timer: Whether to also commit keys at `slide_filter.next_deadline()` between samples, like the
+            keyboard's dwell timer.
+    """
+
+    keys: set[int] = set()
+    commit_times: dict[tuple[int, int], float] = {}
+
+    for sample in stroke.samples:
+        deadline = slide_filter.next_deadline() if dwell_timer else None
+        while deadline is not None and deadline <= sample.timestamp:
+            for touch_id, key in slide_filter.expire(deadline):
+                keys.add(key)
+                commit_times.setdefault((touch_id, key), deadline)
+            deadline = slide_filter.next_deadline()
+
+        key = key_at(sample.x, sample.y)
+        committed = (
+            slide_filter.release(sample.touch_id, key)
+                if sample.released
+                else slide_filter.update(sample.touch_id, sample.timestamp, sample.x, sample.y, key)
+        )
+        if not committed or key is None: continue
+
+        keys.add(key)
+        commit_times.setdefault((sample.touch_id, key), sample.timestamp)
+
+    slide_filter.clear()
+    return Result(keys, latencies(stroke, commit_times))
+
+def latencies(stroke: SyntheticStroke, commit_times: dict[tuple[int, int], float]):
+    return [
+        max(commit_times[touch_id, key] - stroke.arrival_times[touch_id], 0)
+        for touch_id, key in stroke.final_keys.items()
+        if (touch_id, key) in commit_times
+    ]
+
+
+def report(name: str, strokes: list[SyntheticStroke], results: list[Result], elapsed: float):
+    n_exact = sum(result.keys == stroke.intended_keys for stroke, result in zip(strokes, results))
+    extra_keys = [len(result.keys - stroke.intended_keys) for stroke, result in zip(strokes, results)]
+    missing_keys = [len(stroke.intended_keys - result.keys) for stroke, result in zip(strokes, results)]
+    all_latencies = sorted(latency for result in results for latency in result.latencies)
+    n_samples = sum(len(stroke.samples) for stroke in strokes)
+
+    print(f"  {name}")
+    print(f"    exact strokes        {n_exact / len(strokes):.1%}")
+    print(f"    extra keys/stroke    {mean(extra_keys):.3f}")
+    print(f"    missing keys/stroke  {mean(missing_keys):.3f}")
+    print(f"    final key latency    median {median(all_latencies):.1f} ms, p95 {all_latencies[int(len(all_latencies) * 0.95)]:.1f} ms")
+    print(f"    time/touch point     {elapsed / n_samples * 1e9:.0f} ns")
+
+
+def main():
+    parser = ArgumentParser(description="Compares the accuracy and latency of adding keys touched by sliding fingers")
+    parser.add_argument("--strokes", type=int, default=1000, help="Number of synthetic strokes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dwell-time", type=float, default=SLIDE_DWELL_TIME, help="ms a touch must stay on a key")
+    parser.add_argument("--max-speed", type=float, default=SLIDE_MAX_SPEED, help="cm/s under which a touch has settled")
+    args = parser.parse_args()
+
+    # cm/s to cm/ms, since the samples are in cm and ms
+    slide_filter: SlideFilter[int] = SlideFilter(args.dwell_time, args.max_speed / 1000)
+
+    for report_resting in (True, False):
+        random = Random(args.seed)
+        strokes = [generate_stroke(random, report_resting) for _ in range(args.strokes)]
+
+        print("Resting fingers reported" if report_resting else "Resting fingers not reported")
+
+        start = time.perf_counter()
+        default_results = [run_default(stroke) for stroke in strokes]
+        report("Default", strokes, default_results, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        slide_results = [run_slide_filter(stroke, slide_filter) for stroke in strokes]
+        report("Slide filter", strokes, slide_results, time.perf_counter() - start)
+
+        if not report_resting:
+            start = time.perf_counter()
+            slide_results = [run_slide_filter(stroke, slide_filter, dwell_timer=False) for stroke in strokes]
+            report("Slide filter without dwell timer", strokes, slide_results, time.perf_counter() - start)
+
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Measures the Python memory allocated while the keyboard widget handles touch events.
+
+Replays a touch log recorded by the plugin (see "Record touch sessions" in the README) into a headless
+`KeyboardWidget` under `tracemalloc`. For every event, reports the peak memory allocated while handling it on top of
+what was allocated before it, which approximates how many short-lived objects the touch path creates. The Qt events
+are built before measuring, so only the widget's handling is counted. Run from the repository root:
+
+    python -m benchmarks.touch_allocations touches.log
+    python -m benchmarks.touch_allocations touches.log --repeat 5 --plover-settings
+
+To compare changes to the touch path, run it on the same log before and after them.
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+from statistics import mean, median
+import tracemalloc
+
+from plover_touchscreen_stenotype.lib.touch_replay import TouchReplay, create_replay_widget, replayed_touch_events
+
+
+def main():
+    parser = ArgumentParser(description="Measures per-event allocations of the keyboard's touch handling")
+    parser.add_argument("path", type=Path, help="Touch log")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of times to replay the log")
+    parser.add_argument("--plover-settings", action="store_true", help="Use the plugin settings saved by Plover instead of the defaults")
+    args = parser.parse_args()
+
+    replay = TouchReplay.from_file(args.path)
+    app, widget = create_replay_widget(replay, plover_settings=args.plover_settings)
+
+    # Warm up caches (fonts, parsed strokes, lazily built objects) so they are not counted
+    for event in replayed_touch_events(replay):
+        widget.event(event)
+
+    events = [event for _ in range(args.repeat) for event in replayed_touch_events(replay)]
+
+    peak_bytes: list[int] = []
+
+    tracemalloc.start()
+    start_bytes, _ = tracemalloc.get_traced_memory()
+
+    for event in events:
+        before_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        widget.event(event)
+
+        _, event_peak_bytes = tracemalloc.get_traced_memory()
+        peak_bytes.append(event_peak_bytes - before_bytes)
+
+    end_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if len(peak_bytes) == 0:
+        print("no events")
+        return
+
+    peak_bytes.sort()
+    print(f"{len(events)} events")
+    print(f"transient bytes per event: mean {mean(peak_bytes):.0f}, median {median(peak_bytes):.0f}, p95 {peak_bytes[int(0.95 * (len(peak_bytes) - 1))]}, max {peak_bytes[-1]}")
+    print(f"retained bytes: {end_bytes - start_bytes}")
+
+
+if __name__ == "__main__":
+    main()
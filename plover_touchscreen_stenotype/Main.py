@@ -3,6 +3,9 @@ from plover.gui_qt.utils import ToolBar
 from plover.gui_qt.engine import Engine
 from plover.steno import Stroke
 from plover.oslayer import PLATFORM
+import plover.log
+
+from typing import Callable, TYPE_CHECKING
 
 from PyQt5.QtCore import (
     Qt,
@@ -20,25 +23,27 @@ from PyQt5.QtGui import (
     QIcon,
     QKeySequence,
     QMouseEvent,
-    QFont,
+    QPaintEvent,
 )
 
 from plover.steno import Stroke
 
 
-from .settings import Settings
+from .settings import Settings, StenotypeMode
+from . import commands
 from .lib.reactivity import Ref, on, on_many, watch
 from .widgets.composables.UseDpi import UseDpi
-from .lib.constants import FONT_FAMILY
-from .lib.util import immediate
-from .widgets.keyboard.KeyboardWidget import KeyboardWidget
-from .widgets.joysticks.JoysticksWidget import JoysticksWidget
+from .lib.util import font, immediate, tick
+from .lib.latency import latency_tracker, LatencyStage, PhaseTimer
+from .lib.paint_profiler import paint_profiler
+from .lib.key_pixmap_atlas import key_pixmap_atlas
 from .widgets.StrokePreview import StrokePreview
-from .widgets.SettingsDialog import SettingsDialog
 from .widgets.CenterControls import CenterControls
 
+if TYPE_CHECKING:
+    from .widgets.keyboard.KeyboardWidget import KeyboardWidget
+    from .widgets.joysticks.JoysticksWidget import JoysticksWidget
 
-_window_instance: "Main | None" = None
 
 class Main(Tool):
     #region Overrides
@@ -51,13 +56,16 @@ class Main(Tool):
     close_stroked = pyqtSignal()
     minimize_stroked = pyqtSignal()
     open_settings_stroked = pyqtSignal()
+    profile_stroked = pyqtSignal(str)
 
 
     def __init__(self, engine: Engine):
-        global _window_instance
-        
         super().__init__(engine)
 
+        # Opening the window is split into a cheap skeleton (window, controls) and the stroke preview and stenotype,
+        # which are only built after the skeleton first paints so the window appears as soon as possible
+        self.__startup_timer = startup_timer = PhaseTimer()
+
         self.engine = engine # Override for type hint
         self.__last_stroke_from_widget = False
         """Whether the last emitted stroke originated from this Tool"""
@@ -67,6 +75,7 @@ class Main(Tool):
         self.__settings = Settings()
         self.restore_state()
         self.finished.connect(self.save_state)
+        startup_timer.mark("settings")
 
 
         self.__dpi = dpi = UseDpi(self)
@@ -120,19 +129,10 @@ class Main(Tool):
             #     # self.setAttribute(Qt.WA_X11DoNotAcceptFocus)
 
 
-        left_right_width_diff = Ref(0.)
+        startup_timer.mark("window")
 
-        self.stroke_preview = stroke_preview = StrokePreview(self.engine, self.__settings, left_right_width_diff, self)
-
-        if True:
-            stenotype = KeyboardWidget(self.__settings, left_right_width_diff, self)
-            stenotype.end_stroke.connect(self.__on_stenotype_input)
-            stenotype.current_stroke_change.connect(self.__on_stroke_change)
-        else:
-            joysticks = JoysticksWidget(self.__settings, left_right_width_diff, self)
-            joysticks.end_stroke.connect(self.__on_stenotype_input)
-            joysticks.current_stroke_change.connect(self.__on_stroke_change)
 
+        left_right_width_diff = Ref(0.)
 
         settings_action = QAction(self)
         settings_action.setText("Settings")
@@ -143,19 +143,24 @@ class Main(Tool):
         def trigger_settings_action():
             settings_action.trigger()
 
+        @on(self.profile_stroked)
+        def apply_profile(profile_name: str):
+            if self.__settings.apply_profile(profile_name): return
+            plover.log.warning(f"Touchscreen stenotype: no settings profile named {profile_name!r}")
+
         minimize_action = QAction(self)
         minimize_action.setIconText("−")
         minimize_action.triggered.connect(lambda: self.setWindowState(Qt.WindowMinimized))
         @watch(dpi.change)
         def set_minimize_action_icon_size():
-            minimize_action.setFont(QFont(FONT_FAMILY, dpi.dp(8)))
+            minimize_action.setFont(font(point_size=dpi.dp(8)))
 
         close_action = QAction(self)
         close_action.setIconText("×")
         close_action.triggered.connect(lambda: self.close())
         @watch(dpi.change)
         def set_close_action_icon_size():
-            close_action.setFont(QFont(FONT_FAMILY, dpi.dp(8)))
+            close_action.setFont(font(point_size=dpi.dp(8)))
         
 
         toolbar = ToolBar(settings_action, minimize_action, close_action)
@@ -167,15 +172,59 @@ class Main(Tool):
         controls = CenterControls(self.mousePressEvent, settings_action, minimize_action, close_action, left_right_width_diff, self)
 
         layout = QGridLayout(self)
-        layout.addWidget(stroke_preview, 0, 0)
         layout.addWidget(controls, 0, 0, Qt.AlignCenter)
-        if True:
-            layout.addWidget(stenotype, 0, 0)
-        else:
-            layout.addWidget(joysticks, 0, 0)
         self.setLayout(layout)
 
 
+        def build_deferred_widgets():
+            self.stroke_preview = stroke_preview = StrokePreview(self.engine, self.__settings, left_right_width_diff, self)
+            layout.addWidget(stroke_preview, 0, 0)
+            stroke_preview.lower()
+            startup_timer.mark("stroke preview")
+
+            stenotype: "KeyboardWidget | JoysticksWidget | None" = None
+
+            @watch(self.__settings.stenotype_mode_ref.change)
+            def set_stenotype_mode():
+                nonlocal stenotype
+
+                if stenotype is not None:
+                    layout.removeWidget(stenotype)
+                    stenotype.deleteLater()
+
+                # Imported here so that only the mode in use is loaded
+                if self.__settings.stenotype_mode == StenotypeMode.JOYSTICKS.value:
+                    from .widgets.joysticks.JoysticksWidget import JoysticksWidget
+                    stenotype = JoysticksWidget(self.__settings, left_right_width_diff, self)
+                else:
+                    from .widgets.keyboard.KeyboardWidget import KeyboardWidget
+                    stenotype = KeyboardWidget(self.__settings, left_right_width_diff, self)
+                stenotype.end_stroke.connect(self.__on_stenotype_input)
+                stenotype.current_stroke_change.connect(self.__on_stroke_change)
+
+                layout.addWidget(stenotype, 0, 0)
+                # The center controls stay above the stenotype, and the stroke preview below it
+                stenotype.stackUnder(controls)
+
+            startup_timer.mark("stenotype")
+            plover.log.debug(f"Touchscreen stenotype startup: {startup_timer.report()}")
+
+        self.__build_deferred_widgets: "Callable[[], None] | None" = build_deferred_widgets
+
+
+        @on(self.__settings.paint_profiling_ref.change)
+        def set_paint_profiling():
+            if self.__settings.paint_profiling:
+                paint_profiler.reset()
+                paint_profiler.enabled = True
+            else:
+                paint_profiler.enabled = False
+                plover.log.info("Touchscreen stenotype paint profile:\n%s", paint_profiler.report())
+
+        @watch(self.__settings.prerendered_keys_ref.change)
+        def set_prerendered_keys():
+            key_pixmap_atlas.enabled = self.__settings.prerendered_keys
+
         @watch(self.__settings.window_opacity_ref.change)
         def set_window_opacity():
             self.setWindowOpacity(self.__settings.window_opacity)
@@ -193,23 +242,36 @@ class Main(Tool):
 
         engine.signal_stroked.connect(self.__on_stroked)
 
-        _window_instance = self
+        commands.window_instance = self
         @on(self.finished)
         def clear_instance():
-            global _window_instance
-
-            _window_instance = None
+            commands.window_instance = None
 
         
         self.close_stroked.connect(lambda: self.close())
         self.minimize_stroked.connect(lambda: self.setWindowState(Qt.WindowMinimized))
 
+        startup_timer.mark("skeleton")
+
 
     def _restore_state(self, settings: QSettings):
         self.__settings.load(settings)
 
     def _save_state(self, settings: QSettings):
         self.__settings.save(settings)
+
+    def paintEvent(self, event: QPaintEvent):
+        """(override)"""
+
+        super().paintEvent(event)
+
+        build_deferred_widgets = self.__build_deferred_widgets
+        if build_deferred_widgets is None: return
+
+        self.__build_deferred_widgets = None
+        self.__startup_timer.mark("first paint")
+        # Lets the first frame reach the screen before the stenotype is built
+        tick(build_deferred_widgets)
     
 
     # https://github.com/Kaoffie/plover_svg_layout_display/blob/master/plover_svg_layout_display/layout_ui.py#L91
@@ -234,6 +296,7 @@ class Main(Tool):
         self.__last_stroke_from_widget = True
         self.__last_stroke_keys = stroke
         self.engine._machine._notify(stroke.keys())
+        latency_tracker.record_stroke(LatencyStage.ENGINE_DISPATCH)
 
         # Wait until `stroked` hook is dispatched to reset `self.engine.output`, since it must be True for Suggestions to be shown
 
@@ -246,6 +309,8 @@ class Main(Tool):
     def __on_stroked(self, stroke: Stroke):
         if not self.__last_stroke_from_widget or self.__last_stroke_keys != set(stroke.keys()): return
 
+        latency_tracker.record_stroke(LatencyStage.STROKED)
+
         if self.engine.output == False:
             # The engine output was disabled before it was set again; {PLOVER:TOGGLE} was likely triggered
             self.engine.output = not self.__last_stroke_engine_enabled
@@ -281,23 +346,7 @@ class Main(Tool):
         self.__settings.window_width = self.__dpi.px_to_cm(self.width())
         self.__settings.window_height = self.__dpi.px_to_cm(self.height())
 
+        from .widgets.SettingsDialog import SettingsDialog
+
         dialog = SettingsDialog(self.__settings, self)
         dialog.open()
-
-
-# def command_open(engine: Engine, arg: str):
-#     if _window_instance is not None: return
-#     new_window = Main(engine)
-#     new_window.show()
-
-def command_close(engine: Engine, arg: str):
-    if _window_instance is None: return
-    _window_instance.close_stroked.emit()
-
-def command_minimize(engine: Engine, arg: str):
-    if _window_instance is None: return
-    _window_instance.minimize_stroked.emit()
-    
-def command_open_settings(engine: Engine, arg: str):
-    if _window_instance is None: return
-    _window_instance.open_settings_stroked.emit()
\ No newline at end of file
@@ -1,18 +1,59 @@
 from plover.machine.base import ThreadedStenotypeBase
+from plover.steno import Stroke, normalize_steno
+import plover.log
 
+from pathlib import Path
+from queue import Empty, Queue
+import socket
+import threading
+import time
 from typing import Any
 
+
+THROUGHPUT_LOG_INTERVAL = 5
+"""s between logs of the number of batched strokes sent"""
+SOCKET_POLL_INTERVAL = 0.25
+"""s that blocking socket operations wait before checking whether capture has stopped"""
+
+
 class NoneMachine(ThreadedStenotypeBase):
-    """Machine that does nothing"""
+    """Machine that does nothing, except send strokes from batches given to it for scripted input.
+
+    Batches are text with one or more `/`-separated strokes per line; blank lines and lines starting with `#` are
+    skipped. They can be read from `batch_file` when capture starts, or from any connection to `socket_port` on
+    localhost. Strokes from batches are sent from the machine thread, at most `strokes_per_second` of them each second
+    if it is positive."""
 
     KEYS_LAYOUT: str = ""
 
     def __init__(self, params: dict[str, Any]):
         super().__init__()
-    
+
+        self.__batch_file: str = params.get("batch_file", "")
+        self.__socket_port: int = params.get("socket_port", 0)
+        self.__strokes_per_second: float = params.get("strokes_per_second", 0)
+
+        self.__pending_strokes: "Queue[list[str]]" = Queue()
+
+        self.__n_strokes_sent = 0
+        self.__n_invalid_lines = 0
+        self.__first_stroke_time: "float | None" = None
+        """Time the first stroke was sent since the pending strokes last ran out"""
+        self.__last_stroke_time = 0.
+
     def run(self):
         self._ready()
 
+        if not self.__batch_file and self.__socket_port <= 0: return
+
+        if self.__batch_file:
+            self.__read_batch_file(Path(self.__batch_file).expanduser())
+
+        if self.__socket_port > 0:
+            threading.Thread(target=self.__serve_socket, name=f"{self.name}-socket", daemon=True).start()
+
+        self.__send_pending_strokes()
+
     def start_capture(self):
         super().start_capture()
 
@@ -21,4 +62,126 @@ class NoneMachine(ThreadedStenotypeBase):
 
     @classmethod
     def get_option_info(cls):
-        return {}
\ No newline at end of file
+        return {
+            "batch_file": ("", str),
+            "socket_port": (0, int),
+            "strokes_per_second": (0.0, float),
+        }
+
+
+    #region Batches
+
+    def __queue_batch_line(self, line: str):
+        line = line.strip()
+        if not line or line.startswith("#"): return
+
+        try:
+            strokes = [Stroke.from_steno(steno) for steno in normalize_steno(line)]
+        except ValueError:
+            self.__n_invalid_lines += 1
+            plover.log.warning(f"(None) machine: skipping invalid steno in batch: {line}")
+            return
+
+        for stroke in strokes:
+            self.__pending_strokes.put(stroke.keys())
+
+    def __read_batch_file(self, path: Path):
+        try:
+            with path.open(encoding="utf-8") as file:
+                for line in file:
+                    self.__queue_batch_line(line)
+        except OSError as error:
+            plover.log.error(f"(None) machine: could not read batch file {path}: {error}")
+            return
+
+        plover.log.info(f"(None) machine: queued {self.__pending_strokes.qsize()} strokes from {path}")
+
+    def __serve_socket(self):
+        try:
+            server = socket.create_server(("127.0.0.1", self.__socket_port))
+        except OSError as error:
+            plover.log.error(f"(None) machine: could not listen on port {self.__socket_port}: {error}")
+            return
+
+        plover.log.info(f"(None) machine: listening for stroke batches on 127.0.0.1:{self.__socket_port}")
+
+        with server:
+            server.settimeout(SOCKET_POLL_INTERVAL)
+
+            while not self.finished.is_set():
+                try:
+                    connection, _ = server.accept()
+                except socket.timeout:
+                    continue
+                except OSError as error:
+                    plover.log.error(f"(None) machine: stopped listening for stroke batches: {error}")
+                    return
+
+                with connection:
+                    self.__read_connection(connection)
+
+    def __read_connection(self, connection: socket.socket):
+        connection.settimeout(SOCKET_POLL_INTERVAL)
+
+        buffer = b""
+        while not self.finished.is_set():
+            try:
+                data = connection.recv(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            if not data: break
+
+            *lines, buffer = (buffer + data).split(b"\n")
+            for line in lines:
+                self.__queue_batch_line(line.decode("utf-8", errors="replace"))
+
+        self.__queue_batch_line(buffer.decode("utf-8", errors="replace"))
+
+    def __send_pending_strokes(self):
+        interval = 1 / self.__strokes_per_second if self.__strokes_per_second > 0 else 0
+        next_send_time = time.perf_counter()
+        last_log_time = next_send_time
+
+        while not self.finished.is_set():
+            try:
+                keys = self.__pending_strokes.get(timeout=SOCKET_POLL_INTERVAL)
+            except Empty:
+                if self.__first_stroke_time is not None:
+                    self.__log_throughput()
+                    self.__first_stroke_time = None
+                continue
+
+            now = time.perf_counter()
+            if interval > 0:
+                # Does not catch up on strokes that could have been sent while the queue was empty
+                next_send_time = max(next_send_time, now)
+                if self.finished.wait(next_send_time - now): break
+                next_send_time += interval
+
+            if self.__first_stroke_time is None:
+                self.__first_stroke_time = time.perf_counter()
+                self.__n_strokes_sent = 0
+
+            self._notify(keys)
+            self.__n_strokes_sent += 1
+            self.__last_stroke_time = time.perf_counter()
+
+            if now - last_log_time >= THROUGHPUT_LOG_INTERVAL:
+                self.__log_throughput()
+                last_log_time = now
+
+    def __log_throughput(self):
+        if self.__first_stroke_time is None: return
+
+        # Measured between the first and last strokes, so waiting for more strokes does not lower the rate
+        elapsed = self.__last_stroke_time - self.__first_stroke_time
+        rate = (self.__n_strokes_sent - 1) / elapsed if elapsed > 0 else 0
+        plover.log.info(
+            f"(None) machine: sent {self.__n_strokes_sent} batched strokes in {elapsed:.1f} s ({rate:.1f} strokes/s), "
+            f"{self.__pending_strokes.qsize()} pending, {self.__n_invalid_lines} invalid lines skipped"
+        )
+
+    #endregion
@@ -0,0 +1,82 @@
+"""Plover commands for controlling the stenotype window. Kept apart from `Main` so that Plover can load them without
+importing the GUI; anything heavier than the window reference is imported when a command runs."""
+
+import plover.log
+
+from datetime import datetime
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from plover.gui_qt.engine import Engine
+    from .Main import Main
+
+
+window_instance: "Main | None" = None
+"""The open stenotype window, set by `Main`"""
+
+
+# def command_open(engine: "Engine", arg: str):
+#     if window_instance is not None: return
+#     new_window = Main(engine)
+#     new_window.show()
+
+def command_close(engine: "Engine", arg: str):
+    if window_instance is None: return
+    window_instance.close_stroked.emit()
+
+def command_minimize(engine: "Engine", arg: str):
+    if window_instance is None: return
+    window_instance.minimize_stroked.emit()
+    
+def command_open_settings(engine: "Engine", arg: str):
+    if window_instance is None: return
+    window_instance.open_settings_stroked.emit()
+
+def command_profile(engine: "Engine", arg: str):
+    """Applies the settings profile named `arg`."""
+
+    if window_instance is None: return
+    window_instance.profile_stroked.emit(arg.strip())
+
+def command_latency(engine: "Engine", arg: str):
+    """Logs the touch-to-stroke latency report, or clears the recorded latencies if `arg` is `reset`."""
+
+    from .lib.latency import latency_tracker
+
+    if arg.strip().lower() == "reset":
+        latency_tracker.reset()
+        return
+
+    plover.log.info("Touchscreen stenotype latency:\n%s", latency_tracker.report())
+
+def command_trace_reactivity(engine: "Engine", arg: str):
+    """Logs a report of the reactive handlers that have run and writes their trigger chains to a folded stack file.
+    `start` enables tracing for handlers connected afterward, and `reset` clears the recorded calls."""
+
+    from .lib.reactivity import (
+        TRACING_ENVIRONMENT_VARIABLE,
+        enable_tracing,
+        tracing_enabled,
+        reset_tracing,
+        tracing_report,
+        write_tracing_folded_stacks,
+    )
+    from .widgets.composables.UseTouchRecording import TOUCH_LOG_DIR
+
+    arg = arg.strip().lower()
+
+    if arg == "start":
+        enable_tracing()
+        plover.log.info("Touchscreen stenotype: tracing reactive handlers connected from now on (reopen the stenotype window to trace it)")
+        return
+
+    if not tracing_enabled():
+        plover.log.info(f"Touchscreen stenotype: reactivity tracing is disabled. Set the environment variable {TRACING_ENVIRONMENT_VARIABLE} before starting Plover, or use touchscreen_stenotype.trace_reactivity:start")
+        return
+
+    if arg == "reset":
+        reset_tracing()
+        return
+
+    path = TOUCH_LOG_DIR / f"reactivity-{datetime.now():%Y%m%d-%H%M%S}.folded"
+    write_tracing_folded_stacks(path)
+    plover.log.info("Touchscreen stenotype reactive handlers (folded stacks written to %s):\n%s", path, tracing_report())
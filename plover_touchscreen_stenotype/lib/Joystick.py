@@ -1,3 +1,4 @@
+from array import array
 from enum import Enum, auto
 import math
 
@@ -51,29 +52,177 @@ class Joystick:
         self.layout = layout
         self.semicircle_flat_side = semicircle_flat_side
 
-        self.center = Ref(center)
+        self.center = Ref(QPointF(center))
+        """Updated in place by `JoystickKinematics`, which then emits `change` once"""
         self.angle = angle
         self.aspect_ratio = aspect_ratio
 
-        self.displacement = Ref(QPointF(0, 0))
+        self.displacement = QPointF(0, 0)
+        """Updated in place. Not observable; changes that matter are reflected in `center` and `selected_key_index`."""
 
         self.selected_key_index: "Ref[int | None]" = Ref(None)
 
+    def set_base_center(self, center: QPointF):
+        self.__base_center = QPointF(center)
+
     def reset_center(self):
-        self.center.value = self.__base_center
-        self.displacement.value = QPointF(0, 0)
+        self.center.value = QPointF(self.__base_center)
+        self.reset_displacement()
 
     def set_center_to_current(self):
-        self.center.value = self.center.value + self.displacement.value
-        self.displacement.value = QPointF(0, 0)
+        self.center.value = self.center.value + self.displacement
+        self.reset_displacement()
+
+    def reset_displacement(self):
+        self.displacement.setX(0)
+        self.displacement.setY(0)
 
     def distance(self, widget_touch_pos: QPoint):
         return widget_touch_pos.x()**2 + widget_touch_pos.y()**2
     
     @property
     def displacement_angle(self):
-        return math.atan2(self.displacement.value.y(), self.displacement.value.x())
+        return math.atan2(self.displacement.y(), self.displacement.x())
     
     @property
     def displacement_hypot(self):
-        return math.hypot(self.displacement.value.x(), self.displacement.value.y())
\ No newline at end of file
+        return math.hypot(self.displacement.x(), self.displacement.y())
+
+
+"""tan(22.5°). Sector boundaries lie halfway between the axes and the diagonals."""
+_SECTOR_BOUNDARY_SLOPE = math.tan(math.tau / 16)
+
+def sector_index(x: float, y: float) -> int:
+    """Classifies a direction into one of 8 sectors, numbered from 0 at +x toward +y (clockwise on screen), each
+    centered on a multiple of 45°. Equivalent to rounding `atan2(y, x)` to the nearest multiple of 45°, using only
+    comparisons against the precomputed boundary slope."""
+
+    abs_x = abs(x)
+    abs_y = abs(y)
+
+    if abs_y <= _SECTOR_BOUNDARY_SLOPE * abs_x:
+        return 0 if x >= 0 else 4
+    if abs_x <= _SECTOR_BOUNDARY_SLOPE * abs_y:
+        return 2 if y >= 0 else 6
+
+    if x >= 0:
+        return 1 if y >= 0 else 7
+    return 3 if y >= 0 else 5
+
+
+class JoystickKinematics:
+    """Applies touch movement to a joystick: moves its displacement, drags its center along once the displacement
+    reaches its limit, and selects the key in the direction of the displacement. Lengths are in px."""
+
+    def __init__(self, joystick: Joystick):
+        self.__joystick = joystick
+
+        self.__max_displacement = 0.
+        self.__max_displacement_sq = 0.
+        self.__neutral_threshold = 0.
+        self.__neutral_threshold_sq = 0.
+
+    def set_limits(self, max_displacement: float, neutral_threshold: float):
+        self.__max_displacement = max_displacement
+        self.__max_displacement_sq = max_displacement * max_displacement
+        self.__neutral_threshold = neutral_threshold
+        self.__neutral_threshold_sq = neutral_threshold * neutral_threshold
+
+    def move(self, dx: float, dy: float):
+        joystick = self.__joystick
+        displacement = joystick.displacement
+        max_displacement = self.__max_displacement
+
+        if joystick.layout == JoystickLayout.VERTICAL:
+            # The center follows horizontal movement; only vertical movement displaces the joystick
+            center_dx = dx
+            center_dy = 0.
+
+            new_y = displacement.y() + dy
+            if new_y > max_displacement:
+                center_dy = new_y - max_displacement
+                new_y = max_displacement
+            elif new_y < -max_displacement:
+                center_dy = new_y + max_displacement
+                new_y = -max_displacement
+
+            displacement.setX(0)
+            displacement.setY(new_y)
+
+            if abs(new_y) < self.__neutral_threshold:
+                selected_key_index = 1
+            elif new_y > 0:
+                selected_key_index = 2
+            else:
+                selected_key_index = 0
+
+        else:
+            center_dx = 0.
+            center_dy = 0.
+
+            new_x = displacement.x() + dx
+            new_y = displacement.y() + dy
+            hypot_sq = new_x * new_x + new_y * new_y
+
+            if hypot_sq > self.__max_displacement_sq:
+                scale = max_displacement / math.sqrt(hypot_sq)
+                center_dx = new_x * (1 - scale)
+                center_dy = new_y * (1 - scale)
+                new_x *= scale
+                new_y *= scale
+                hypot_sq = self.__max_displacement_sq
+
+            displacement.setX(new_x)
+            displacement.setY(new_y)
+
+            if hypot_sq < self.__neutral_threshold_sq:
+                selected_key_index = 0
+            else:
+                selected_key_index = sector_index(new_x, new_y) + 1
+
+
+        if center_dx != 0 or center_dy != 0:
+            center = joystick.center.value
+            center.setX(center.x() + center_dx)
+            center.setY(center.y() + center_dy)
+            joystick.center.emit()
+
+        joystick.selected_key_index.value = selected_key_index
+
+
+class JoystickCenters:
+    """Centers of a set of joysticks in scene coordinates, kept in flat arrays so that the joysticks near a touch can be
+    found with one brute-force pass instead of mapping the touch into each joystick's coordinates."""
+
+    def __init__(self, n_joysticks: int):
+        self.__xs = array("d", (0,) * n_joysticks)
+        self.__ys = array("d", (0,) * n_joysticks)
+
+    def set_center(self, index: int, scene_center: QPointF):
+        self.__xs[index] = scene_center.x()
+        self.__ys[index] = scene_center.y()
+
+    def indices_near(self, scene_pos: QPointF, max_distance: float) -> list[int]:
+        """Finds the joysticks whose centers are within `max_distance` of `scene_pos`.
+
+            :returns: The indices of the joysticks, nearest first.
+        """
+
+        x = scene_pos.x()
+        y = scene_pos.y()
+        max_sqdist = max_distance * max_distance
+
+        xs = self.__xs
+        ys = self.__ys
+
+        nearby: list[tuple[float, int]] = []
+        for i in range(len(xs)):
+            dx = xs[i] - x
+            dy = ys[i] - y
+            sqdist = dx * dx + dy * dy
+            if sqdist > max_sqdist: continue
+
+            nearby.append((sqdist, i))
+
+        nearby.sort()
+        return [i for _, i in nearby]
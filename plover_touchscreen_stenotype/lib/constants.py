@@ -1,34 +1,40 @@
 FONT_FAMILY = "Atkinson Hyperlegible, Segoe UI, Ubuntu"
 
-# KeyWidget rule removes any native margin around KeyWidgets
-KEY_GROUP_STYLESHEET = """
-KeyGroupWidget {
-    background: #00000000;
-}
-
-KeyWidget {
-    background: #fdfdfd;
-    border: 1px solid;
-    border-color: #d0d0d0 #d0d0d0 #bababa #d0d0d0;
-}
-
-KeyWidget[matched_soft="true"] {
-    background: #ca9e2e;
-    border-color: #a36a2c #a36a2c #1f5153 #a36a2c;
+"""Background and border (top, right, bottom, left) colors of keys in each highlight state. Shared by the stylesheet
+and the pre-rendered key pixmaps."""
+KEY_STATE_COLORS = {
+    "normal": ("#fdfdfd", ("#d0d0d0", "#d0d0d0", "#bababa", "#d0d0d0")),
+    "matched_soft": ("#ca9e2e", ("#a36a2c", "#a36a2c", "#1f5153", "#a36a2c")),
+    "matched": ("#6f9f86", ("#2a6361", "#2a6361", "#1f5153", "#2a6361")),
+    "touched": ("#41796a", ("#2a6361", "#2a6361", "#1f5153", "#2a6361")),
 }
+KEY_LABEL_HIGHLIGHTED_COLOR = "#fff"
 
-KeyWidget[matched="true"] {
-    background: #6f9f86;
-    border-color: #2a6361 #2a6361 #1f5153 #2a6361;
-}
+def _key_state_rule(selector: str, state: str):
+    background, border_colors = KEY_STATE_COLORS[state]
+    return f"""
+{selector} {{
+    background: {background};
+    border-color: {" ".join(border_colors)};
+}}
+"""
 
-KeyWidget[touched="true"] {
-    background: #41796a;
-}
+# KeyWidget rule removes any native margin around KeyWidgets
+KEY_GROUP_STYLESHEET = f"""
+KeyGroupWidget {{
+    background: #00000000;
+}}
 
-KeyLabel[highlighted="true"] {
-    color: #fff;
-}
+KeyWidget {{
+    border: 1px solid;
+}}
+{_key_state_rule("KeyWidget", "normal")}
+{_key_state_rule('KeyWidget[matched_soft="true"]', "matched_soft")}
+{_key_state_rule('KeyWidget[matched="true"]', "matched")}
+{_key_state_rule('KeyWidget[touched="true"]', "touched")}
+KeyLabel[highlighted="true"] {{
+    color: {KEY_LABEL_HIGHLIGHTED_COLOR};
+}}
 """
 
-GRAPHICS_VIEW_STYLE = "background: #00000000; border: none;"
\ No newline at end of file
+GRAPHICS_VIEW_STYLE = "background: #00000000; border: none;"
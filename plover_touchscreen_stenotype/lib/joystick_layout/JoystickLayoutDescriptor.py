@@ -0,0 +1,69 @@
+from dataclasses import dataclass
+
+from PyQt5.QtCore import (
+    QPointF,
+)
+
+from ..Joystick import JoystickLayout, JoystickSemicircleSide
+from ...widgets.composables.UseDpi import UseDpi
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from ...settings import Settings
+else:
+    Settings = object
+
+
+"""Distance (cm) a joystick is moved up by a stagger factor of 1"""
+STAGGER_DISTANCE = 2
+
+@dataclass(frozen=True, slots=True)
+class JoystickDescriptor:
+    keys: tuple[tuple[str, str], ...]
+    """(steno, label) pairs. Vertical joysticks have 3 keys from top to bottom; other joysticks have 9 keys, with the
+    neutral key first and the rest clockwise from the right."""
+
+    layout: JoystickLayout
+
+    x: float
+    y: float
+    """Position of the center before staggering, in cm"""
+    stagger_setting: "str | None" = None
+    """Name of the `Settings` attribute holding the stagger factor that moves this joystick up"""
+
+    semicircle_flat_side: "JoystickSemicircleSide | None" = None
+
+@dataclass(frozen=True, slots=True)
+class JoystickGroup:
+    joystick_indices: tuple[int, ...]
+
+    angle_setting: str
+    """Name of the `Settings` attribute holding the angle (°) the group is rotated by"""
+    mirrored: bool = False
+    """Whether the group is rotated by the negated angle"""
+
+@dataclass(frozen=True, slots=True)
+class JoystickLayoutDescriptor:
+    joysticks: tuple[JoystickDescriptor, ...]
+    groups: tuple[JoystickGroup, ...]
+
+    @property
+    def stagger_settings(self):
+        return tuple(sorted(set(
+            joystick.stagger_setting
+            for joystick in self.joysticks
+            if joystick.stagger_setting is not None
+        )))
+
+
+def compile_joystick_centers(layout_descriptor: JoystickLayoutDescriptor, settings: Settings, dpi: UseDpi) -> tuple[QPointF, ...]:
+    """Computes the centers of the joysticks in px from the current settings."""
+
+    centers: list[QPointF] = []
+    for joystick in layout_descriptor.joysticks:
+        y = joystick.y
+        if joystick.stagger_setting is not None:
+            y -= STAGGER_DISTANCE * getattr(settings, joystick.stagger_setting)
+
+        centers.append(QPointF(dpi.cm(joystick.x), dpi.cm(y)))
+
+    return tuple(centers)
@@ -0,0 +1,19 @@
+from functools import cache
+
+from . import (
+    english_stenotype,
+)
+from ..JoystickLayoutDescriptor import JoystickLayoutDescriptor
+
+DEFAULT_JOYSTICK_LAYOUT_NAME = "English stenotype"
+
+JOYSTICK_LAYOUT_BUILDERS = {
+    "English stenotype": english_stenotype.build_layout_descriptor,
+}
+
+@cache
+def get_joystick_layout_descriptor(name: str) -> JoystickLayoutDescriptor:
+    """Joystick layout descriptors are plain data, so each one is built once and shared."""
+
+    build_layout_descriptor = JOYSTICK_LAYOUT_BUILDERS.get(name) or JOYSTICK_LAYOUT_BUILDERS[DEFAULT_JOYSTICK_LAYOUT_NAME]
+    return build_layout_descriptor()
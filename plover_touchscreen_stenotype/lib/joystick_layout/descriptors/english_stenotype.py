@@ -0,0 +1,147 @@
+from ...Joystick import JoystickLayout, JoystickSemicircleSide
+from ..JoystickLayoutDescriptor import JoystickLayoutDescriptor, JoystickDescriptor, JoystickGroup
+
+
+def build_layout_descriptor() -> JoystickLayoutDescriptor:
+    return JoystickLayoutDescriptor(
+        joysticks=(
+            JoystickDescriptor(
+                (
+                    ("^+S", ""),
+                    ("S", "S"),
+                    ("S", "S"),
+                    ("+S", ""),
+                    ("+", "+"),
+                    ("^+", ""),
+                    ("^", "^"),
+                    ("^S", ""),
+                    ("S", "S"),
+                ),
+                x=-10, y=0, stagger_setting="pinky_stagger_fac",
+                layout=JoystickLayout.SEMICIRCLE,
+                semicircle_flat_side=JoystickSemicircleSide.RIGHT,
+            ),
+            JoystickDescriptor(
+                (
+                    ("T", "T"),
+                    ("TK", ""),
+                    ("K", "K"),
+                ),
+                x=-7.5, y=0, stagger_setting="ring_stagger_fac",
+                layout=JoystickLayout.VERTICAL,
+            ),
+            JoystickDescriptor(
+                (
+                    ("P", "P"),
+                    ("PW", ""),
+                    ("W", "W"),
+                ),
+                x=-5, y=0, stagger_setting="middle_stagger_fac",
+                layout=JoystickLayout.VERTICAL,
+            ),
+            JoystickDescriptor(
+                (
+                    ("&HR", ""),
+                    ("&", "&&"),
+                    ("&", "&&"),
+                    ("&R", ""),
+                    ("R", "R"),
+                    ("HR", ""),
+                    ("H", "H"),
+                    ("&H", ""),
+                    ("&", "&&"),
+                ),
+                x=-2.5, y=0, stagger_setting="index_stagger_fac",
+                layout=JoystickLayout.SEMICIRCLE,
+                semicircle_flat_side=JoystickSemicircleSide.LEFT,
+            ),
+            JoystickDescriptor(
+                (
+                    ("*FR", ""),
+                    ("-FR", ""),
+                    ("-R", "R"),
+                    ("*R", ""),
+                    ("*", "*"),
+                    ("*", "*"),
+                    ("*", "*"),
+                    ("*F", ""),
+                    ("-F", "F"),
+                ),
+                x=2.5, y=0, stagger_setting="index_stagger_fac",
+                layout=JoystickLayout.SEMICIRCLE,
+                semicircle_flat_side=JoystickSemicircleSide.RIGHT,
+            ),
+            JoystickDescriptor(
+                (
+                    ("-P", "P"),
+                    ("-PB", ""),
+                    ("-B", "B"),
+                ),
+                x=5, y=0, stagger_setting="middle_stagger_fac",
+                layout=JoystickLayout.VERTICAL,
+            ),
+            JoystickDescriptor(
+                (
+                    ("-L", "L"),
+                    ("-LG", ""),
+                    ("-G", "G"),
+                ),
+                x=7.5, y=0, stagger_setting="ring_stagger_fac",
+                layout=JoystickLayout.VERTICAL,
+            ),
+            JoystickDescriptor(
+                (
+                    ("-TSDZ", ""),
+                    ("-DZ", ""),
+                    ("-Z", "Z"),
+                    ("-SZ", ""),
+                    ("-S", "S"),
+                    ("-TS", ""),
+                    ("-T", "T"),
+                    ("-TD", ""),
+                    ("-D", "D"),
+                ),
+                x=10, y=0, stagger_setting="pinky_stagger_fac",
+                layout=JoystickLayout.SEMICIRCLE,
+                semicircle_flat_side=JoystickSemicircleSide.LEFT,
+            ),
+            JoystickDescriptor(
+                (
+                    ("#AO", ""),
+                    ("#O", ""),
+                    ("#", "#"),
+                    ("#", "#"),
+                    ("#", "#"),
+                    ("#A", ""),
+                    ("A", "A"),
+                    ("AO", ""),
+                    ("O", "O"),
+                ),
+                x=-2, y=2,
+                layout=JoystickLayout.SEMICIRCLE,
+                semicircle_flat_side=JoystickSemicircleSide.UP,
+            ),
+            JoystickDescriptor(
+                (
+                    ("_EU", ""),
+                    ("_U", ""),
+                    ("_", "_"),
+                    ("_", "_"),
+                    ("_", "_"),
+                    ("_E", ""),
+                    ("E", "E"),
+                    ("EU", ""),
+                    ("U", "U"),
+                ),
+                x=2, y=2,
+                layout=JoystickLayout.SEMICIRCLE,
+                semicircle_flat_side=JoystickSemicircleSide.UP,
+            ),
+        ),
+        groups=(
+            JoystickGroup((0, 1, 2, 3), "bank_angle"),
+            JoystickGroup((4, 5, 6, 7), "bank_angle", mirrored=True),
+            JoystickGroup((8,), "vowel_angle"),
+            JoystickGroup((9,), "vowel_angle", mirrored=True),
+        ),
+    )
@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from typing import Hashable
+
+from PyQt5.QtCore import (
+    Qt,
+    QObject,
+    QRectF,
+    pyqtSignal,
+)
+from PyQt5.QtGui import (
+    QColor,
+    QFont,
+    QFontMetrics,
+    QPainter,
+    QPixmap,
+)
+
+from .constants import KEY_STATE_COLORS
+
+
+class KeyPixmapAtlas(QObject):
+    """Cache of pre-rendered key backgrounds, per highlight state and size, and of rasterized key labels, shared by all
+    key widgets. While enabled, key widgets paint themselves by drawing these pixmaps instead of going through the
+    style engine. Pixmaps are keyed by everything they depend on, including the device pixel ratio and font, so DPI
+    and size changes produce new pixmaps; the least recently used ones are dropped once the cache is full."""
+
+    enabled_change = pyqtSignal()
+
+
+    def __init__(self, max_pixmaps: int=1024):
+        super().__init__()
+
+        self.__enabled = False
+        self.__max_pixmaps = max_pixmaps
+        self.__pixmaps: OrderedDict[Hashable, QPixmap] = OrderedDict()
+
+    @property
+    def enabled(self):
+        return self.__enabled
+
+    @enabled.setter
+    def enabled(self, enabled: bool):
+        if enabled == self.__enabled: return
+
+        self.__enabled = enabled
+        if not enabled:
+            self.__pixmaps.clear()
+        self.enabled_change.emit()
+
+    def background(self, state: str, width: int, height: int, device_pixel_ratio: float) -> QPixmap:
+        """:param state: Key of `KEY_STATE_COLORS`."""
+
+        cache_key = ("background", state, width, height, device_pixel_ratio)
+        pixmap = self.__get(cache_key)
+        if pixmap is not None: return pixmap
+
+        background, (top, right, bottom, left) = KEY_STATE_COLORS[state]
+
+        pixmap = _new_pixmap(width, height, device_pixel_ratio)
+        painter = QPainter(pixmap)
+        painter.fillRect(0, 0, width, height, QColor(background))
+        painter.fillRect(0, 0, width, 1, QColor(top))
+        painter.fillRect(width - 1, 0, 1, height, QColor(right))
+        painter.fillRect(0, height - 1, width, 1, QColor(bottom))
+        painter.fillRect(0, 0, 1, height, QColor(left))
+        painter.end()
+
+        return self.__put(cache_key, pixmap)
+
+    def label(self, text: str, font: QFont, color: QColor, device_pixel_ratio: float) -> QPixmap:
+        cache_key = ("label", text, font.key(), color.rgba(), device_pixel_ratio)
+        pixmap = self.__get(cache_key)
+        if pixmap is not None: return pixmap
+
+        size = QFontMetrics(font).size(0, text)
+
+        pixmap = _new_pixmap(max(size.width(), 1), max(size.height(), 1), device_pixel_ratio)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.setFont(font)
+        painter.setPen(color)
+        painter.drawText(QRectF(0, 0, size.width(), size.height()), Qt.AlignCenter, text)
+        painter.end()
+
+        return self.__put(cache_key, pixmap)
+
+    def __get(self, cache_key: Hashable) -> "QPixmap | None":
+        pixmap = self.__pixmaps.get(cache_key)
+        if pixmap is not None:
+            self.__pixmaps.move_to_end(cache_key)
+        return pixmap
+
+    def __put(self, cache_key: Hashable, pixmap: QPixmap):
+        self.__pixmaps[cache_key] = pixmap
+        if len(self.__pixmaps) > self.__max_pixmaps:
+            self.__pixmaps.popitem(last=False)
+        return pixmap
+
+
+def _new_pixmap(width: int, height: int, device_pixel_ratio: float):
+    """Creates a transparent pixmap with the given size in device-independent px."""
+
+    pixmap = QPixmap(round(width * device_pixel_ratio), round(height * device_pixel_ratio))
+    pixmap.setDevicePixelRatio(device_pixel_ratio)
+    pixmap.fill(Qt.transparent)
+    return pixmap
+
+
+key_pixmap_atlas = KeyPixmapAtlas()
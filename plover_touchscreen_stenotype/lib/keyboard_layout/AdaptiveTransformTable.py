@@ -0,0 +1,134 @@
+from array import array
+from typing import Callable
+
+from ..util import Point
+
+
+class AdaptiveTransformTable:
+    """Adaptive transform state of every key group in a layout, held in contiguous arrays.
+
+    Key groups are given slots in build order, which is depth-first, so the key groups under any group occupy a
+    contiguous range of slots. At the end of a stroke, the averages for every adaptive group are then computed from
+    prefix sums in a single pass over the slots, rather than per group.
+
+    Displacements are stored in device coordinates, in cm.
+    """
+
+    def __init__(self):
+        self.__this_stroke_x = array("d")
+        self.__this_stroke_y = array("d")
+        self.__has_this_stroke = array("b")
+
+        self.__last_x = array("d")
+        self.__last_y = array("d")
+
+        self.__group_ranges: list[tuple[int, int]] = []
+        self.__group_handlers: list[Callable[[Point, Point], None]] = []
+
+    @property
+    def n_slots(self):
+        return len(self.__last_x)
+
+    def add_slot(self) -> int:
+        """Allocates the slot of a key group.
+
+            :returns: The index of the new slot.
+        """
+        for column in (self.__this_stroke_x, self.__this_stroke_y, self.__last_x, self.__last_y):
+            column.append(0)
+        self.__has_this_stroke.append(0)
+        return len(self.__last_x) - 1
+
+    def add_group(self, start: int, end: int, on_averages: Callable[[Point, Point], None]):
+        """Registers an adaptive group spanning the slots in `[start, end)`.
+
+            :param on_averages: Called at the end of each stroke in which any key group in the range was displaced,
+            with the average displacement this stroke and the average overall displacement of the range.
+        """
+        self.__group_ranges.append((start, end))
+        self.__group_handlers.append(on_averages)
+
+    def set_displacement_this_stroke(self, slot: int, displacement: "Point | None"):
+        if displacement is None:
+            self.__has_this_stroke[slot] = 0
+            return
+
+        self.__this_stroke_x[slot] = displacement.x
+        self.__this_stroke_y[slot] = displacement.y
+        self.__has_this_stroke[slot] = 1
+
+    def set_last_displacement(self, slot: int, displacement: Point):
+        self.__last_x[slot] = displacement.x
+        self.__last_y[slot] = displacement.y
+
+    def clear_slot(self, slot: int):
+        self.__this_stroke_x[slot] = 0
+        self.__this_stroke_y[slot] = 0
+        self.__has_this_stroke[slot] = 0
+        self.__last_x[slot] = 0
+        self.__last_y[slot] = 0
+
+    def apply_stroke_averages(self):
+        """Computes the averages of every registered group, clears the displacements of this stroke, and then calls
+        the handlers of the groups that had any displacement this stroke.
+        """
+
+        n_slots = self.n_slots
+        this_stroke_x = self.__this_stroke_x
+        this_stroke_y = self.__this_stroke_y
+        has_this_stroke = self.__has_this_stroke
+        last_x = self.__last_x
+        last_y = self.__last_y
+
+        # Prefix sums; index `i` holds the sum over slots `[0, i)`
+        count_prefix = [0] * (n_slots + 1)
+        this_stroke_x_prefix = [0.] * (n_slots + 1)
+        this_stroke_y_prefix = [0.] * (n_slots + 1)
+        last_x_prefix = [0.] * (n_slots + 1)
+        last_y_prefix = [0.] * (n_slots + 1)
+
+        for i in range(n_slots):
+            if has_this_stroke[i]:
+                count_prefix[i + 1] = count_prefix[i] + 1
+                this_stroke_x_prefix[i + 1] = this_stroke_x_prefix[i] + this_stroke_x[i]
+                this_stroke_y_prefix[i + 1] = this_stroke_y_prefix[i] + this_stroke_y[i]
+            else:
+                count_prefix[i + 1] = count_prefix[i]
+                this_stroke_x_prefix[i + 1] = this_stroke_x_prefix[i]
+                this_stroke_y_prefix[i + 1] = this_stroke_y_prefix[i]
+
+            last_x_prefix[i + 1] = last_x_prefix[i] + last_x[i]
+            last_y_prefix[i + 1] = last_y_prefix[i] + last_y[i]
+
+
+        averages: list[tuple[Callable[[Point, Point], None], Point, Point]] = []
+
+        for (start, end), handler in zip(self.__group_ranges, self.__group_handlers):
+            n_displaced = count_prefix[end] - count_prefix[start]
+            if n_displaced == 0: continue
+
+            n_groups = end - start
+
+            sum_x_this_stroke = this_stroke_x_prefix[end] - this_stroke_x_prefix[start]
+            sum_y_this_stroke = this_stroke_y_prefix[end] - this_stroke_y_prefix[start]
+            avg_x_this_stroke = sum_x_this_stroke / n_displaced
+            avg_y_this_stroke = sum_y_this_stroke / n_displaced
+
+            # Key groups without a displacement this stroke are assumed to have moved with the average
+            sum_x = last_x_prefix[end] - last_x_prefix[start] + sum_x_this_stroke + (n_groups - n_displaced) * avg_x_this_stroke
+            sum_y = last_y_prefix[end] - last_y_prefix[start] + sum_y_this_stroke + (n_groups - n_displaced) * avg_y_this_stroke
+
+            averages.append((
+                handler,
+                Point(avg_x_this_stroke, avg_y_this_stroke),
+                Point(sum_x / n_groups, sum_y / n_groups),
+            ))
+
+
+        for i in range(n_slots):
+            has_this_stroke[i] = 0
+
+        # Handlers are called only after every average has been computed, since they cause the key groups to write
+        # their new last displacements back into the table
+        for handler, avg_displacement_this_stroke, avg_displacement in averages:
+            handler(avg_displacement_this_stroke, avg_displacement)
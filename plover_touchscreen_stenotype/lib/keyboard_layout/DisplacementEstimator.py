@@ -0,0 +1,122 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from statistics import median
+
+
+"""The factor any change in displacement will be multiplied by. Useful for counteracting misstrokes and generally avoiding drastic movements."""
+ADAPTATION_RATE = 0.125
+
+
+class DisplacementEstimator(ABC):
+    """Estimates the adaptive displacement of one key group from the points where its keys are released.
+
+    Displacements and release points are in the key group's local coordinates, in cm, relative to the undisplaced key
+    centers. Implementations keep a constant amount of state. This module does not depend on Qt so that estimators can
+    be evaluated offline.
+    """
+
+    @abstractmethod
+    def estimate(self, current: tuple[float, float], observed: tuple[float, float]) -> tuple[float, float]:
+        """Computes the displacement that would result from a release at `observed`, without recording it. May be
+        called several times in a stroke as further touches are released.
+
+            :param current: The current displacement of the key group.
+            :param observed: The release point.
+        """
+
+    def commit(self, current: tuple[float, float], observed: tuple[float, float]):
+        """Records the last release point of a stroke."""
+        pass
+
+    def reset(self):
+        pass
+
+
+class EmaDisplacementEstimator(DisplacementEstimator):
+    """Moves the displacement a fixed fraction of the way toward each release point."""
+
+    def __init__(self, rate: float=ADAPTATION_RATE):
+        self.__rate = rate
+
+    def estimate(self, current: tuple[float, float], observed: tuple[float, float]):
+        return (
+            current[0] + (observed[0] - current[0]) * self.__rate,
+            current[1] + (observed[1] - current[1]) * self.__rate,
+        )
+
+
+class MedianDisplacementEstimator(DisplacementEstimator):
+    """Uses the per-axis median of the last few release points, which ignores occasional outlying touches."""
+
+    def __init__(self, window_size: int=5):
+        self.__xs: deque[float] = deque(maxlen=window_size)
+        self.__ys: deque[float] = deque(maxlen=window_size)
+
+    def estimate(self, current: tuple[float, float], observed: tuple[float, float]):
+        return (
+            median((*self.__xs, observed[0])),
+            median((*self.__ys, observed[1])),
+        )
+
+    def commit(self, current: tuple[float, float], observed: tuple[float, float]):
+        self.__xs.append(observed[0])
+        self.__ys.append(observed[1])
+
+    def reset(self):
+        self.__xs.clear()
+        self.__ys.clear()
+
+
+class KalmanDisplacementEstimator(DisplacementEstimator):
+    """Per-axis Kalman filter with a constant-position model. The gain starts high so the layout settles quickly, then
+    decreases toward a steady state set by the ratio of the drift and scatter variances.
+    """
+
+    def __init__(
+        self,
+        drift_variance: float=0.05**2,
+        scatter_variance: float=0.4**2,
+        initial_variance: float=0.2**2,
+    ):
+        """
+            :param drift_variance: Variance (cm²) of how far the hand position is expected to drift between strokes.
+            :param scatter_variance: Variance (cm²) of release points around the hand position.
+        """
+
+        self.__drift_variance = drift_variance
+        self.__scatter_variance = scatter_variance
+        self.__initial_variance = initial_variance
+
+        self.__variance = initial_variance
+
+    def __gain(self):
+        predicted_variance = self.__variance + self.__drift_variance
+        return predicted_variance / (predicted_variance + self.__scatter_variance), predicted_variance
+
+    def estimate(self, current: tuple[float, float], observed: tuple[float, float]):
+        gain, _ = self.__gain()
+        return (
+            current[0] + (observed[0] - current[0]) * gain,
+            current[1] + (observed[1] - current[1]) * gain,
+        )
+
+    def commit(self, current: tuple[float, float], observed: tuple[float, float]):
+        gain, predicted_variance = self.__gain()
+        self.__variance = (1 - gain) * predicted_variance
+
+    def reset(self):
+        self.__variance = self.__initial_variance
+
+
+DEFAULT_DISPLACEMENT_ESTIMATOR_NAME = "Moving average"
+
+DISPLACEMENT_ESTIMATORS: "dict[str, type[DisplacementEstimator]]" = {
+    "Moving average": EmaDisplacementEstimator,
+    "Median": MedianDisplacementEstimator,
+    "Kalman filter": KalmanDisplacementEstimator,
+}
+
+
+def build_displacement_estimator(name: str) -> DisplacementEstimator:
+    estimator_class = DISPLACEMENT_ESTIMATORS.get(name) or DISPLACEMENT_ESTIMATORS[DEFAULT_DISPLACEMENT_ESTIMATOR_NAME]
+    return estimator_class()
@@ -5,8 +5,6 @@ from ..reactivity import Ref
 from ..util import Point
 
 
-"""The factor any change in displacement will be multiplied by. Useful for counteracting misstrokes and generally avoiding drastic movements."""
-ADAPTATION_RATE = 0.125
 MEAN_DEVIATION_FACTOR = 0.75
 
 
@@ -25,7 +23,7 @@ KeyGridTuple = tuple[
 ]
 SizeTuple = tuple[Ref[float]]
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Key:
     steno: str
     label: "str | Ref[str]" = ""
@@ -54,6 +52,8 @@ class GroupOrganizationType(Enum):
     GRID = auto()
 
 class GroupOrganization:
+    __slots__ = ("type", "width", "height", "col_widths", "row_heights")
+
     def __init__(
         self,
         type: GroupOrganizationType,
@@ -86,7 +86,7 @@ class GroupOrganization:
 
 GroupOrganization.AUTO = GroupOrganization(GroupOrganizationType.AUTO)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Group:
     elements: "tuple[Group | KeyGroup, ...]"
 
@@ -98,7 +98,7 @@ class Group:
 
     adaptive_transform: bool = False
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class KeyGroup:
     elements: "tuple[Key, ...]"
     
@@ -113,7 +113,7 @@ class KeyGroup:
 
     adaptive_transform: bool = True
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LayoutDescriptor:
     elements: "tuple[Group | KeyGroup, ...]"
     out_center_diff: "Ref[float] | None" = None
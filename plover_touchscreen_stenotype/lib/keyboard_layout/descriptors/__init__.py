@@ -1,17 +1,41 @@
-from . import (
-    english_stenotype_ireland,
-    english_stenotype_lapwing,
-    english_stenotype_amphitheory,
-    english_velotype
-)
+from collections.abc import Mapping
+from importlib import import_module
+from typing import Callable, Iterator, TYPE_CHECKING
+if TYPE_CHECKING:
+    from ....settings import Settings
+    from ....widgets.keyboard.KeyboardWidget import KeyboardWidget
+    from ..LayoutDescriptor import LayoutDescriptor
+
+    LayoutDescriptorBuilder = Callable[[Settings, KeyboardWidget], LayoutDescriptor]
+else:
+    LayoutDescriptorBuilder = Callable
+
+
+class _LazyLayoutBuilders(Mapping[str, LayoutDescriptorBuilder]):
+    """Maps layout names to the `build_layout_descriptor` functions of their modules, which are only imported when a
+    layout is first built (e.g., listing the names for the settings dialog imports none of them)."""
+
+    def __init__(self, module_names: dict[str, str]):
+        self.__module_names = module_names
+
+    def __getitem__(self, layout_name: str) -> LayoutDescriptorBuilder:
+        module = import_module(f".{self.__module_names[layout_name]}", __name__)
+        return module.build_layout_descriptor
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__module_names)
+
+    def __len__(self):
+        return len(self.__module_names)
+
 
 DEFAULT_KEYBOARD_LAYOUT_NAME = "English stenotype (Lapwing)"
 
-KEYBOARD_LAYOUT_BUILDERS = {
-    "English stenotype (Ireland)": english_stenotype_ireland.build_layout_descriptor,
-    # "English stenotype (Ireland extended)": english_stenotype_lapwing.build_layout_descriptor,
-    "English stenotype (Lapwing)": english_stenotype_lapwing.build_layout_descriptor,
-    "English stenotype (Amphitheory)": english_stenotype_amphitheory.build_layout_descriptor,
-    "English velotype": english_velotype.build_layout_descriptor,
-    # "English palantype": english_stenotype_amphitheory.build_layout_descriptor,
-}
\ No newline at end of file
+KEYBOARD_LAYOUT_BUILDERS = _LazyLayoutBuilders({
+    "English stenotype (Ireland)": "english_stenotype_ireland",
+    # "English stenotype (Ireland extended)": "english_stenotype_lapwing",
+    "English stenotype (Lapwing)": "english_stenotype_lapwing",
+    "English stenotype (Amphitheory)": "english_stenotype_amphitheory",
+    "English velotype": "english_velotype",
+    # "English palantype": "english_stenotype_amphitheory",
+})
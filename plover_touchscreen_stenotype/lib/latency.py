@@ -0,0 +1,206 @@
+from array import array
+from contextlib import contextmanager
+from enum import IntEnum
+import time
+
+from PyQt5.QtCore import (
+    QObject,
+    pyqtSignal,
+)
+
+
+class LatencyStage(IntEnum):
+    RECEIPT = 0
+    """Delay from the touch event's timestamp until the widget receives it, beyond the smallest delay seen so far. The
+    event timestamps come from a clock with an unknown epoch, so only this relative delay can be measured."""
+    HIT_TEST = 1
+    """From event receipt until the touches have been resolved to keys"""
+    STROKE_ASSEMBLY = 2
+    """From event receipt until the current stroke reflects the event"""
+    PREVIEW_LOOKUP = 3
+    """Duration of the stroke preview's dictionary lookup"""
+    ENGINE_DISPATCH = 4
+    """From receipt of the event that ended a stroke until the stroke has been sent to the engine"""
+    STROKED = 5
+    """From receipt of the event that ended a stroke until the engine's `stroked` hook reaches the stenotype"""
+
+LATENCY_STAGE_LABELS = {
+    LatencyStage.RECEIPT: "Event receipt",
+    LatencyStage.HIT_TEST: "Hit test",
+    LatencyStage.STROKE_ASSEMBLY: "Stroke assembly",
+    LatencyStage.PREVIEW_LOOKUP: "Preview lookup",
+    LatencyStage.ENGINE_DISPATCH: "Engine dispatch",
+    LatencyStage.STROKED: "Stroked",
+}
+
+
+class LatencyHistogram:
+    """Histogram of durations in µs with logarithmically sized buckets, in the style of HdrHistogram. Each power of 2
+    is split into `2 ** sub_bucket_bits` buckets, so values are kept to within a relative error of
+    `2 ** -sub_bucket_bits` in constant memory, and recording a value takes a few integer operations."""
+
+    def __init__(self, sub_bucket_bits: int=4, max_value_bits: int=36):
+        self.__sub_bucket_bits = sub_bucket_bits
+        self.__sub_bucket_count = 1 << sub_bucket_bits
+        self.__max_value = (1 << max_value_bits) - 1
+
+        n_buckets = (max_value_bits - sub_bucket_bits + 1) * self.__sub_bucket_count
+        self.__counts = array("Q", (0,) * n_buckets)
+
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int):
+        value = min(max(value, 0), self.__max_value)
+
+        shift = max(value.bit_length() - self.__sub_bucket_bits - 1, 0)
+        self.__counts[(shift << self.__sub_bucket_bits) + (value >> shift)] += 1
+
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percentile: float) -> int:
+        """Finds the lower bound of the bucket containing the given percentile (0–100) of the recorded values."""
+
+        if self.count == 0: return 0
+
+        threshold = max(1, round(self.count * percentile / 100))
+        cumulative_count = 0
+        for index, count in enumerate(self.__counts):
+            cumulative_count += count
+            if cumulative_count >= threshold:
+                return self.__bucket_value(index)
+
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count > 0 else 0
+
+    def reset(self):
+        for index in range(len(self.__counts)):
+            self.__counts[index] = 0
+
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def __bucket_value(self, index: int):
+        if index < 2 * self.__sub_bucket_count:
+            return index
+
+        shift = (index >> self.__sub_bucket_bits) - 1
+        return (index - (shift << self.__sub_bucket_bits)) << shift
+
+
+class LatencyTracker(QObject):
+    """Records how long each stage between a touch event and the resulting stroke takes. There is one tracker per
+    process, `latency_tracker`, since strokes from the stenotype pass through several unrelated objects."""
+
+    stroke_finished = pyqtSignal()
+
+
+    def __init__(self):
+        super().__init__()
+
+        self.histograms = {stage: LatencyHistogram() for stage in LatencyStage}
+        self.last_stroke_latency: "int | None" = None
+        """µs from the receipt of the event that ended the last stroke until its `stroked` hook"""
+
+        self.__event_start = 0
+        self.__stroke_start: "int | None" = None
+        self.__min_receipt_offset: "int | None" = None
+
+    def begin_event(self, event_timestamp: int):
+        """Marks the receipt of a touch event.
+
+            :param event_timestamp: The event's timestamp (`QInputEvent.timestamp`), in ms.
+        """
+
+        now = time.perf_counter_ns()
+        self.__event_start = now
+
+        receipt_offset = now // 1000 - event_timestamp * 1000
+        if self.__min_receipt_offset is None or receipt_offset < self.__min_receipt_offset:
+            self.__min_receipt_offset = receipt_offset
+        self.histograms[LatencyStage.RECEIPT].record(receipt_offset - self.__min_receipt_offset)
+
+    def record(self, stage: LatencyStage):
+        """Records the time since the last event receipt."""
+        self.histograms[stage].record((time.perf_counter_ns() - self.__event_start) // 1000)
+
+    def begin_stroke(self):
+        """Marks that the last received event ended a stroke."""
+        self.__stroke_start = self.__event_start
+
+    def record_stroke(self, stage: LatencyStage):
+        """Records the time since the receipt of the event that ended the current stroke."""
+
+        if self.__stroke_start is None: return
+
+        latency = (time.perf_counter_ns() - self.__stroke_start) // 1000
+        self.histograms[stage].record(latency)
+
+        if stage == LatencyStage.STROKED:
+            self.__stroke_start = None
+            self.last_stroke_latency = latency
+            self.stroke_finished.emit()
+
+    @contextmanager
+    def measure(self, stage: LatencyStage):
+        """Records the duration of the `with` block."""
+
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.histograms[stage].record((time.perf_counter_ns() - start) // 1000)
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+        self.last_stroke_latency = None
+        self.__min_receipt_offset = None
+
+    def report(self) -> str:
+        lines = [f"{'Stage':<16} {'Count':>7} {'Mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'Max':>8}   (ms)"]
+        for stage, histogram in self.histograms.items():
+            lines.append(
+                f"{LATENCY_STAGE_LABELS[stage]:<16} {histogram.count:>7}"
+                + "".join(f" {value / 1000:>8.2f}" for value in (
+                    histogram.mean,
+                    histogram.percentile(50),
+                    histogram.percentile(95),
+                    histogram.percentile(99),
+                    histogram.max,
+                ))
+            )
+        return "\n".join(lines)
+
+
+class PhaseTimer:
+    """Measures the durations of consecutive phases of a one-off process, such as opening the stenotype window."""
+
+    def __init__(self):
+        self.__start = self.__last_mark = time.perf_counter_ns()
+        self.phases: list[tuple[str, int]] = []
+        """Names of finished phases and their durations in ns"""
+
+    def mark(self, phase_name: str):
+        """Ends the current phase, naming it `phase_name`, and starts the next one."""
+
+        now = time.perf_counter_ns()
+        self.phases.append((phase_name, now - self.__last_mark))
+        self.__last_mark = now
+
+    def report(self) -> str:
+        return ", ".join(
+            f"{phase_name} {duration / 1_000_000:.1f} ms" for phase_name, duration in self.phases
+        ) + f" (total {(self.__last_mark - self.__start) / 1_000_000:.1f} ms)"
+
+
+latency_tracker = LatencyTracker()
@@ -0,0 +1,116 @@
+from collections import Counter
+import time
+
+from PyQt5.QtGui import (
+    QPaintEvent,
+    QPainter,
+)
+from PyQt5.QtWidgets import (
+    QGraphicsView,
+    QGraphicsScene,
+    QGraphicsProxyWidget,
+    QStyleOptionGraphicsItem,
+    QWidget,
+)
+
+from .latency import LatencyHistogram
+
+
+class PaintProfiler:
+    """Records how long the stenotype's graphics views take to paint each frame and how long each proxy widget takes
+    to paint. There is one profiler per process, `paint_profiler`, which is disabled until `enabled` is set."""
+
+    def __init__(self):
+        self.enabled = False
+
+        self.frame_times = LatencyHistogram()
+        """µs spent in each `paintEvent` of a profiled view"""
+        self.n_region_rects = 0
+        self.max_region_rects = 0
+        self.repainted_area = 0
+        """Total px² of the repainted regions' bounding rects"""
+
+        self.item_counts: Counter[str] = Counter()
+        self.item_ns: Counter[str] = Counter()
+
+    def record_frame(self, duration_ns: int, event: QPaintEvent):
+        region = event.region()
+        n_rects = region.rectCount()
+        bounds = region.boundingRect()
+
+        self.frame_times.record(duration_ns // 1000)
+        self.n_region_rects += n_rects
+        self.max_region_rects = max(self.max_region_rects, n_rects)
+        self.repainted_area += bounds.width() * bounds.height()
+
+    def record_item(self, name: str, duration_ns: int):
+        self.item_counts[name] += 1
+        self.item_ns[name] += duration_ns
+
+    def reset(self):
+        self.frame_times.reset()
+        self.n_region_rects = 0
+        self.max_region_rects = 0
+        self.repainted_area = 0
+        self.item_counts.clear()
+        self.item_ns.clear()
+
+    def report(self, item_limit: int=20) -> str:
+        frame_times = self.frame_times
+        n_frames = frame_times.count
+        if n_frames == 0:
+            return "No frames painted"
+
+        lines = [
+            f"{n_frames} frames: mean {frame_times.mean / 1000:.2f} ms, p50 {frame_times.percentile(50) / 1000:.2f} ms, p95 {frame_times.percentile(95) / 1000:.2f} ms, p99 {frame_times.percentile(99) / 1000:.2f} ms, max {frame_times.max / 1000:.2f} ms",
+            f"Repaint regions: {self.n_region_rects / n_frames:.1f} rects/frame (max {self.max_region_rects}), {self.repainted_area / n_frames:.0f} px²/frame",
+            f"{'Paints':>8} {'Total':>9} {'Mean':>8}   (ms)  Item",
+        ]
+        for name, total_ns in self.item_ns.most_common(item_limit):
+            count = self.item_counts[name]
+            lines.append(f"{count:>8} {total_ns / 1e6:>9.2f} {total_ns / count / 1e6:>8.3f}         {name}")
+        return "\n".join(lines)
+
+
+paint_profiler = PaintProfiler()
+
+
+class ProfiledGraphicsView(QGraphicsView):
+    """`QGraphicsView` whose paints are recorded by `paint_profiler` while it is enabled"""
+
+    def paintEvent(self, event: QPaintEvent):
+        """(override)"""
+
+        if not paint_profiler.enabled:
+            return super().paintEvent(event)
+
+        start = time.perf_counter_ns()
+        super().paintEvent(event)
+        paint_profiler.record_frame(time.perf_counter_ns() - start, event)
+
+
+class ProfiledGraphicsProxyWidget(QGraphicsProxyWidget):
+    """`QGraphicsProxyWidget` whose paints are recorded by `paint_profiler`, under `name`, while it is enabled"""
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.__name = name
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: "QWidget | None"=None):
+        """(override)"""
+
+        if not paint_profiler.enabled:
+            return super().paint(painter, option, widget)
+
+        start = time.perf_counter_ns()
+        super().paint(painter, option, widget)
+        paint_profiler.record_item(self.__name, time.perf_counter_ns() - start)
+
+
+def add_profiled_widget(scene: QGraphicsScene, widget: QWidget, name: str) -> ProfiledGraphicsProxyWidget:
+    """Equivalent of `QGraphicsScene.addWidget` that uses a `ProfiledGraphicsProxyWidget`."""
+
+    proxy = ProfiledGraphicsProxyWidget(name)
+    proxy.setWidget(widget)
+    scene.addItem(proxy)
+    return proxy
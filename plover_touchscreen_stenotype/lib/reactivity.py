@@ -5,7 +5,13 @@ from PyQt5.QtCore import (
     pyqtBoundSignal,
 )
 
+from collections import Counter
+from contextlib import contextmanager
 from functools import partial
+import inspect
+import os
+from pathlib import Path
+import time
 from typing import TypeVar, Generic, Any, Callable, Iterable, cast
 
 
@@ -73,8 +79,12 @@ class Ref(QObject, Generic[T]):
     def value(self, value: T):
         old_value = self.__value
         self.__value = value
-        if value is not old_value:
-            self.change.emit(value)
+        if value is old_value: return
+
+        if _batch_depth > 0:
+            _batched_refs.setdefault(self, old_value)
+            return
+        self.change.emit(value)
 
     def set(self, value: T):
         """Alias for `value` setter"""
@@ -82,6 +92,9 @@ class Ref(QObject, Generic[T]):
         self.value = value
 
     def emit(self):
+        if _batch_depth > 0:
+            _batched_refs[self] = _FORCE_EMIT
+            return
         self.change.emit(self.__value)
 
     @staticmethod
@@ -157,11 +170,12 @@ def _create_computed(handler: Callable[[], T]):
         # ref.blockSignals(True)
         # QTimer.singleShot(0, lambda: ref.blockSignals(False))
 
-    return ref, recompute_value
+    return ref, _trace(recompute_value, _handler_name(handler))
 
 
 def computed(handler: Callable[[], T], *dependency_refs: Ref[Any]):
     ref, recompute = _create_computed(handler)
+    recompute = _coalesced_in_batches(recompute)
     for dependency in dependency_refs:
         dependency.change.connect(recompute)
 
@@ -170,6 +184,7 @@ def computed(handler: Callable[[], T], *dependency_refs: Ref[Any]):
 
 def computed_on_signals(handler: Callable[[], T], *dependency_signals: pyqtBoundSignal):
     ref, recompute = _create_computed(handler)
+    recompute = _coalesced_in_batches(recompute)
     for dependency in dependency_signals:
         _connect(dependency, recompute, parent=ref)
 
@@ -179,7 +194,7 @@ def computed_on_signals(handler: Callable[[], T], *dependency_signals: pyqtBound
 def _connect(signal: pyqtBoundSignal, handler: Callable[..., None], parent: "QObject | None"=None):
     # Disconnecting using `connection` instead of `handler` allows errors to be caught properly when attempting to
     # disconnect after the signal parents have been destroyed (why?)
-    connection = signal.connect(handler)
+    connection = signal.connect(_trace(handler))
 
     if parent is not None:
         @on(parent.destroyed)
@@ -215,7 +230,8 @@ def _connect_many(signals: Iterable[pyqtBoundSignal], handler: Callable[..., Non
 
 
     # connections = tuple(signal.connect(call_later) for signal in signals)
-    connections = tuple(signal.connect(handler) for signal in signals)
+    traced_handler = _coalesced_in_batches(_trace(handler))
+    connections = tuple(signal.connect(traced_handler) for signal in signals)
 
     if parent is not None:
         @on(parent.destroyed)
@@ -254,7 +270,7 @@ def watch(signal: pyqtBoundSignal, parent: "QObject | None"=None):
     """
 
     def run_and_connect(handler: Callable[..., None]):
-        handler()
+        _trace(handler)()
         return _connect(signal, handler, parent=parent)
 
     return run_and_connect
@@ -267,7 +283,228 @@ def watch_many(*signals: pyqtBoundSignal, parent: "QObject | None"=None):
     """
 
     def run_and_connect(handler: Callable[..., None]):
-        handler()
+        _trace(handler)()
         return _connect_many(signals, handler, parent=parent)
 
-    return run_and_connect
\ No newline at end of file
+    return run_and_connect
+
+
+#region Batching
+
+_batch_depth = 0
+_batched_refs: "dict[Ref[Any], Any]" = {}
+"""Refs changed during the current batch, in order of first change, each with its value from before the batch"""
+_FORCE_EMIT = object()
+"""Marks refs in `_batched_refs` that were explicitly emitted, e.g., because their value was mutated in place"""
+_flushing = False
+_pending_calls: "dict[Callable[..., Any], tuple[Any, ...]]" = {}
+"""Handlers with several dependencies that were triggered while flushing a batch, with their latest arguments"""
+
+@contextmanager
+def batch():
+    """Context manager that defers the `change` signals of refs changed inside it until it exits, so that dependents
+    see all of the changes at once. Each changed ref then emits once, and only if its value differs from the one it
+    had before the batch. Handlers with several dependencies (`computed`, `on_many`, `watch_many`) run once for all
+    of the changes to their dependencies, and refs they change are emitted the same way afterward. Batches can be
+    nested; signals are emitted when the outermost one exits."""
+
+    global _batch_depth
+
+    _batch_depth += 1
+    try:
+        yield
+    finally:
+        _batch_depth -= 1
+        if _batch_depth == 0:
+            _flush_batch()
+
+def _flush_batch():
+    global _batch_depth
+    global _flushing
+
+    # Changes made by the handlers are batched too, and emitted in the next round
+    _batch_depth += 1
+    _flushing = True
+    error: "BaseException | None" = None
+    try:
+        while len(_batched_refs) > 0 or len(_pending_calls) > 0:
+            changed_refs = tuple(_batched_refs.items())
+            _batched_refs.clear()
+
+            for ref, old_value in changed_refs:
+                if old_value is not _FORCE_EMIT and (ref.value is old_value or ref.value == old_value): continue
+                ref.change.emit(ref.value)
+
+            pending_calls = tuple(_pending_calls.items())
+            _pending_calls.clear()
+
+            # A failing handler does not keep the rest from seeing the changes; the first error is raised afterward
+            for handler, args in pending_calls:
+                try:
+                    handler(*args)
+                except Exception as handler_error:
+                    if error is None:
+                        error = handler_error
+    finally:
+        _flushing = False
+        _batch_depth -= 1
+        _batched_refs.clear()
+        _pending_calls.clear()
+
+    if error is not None:
+        raise error
+
+def _coalesced_in_batches(handler: Callable[..., Any]) -> Callable[..., Any]:
+    """Wraps a handler so that while a batch is flushing, it is queued to run once rather than on every signal."""
+
+    n_args = _positional_arg_count(handler)
+
+    def coalesced_handler(*args: Any):
+        # Qt passes every signal argument to the wrapper, so drop the ones the handler does not take, as PyQt would
+        if n_args is not None:
+            args = args[:n_args]
+
+        if _flushing:
+            _pending_calls[handler] = args
+            return
+        return handler(*args)
+
+    return coalesced_handler
+
+#endregion
+
+
+#region Tracing
+
+TRACING_ENVIRONMENT_VARIABLE = "PLOVER_TOUCHSCREEN_STENOTYPE_TRACE_REACTIVITY"
+"""Tracing is enabled at import if this is set to `1`, `true` or `yes`"""
+
+class _ReactivityTracer:
+    """Times the handlers connected through this module. Since Qt calls directly connected handlers synchronously, the
+    handlers running when a handler is called are the chain of handlers that triggered it."""
+
+    def __init__(self):
+        self.counts: Counter[str] = Counter()
+        self.cumulative_ns: Counter[str] = Counter()
+        self.self_ns: Counter[str] = Counter()
+        self.stack_self_ns: Counter[tuple[str, ...]] = Counter()
+        """Self time of each trigger chain, for flame graphs"""
+
+        self.__stack: list[str] = []
+        self.__child_ns: list[int] = []
+
+    def wrap(self, handler: Callable[..., Any], name: str) -> Callable[..., Any]:
+        n_args = _positional_arg_count(handler)
+
+        def traced_handler(*args: Any):
+            # Qt passes every signal argument to the wrapper, so drop the ones the handler does not take, as PyQt would
+            if n_args is not None:
+                args = args[:n_args]
+
+            stack = self.__stack
+            child_ns = self.__child_ns
+
+            stack.append(name)
+            child_ns.append(0)
+            start = time.perf_counter_ns()
+            try:
+                return handler(*args)
+            finally:
+                elapsed = time.perf_counter_ns() - start
+                chain = tuple(stack)
+
+                stack.pop()
+                self_elapsed = elapsed - child_ns.pop()
+                if len(child_ns) > 0:
+                    child_ns[-1] += elapsed
+
+                self.counts[name] += 1
+                self.cumulative_ns[name] += elapsed
+                self.self_ns[name] += self_elapsed
+                self.stack_self_ns[chain] += self_elapsed
+
+        traced_handler.__reactivity_traced__ = True
+        return traced_handler
+
+    def reset(self):
+        self.counts.clear()
+        self.cumulative_ns.clear()
+        self.self_ns.clear()
+        self.stack_self_ns.clear()
+
+    def report(self, limit: int=40) -> str:
+        lines = [f"{'Calls':>8} {'Cumulative':>11} {'Self':>9}   (ms)  Handler"]
+        for name, cumulative_ns in self.cumulative_ns.most_common(limit):
+            lines.append(f"{self.counts[name]:>8} {cumulative_ns / 1e6:>11.2f} {self.self_ns[name] / 1e6:>9.2f}         {name}")
+        return "\n".join(lines)
+
+    def write_folded_stacks(self, path: Path):
+        """Writes self times in µs in the folded stack format read by flamegraph.pl, speedscope and similar tools."""
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            for chain, self_ns in self.stack_self_ns.items():
+                file.write(f"{';'.join(chain)} {self_ns // 1000}\n")
+
+
+_tracer: "_ReactivityTracer | None" = None
+
+
+def enable_tracing():
+    """Traces the handlers connected from now on. Handlers connected earlier are not traced."""
+
+    global _tracer
+    if _tracer is None:
+        _tracer = _ReactivityTracer()
+
+def tracing_enabled():
+    return _tracer is not None
+
+def reset_tracing():
+    if _tracer is None: return
+    _tracer.reset()
+
+def tracing_report() -> str:
+    if _tracer is None: return ""
+    return _tracer.report()
+
+def write_tracing_folded_stacks(path: Path):
+    if _tracer is None: return
+    _tracer.write_folded_stacks(path)
+
+
+def _trace(handler: Callable[..., Any], name: "str | None"=None) -> Callable[..., Any]:
+    if _tracer is None or getattr(handler, "__reactivity_traced__", False):
+        return handler
+    return _tracer.wrap(handler, name if name is not None else _handler_name(handler))
+
+def _handler_name(handler: Callable[..., Any]):
+    qualname = getattr(handler, "__qualname__", None) or repr(handler)
+    qualname = qualname.replace(".<locals>", "")
+
+    code = getattr(handler, "__code__", None)
+    if code is None:
+        return qualname
+    return f"{Path(code.co_filename).stem}:{qualname}:{code.co_firstlineno}"
+
+def _positional_arg_count(handler: Callable[..., Any]) -> "int | None":
+    """:returns: The number of positional arguments the handler accepts, or `None` if there is no limit."""
+
+    try:
+        parameters = inspect.signature(handler).parameters.values()
+    except (TypeError, ValueError):
+        return None
+
+    n_args = 0
+    for parameter in parameters:
+        if parameter.kind == inspect.Parameter.VAR_POSITIONAL:
+            return None
+        if parameter.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD):
+            n_args += 1
+    return n_args
+
+
+if os.environ.get(TRACING_ENVIRONMENT_VARIABLE, "").strip().lower() in ("1", "true", "yes"):
+    enable_tracing()
+
+#endregion
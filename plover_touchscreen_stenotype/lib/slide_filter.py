@@ -0,0 +1,194 @@
+from array import array
+import math
+from typing import Generic, TypeVar
+
+
+SLIDE_DWELL_TIME = 120
+"""ms a sliding touch must stay on a key for the key to be added to the stroke"""
+SLIDE_MAX_SPEED = 5
+"""cm/s under which a sliding touch is considered to have settled on the key under it"""
+
+
+T = TypeVar("T")
+class SlideFilter(Generic[T]):
+    """Decides which of the keys that a touch passes over should be added to the stroke, so that fingers sliding into
+    position do not pick up the keys between. The first key of each touch is added immediately; after that, a key is
+    only added once the touch has stayed on it for `dwell_time` or slowed down below `max_speed` over it, or if the
+    touch is released on it.
+
+    Touchscreens may stop reporting touches that rest without moving, so the dwell time is also checked by `expire`,
+    which the caller should schedule for `next_deadline`.
+
+    The last few positions of each touch are kept in a fixed-size ring buffer, so the work done per touch point is
+    constant. Units of distance and time are up to the caller, as long as they are consistent."""
+
+    def __init__(self, dwell_time: float, max_speed: float, n_samples: int=4, capacity: int=10):
+        """
+            :param max_speed: Distance per unit of time.
+            :param n_samples: Number of recent positions of each touch to measure its speed over.
+            :param capacity: Initial number of simultaneous touches to allocate space for.
+        """
+
+        self.dwell_time = dwell_time
+        self.max_speed = max_speed
+        self.__n_samples = n_samples
+
+        self.__slots: dict[int, int] = {}
+        """Slot of each touch id in the per-touch arrays"""
+        self.__free_slots: list[int] = []
+
+        self.__timestamps = array("d")
+        self.__xs = array("d")
+        self.__ys = array("d")
+        self.__heads = array("l")
+        """Index within each slot's ring of the latest sample"""
+        self.__counts = array("l")
+        self.__candidate_since = array("d")
+        self.__candidates: list["T | None"] = []
+        self.__candidate_committed = array("b")
+        self.__committed_any = array("b")
+
+        self.__grow(capacity)
+
+    def update(self, touch_id: int, timestamp: float, x: float, y: float, key: "T | None") -> bool:
+        """Records a position of a touch.
+
+            :param key: The key under the touch, if any.
+            :returns: Whether `key` should be added to the stroke.
+        """
+
+        slot = self.__slots.get(touch_id)
+        if slot is None:
+            slot = self.__allocate(touch_id)
+
+        self.__push_sample(slot, timestamp, x, y)
+
+        if key is not self.__candidates[slot]:
+            self.__candidates[slot] = key
+            self.__candidate_since[slot] = timestamp
+            self.__candidate_committed[slot] = False
+
+        if key is None:
+            return False
+
+        if (
+            self.__candidate_committed[slot]
+            or not self.__committed_any[slot]
+            or timestamp - self.__candidate_since[slot] >= self.dwell_time
+            or self.__speed(slot) <= self.max_speed
+        ):
+            self.__candidate_committed[slot] = True
+            self.__committed_any[slot] = True
+            return True
+
+        return False
+
+    def next_deadline(self) -> "float | None":
+        """Time at which the first of the keys that touches are on, but that have not been committed, will have been
+        dwelled on for `dwell_time`, if there are any."""
+
+        deadline: "float | None" = None
+        for slot in self.__slots.values():
+            if self.__candidates[slot] is None or self.__candidate_committed[slot]: continue
+
+            slot_deadline = self.__candidate_since[slot] + self.dwell_time
+            if deadline is None or slot_deadline < deadline:
+                deadline = slot_deadline
+
+        return deadline
+
+    def expire(self, timestamp: float) -> list[tuple[int, T]]:
+        """Commits the keys that touches have stayed on for `dwell_time` by `timestamp`, whether or not the touches
+        were reported since.
+
+            :returns: The touch ids and keys that were committed.
+        """
+
+        committed: list[tuple[int, T]] = []
+        for touch_id, slot in self.__slots.items():
+            key = self.__candidates[slot]
+            if key is None or self.__candidate_committed[slot]: continue
+            # Compared the same way as in `next_deadline`, so that its deadline always commits the key
+            if timestamp < self.__candidate_since[slot] + self.dwell_time: continue
+
+            self.__candidate_committed[slot] = True
+            self.__committed_any[slot] = True
+            committed.append((touch_id, key))
+
+        return committed
+
+    def release(self, touch_id: int, key: "T | None") -> bool:
+        """Forgets a touch.
+
+            :param key: The key under the touch when it was released, if any.
+            :returns: Whether `key` should be added to the stroke.
+        """
+
+        slot = self.__slots.pop(touch_id, None)
+        if slot is None:
+            return key is not None
+
+        self.__candidates[slot] = None
+        self.__free_slots.append(slot)
+        return key is not None
+
+    def clear(self):
+        for slot in self.__slots.values():
+            self.__candidates[slot] = None
+            self.__free_slots.append(slot)
+        self.__slots.clear()
+
+    def __allocate(self, touch_id: int):
+        if len(self.__free_slots) == 0:
+            self.__grow(len(self.__heads) or 1)
+
+        slot = self.__free_slots.pop()
+        self.__slots[touch_id] = slot
+
+        self.__counts[slot] = 0
+        self.__heads[slot] = self.__n_samples - 1
+        self.__candidates[slot] = None
+        self.__candidate_committed[slot] = False
+        self.__committed_any[slot] = False
+        return slot
+
+    def __push_sample(self, slot: int, timestamp: float, x: float, y: float):
+        head = (self.__heads[slot] + 1) % self.__n_samples
+        self.__heads[slot] = head
+        self.__counts[slot] = min(self.__counts[slot] + 1, self.__n_samples)
+
+        index = slot * self.__n_samples + head
+        self.__timestamps[index] = timestamp
+        self.__xs[index] = x
+        self.__ys[index] = y
+
+    def __speed(self, slot: int):
+        """Average speed of a touch over its recorded samples."""
+
+        count = self.__counts[slot]
+        if count < 2:
+            return math.inf
+
+        newest = slot * self.__n_samples + self.__heads[slot]
+        oldest = slot * self.__n_samples + (self.__heads[slot] - count + 1) % self.__n_samples
+
+        duration = self.__timestamps[newest] - self.__timestamps[oldest]
+        if duration <= 0:
+            return math.inf
+
+        distance = math.hypot(self.__xs[newest] - self.__xs[oldest], self.__ys[newest] - self.__ys[oldest])
+        return distance / duration
+
+    def __grow(self, n_new_slots: int):
+        first_new_slot = len(self.__heads)
+
+        for buffer in (self.__timestamps, self.__xs, self.__ys):
+            buffer.extend(array("d", [0.]) * (n_new_slots * self.__n_samples))
+        for buffer in (self.__heads, self.__counts):
+            buffer.extend(array("l", [0]) * n_new_slots)
+        self.__candidate_since.extend(array("d", [0.]) * n_new_slots)
+        self.__candidate_committed.extend(array("b", [0]) * n_new_slots)
+        self.__committed_any.extend(array("b", [0]) * n_new_slots)
+        self.__candidates.extend([None] * n_new_slots)
+
+        self.__free_slots.extend(range(first_new_slot + n_new_slots - 1, first_new_slot - 1, -1))
@@ -0,0 +1,79 @@
+from enum import IntEnum
+from pathlib import Path
+from queue import SimpleQueue
+from struct import Struct
+from threading import Thread
+from typing import BinaryIO, Iterator, NamedTuple
+
+
+"""File signature and format version, written once at the start of every touch log"""
+TOUCH_LOG_HEADER = b"PTSL\x01\x00\x00\x00"
+
+_RECORD_STRUCT = Struct("<BBiQffQ")
+
+class TouchLogRecordKind(IntEnum):
+    VIEWPORT = 1
+    """Size of the widget receiving touches. `x` and `y` are the width and height in px."""
+    EVENT = 2
+    """Start of a touch event. `state` is the `QEvent.Type` of the event. The event's touch points follow."""
+    TOUCH_POINT = 3
+    """`state` is the `Qt.TouchPointState`, and `x` and `y` are the position in widget coordinates."""
+    KEY = 4
+    """A key resolved from the touch point `touch_id`. `stroke` is the integer value of the key's substroke."""
+    STROKE = 5
+    """An emitted stroke. `stroke` is the integer value of the stroke."""
+
+class TouchLogRecord(NamedTuple):
+    kind: int
+    state: int
+    touch_id: int
+    timestamp: int
+    """Timestamp of the touch event (`QInputEvent.timestamp`), in ms"""
+    x: float
+    y: float
+    stroke: int
+
+
+class TouchLogWriter:
+    """Appends fixed-size records to a touch log. Records are packed and written on a background thread, so `write`
+    only enqueues a tuple."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        file = open(path, "ab")
+        if file.tell() == 0:
+            file.write(TOUCH_LOG_HEADER)
+
+        self.__queue: "SimpleQueue[TouchLogRecord | None]" = SimpleQueue()
+        self.__thread = Thread(target=self.__run, args=(file,), name="touch log writer", daemon=True)
+        self.__thread.start()
+
+    def write(self, record: TouchLogRecord):
+        self.__queue.put(record)
+
+    def close(self):
+        """Writes any queued records and closes the file."""
+        self.__queue.put(None)
+        self.__thread.join()
+
+    def __run(self, file: BinaryIO):
+        with file:
+            while True:
+                record = self.__queue.get()
+                if record is None: break
+
+                file.write(_RECORD_STRUCT.pack(*record))
+
+                # Flush whenever the queue drains, so a crash loses at most the records of the current burst
+                if self.__queue.empty():
+                    file.flush()
+
+
+def read_touch_log(path: Path) -> Iterator[TouchLogRecord]:
+    with open(path, "rb") as file:
+        if file.read(len(TOUCH_LOG_HEADER)) != TOUCH_LOG_HEADER:
+            raise ValueError(f"{path} is not a touch log")
+
+        while len(data := file.read(_RECORD_STRUCT.size)) == _RECORD_STRUCT.size:
+            yield TouchLogRecord(*_RECORD_STRUCT.unpack(data))
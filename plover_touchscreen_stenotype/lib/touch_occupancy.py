@@ -0,0 +1,77 @@
+from array import array
+from typing import Callable, Generic, TypeVar
+
+
+T = TypeVar("T")
+class TouchOccupancy(Generic[T]):
+    """Which keys are being touched, and by how many touches. Keys are registered once per layout build and are
+    identified by their ordinal, an index into an array of touch counts; touches are tracked by touch id. Instead of
+    exposing the set of touched keys, each key is notified through its own callback when it becomes touched or
+    untouched, so the work done per touch point does not depend on the number of keys."""
+
+    def __init__(self):
+        self.__keys: list[T] = []
+        self.__callbacks: list[Callable[[bool], None]] = []
+        self.__touch_counts = array("l")
+        self.__touch_ordinals: dict[int, int] = {}
+        """Ordinal of the key that each touch id is on"""
+
+    def register(self, key: T, on_touched_change: Callable[[bool], None]) -> int:
+        """Adds a key.
+
+            :param on_touched_change: Called with whether `key` is touched whenever that changes.
+            :returns: The ordinal of `key`.
+        """
+
+        self.__keys.append(key)
+        self.__callbacks.append(on_touched_change)
+        self.__touch_counts.append(0)
+        return len(self.__keys) - 1
+
+    def clear_keys(self):
+        """Removes all keys and touches, without notifying the keys (e.g., because they are being destroyed)."""
+
+        self.__keys.clear()
+        self.__callbacks.clear()
+        del self.__touch_counts[:]
+        self.__touch_ordinals.clear()
+
+    def key_touched_by(self, touch_id: int) -> "T | None":
+        ordinal = self.__touch_ordinals.get(touch_id)
+        return self.__keys[ordinal] if ordinal is not None else None
+
+    def is_touched(self, ordinal: int):
+        return self.__touch_counts[ordinal] > 0
+
+    def touch(self, touch_id: int, ordinal: int):
+        """Moves a touch onto the key with the given ordinal, removing it from the key it was on before."""
+
+        old_ordinal = self.__touch_ordinals.get(touch_id)
+        if old_ordinal == ordinal: return
+
+        if old_ordinal is not None:
+            self.__decrement(old_ordinal)
+
+        self.__touch_ordinals[touch_id] = ordinal
+        self.__touch_counts[ordinal] += 1
+        if self.__touch_counts[ordinal] == 1:
+            self.__callbacks[ordinal](True)
+
+    def release(self, touch_id: int):
+        old_ordinal = self.__touch_ordinals.pop(touch_id, None)
+        if old_ordinal is None: return
+
+        self.__decrement(old_ordinal)
+
+    def release_all(self):
+        touched_ordinals = set(self.__touch_ordinals.values())
+        self.__touch_ordinals.clear()
+
+        for ordinal in touched_ordinals:
+            self.__touch_counts[ordinal] = 0
+            self.__callbacks[ordinal](False)
+
+    def __decrement(self, ordinal: int):
+        self.__touch_counts[ordinal] -= 1
+        if self.__touch_counts[ordinal] == 0:
+            self.__callbacks[ordinal](False)
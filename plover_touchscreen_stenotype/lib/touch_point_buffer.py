@@ -0,0 +1,40 @@
+from array import array
+
+from PyQt5.QtGui import (
+    QTouchEvent,
+)
+
+
+class TouchPointBuffer:
+    """Coordinates, ids and states of the touch points of one touch event, extracted once so the rest of the touch
+    handling can read them without calling into Qt again. The arrays are allocated once and reused for every event,
+    growing only if an event has more touch points than ever before; only the first `count` entries are valid."""
+
+    def __init__(self, capacity: int=10):
+        self.count = 0
+
+        self.ids = array("q", [0]) * capacity
+        self.states = array("l", [0]) * capacity
+        self.xs = array("d", [0.]) * capacity
+        self.ys = array("d", [0.]) * capacity
+
+    def fill(self, touch_points: "list[QTouchEvent.TouchPoint]"):
+        n_touch_points = len(touch_points)
+        if n_touch_points > len(self.ids):
+            self.__grow(n_touch_points)
+
+        ids, states, xs, ys = self.ids, self.states, self.xs, self.ys
+        for i, touch in enumerate(touch_points):
+            pos = touch.pos()
+
+            ids[i] = touch.id()
+            states[i] = touch.state()
+            xs[i] = pos.x()
+            ys[i] = pos.y()
+
+        self.count = n_touch_points
+
+    def __grow(self, capacity: int):
+        n_new = capacity - len(self.ids)
+        for buffer in (self.ids, self.states, self.xs, self.ys):
+            buffer.extend(array(buffer.typecode, [0]) * n_new)
@@ -0,0 +1,266 @@
+"""Replays touch logs recorded by `UseTouchRecording` into a `KeyboardWidget` or `JoysticksWidget`, checking that the
+same strokes are emitted. Usable as a regression test for hit testing and adaptive layout changes, and as a
+throughput benchmark:
+
+    python -m plover_touchscreen_stenotype.lib.touch_replay LOG_PATH [--realtime] [--joysticks] [--plover-settings] [--profile-paint]
+
+Hit testing depends on the widget's geometry, so logs replay exactly only with the settings, window size and screen
+DPI they were recorded with. The window size is restored from the log. When events are replayed as fast as possible,
+the widget's timers (such as the adaptive layout's position reset after a pause) are run from the recorded timestamps
+instead of the clock, so the results are the same as with the recorded timing. Each replay starts from the initial
+key group positions.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+import time
+from typing import Generator, Iterable, TYPE_CHECKING
+
+from PyQt5.QtCore import (
+    Qt,
+    QEvent,
+    QPointF,
+)
+from PyQt5.QtGui import (
+    QTouchEvent,
+)
+from PyQt5.QtWidgets import (
+    QApplication,
+)
+
+from plover.steno import Stroke
+
+from .touch_log import TouchLogRecord, TouchLogRecordKind, read_touch_log
+from .paint_profiler import paint_profiler
+if TYPE_CHECKING:
+    from ..widgets.keyboard.KeyboardWidget import KeyboardWidget
+    from ..widgets.joysticks.JoysticksWidget import JoysticksWidget
+else:
+    KeyboardWidget = object
+    JoysticksWidget = object
+
+
+@dataclass(frozen=True, slots=True)
+class ReplayedTouchPoint:
+    state: int
+    touch_id: int
+    x: float
+    y: float
+
+@dataclass(frozen=True, slots=True)
+class ReplayedEvent:
+    type: int
+    timestamp: int
+    touch_points: tuple[ReplayedTouchPoint, ...]
+
+class TouchReplay:
+    """The events and expected strokes of a touch log, grouped for replaying"""
+
+    def __init__(self, records: Iterable[TouchLogRecord]):
+        self.events: list[ReplayedEvent] = []
+        self.expected_strokes: list[int] = []
+        self.viewport_size: "tuple[int, int] | None" = None
+
+        current_event: "TouchLogRecord | None" = None
+        current_touch_points: list[ReplayedTouchPoint] = []
+
+        def finish_event():
+            if current_event is None: return
+            self.events.append(ReplayedEvent(current_event.state, current_event.timestamp, tuple(current_touch_points)))
+
+        for record in records:
+            if record.kind == TouchLogRecordKind.EVENT:
+                finish_event()
+                current_event = record
+                current_touch_points = []
+
+            elif record.kind == TouchLogRecordKind.TOUCH_POINT:
+                current_touch_points.append(ReplayedTouchPoint(record.state, record.touch_id, record.x, record.y))
+
+            elif record.kind == TouchLogRecordKind.STROKE:
+                self.expected_strokes.append(record.stroke)
+
+            elif record.kind == TouchLogRecordKind.VIEWPORT and self.viewport_size is None:
+                self.viewport_size = (round(record.x), round(record.y))
+
+        finish_event()
+
+    @staticmethod
+    def from_file(path: Path):
+        return TouchReplay(read_touch_log(path))
+
+
+def replayed_touch_events(replay: TouchReplay) -> Generator[QTouchEvent, None, None]:
+    """Builds the Qt touch events of `replay`."""
+
+    last_positions: dict[int, QPointF] = {}
+
+    for replayed_event in replay.events:
+        touch_points: list[QTouchEvent.TouchPoint] = []
+        touch_point_states = 0
+
+        for replayed_touch_point in replayed_event.touch_points:
+            pos = QPointF(replayed_touch_point.x, replayed_touch_point.y)
+
+            touch_point = QTouchEvent.TouchPoint(replayed_touch_point.touch_id)
+            touch_point.setState(Qt.TouchPointState(replayed_touch_point.state))
+            touch_point.setPos(pos)
+            touch_point.setLastPos(last_positions.get(replayed_touch_point.touch_id, pos))
+            touch_points.append(touch_point)
+
+            touch_point_states |= replayed_touch_point.state
+
+            if replayed_touch_point.state == Qt.TouchPointReleased:
+                last_positions.pop(replayed_touch_point.touch_id, None)
+            else:
+                last_positions[replayed_touch_point.touch_id] = pos
+
+        event = QTouchEvent(
+            QEvent.Type(replayed_event.type),
+            None,
+            Qt.NoModifier,
+            Qt.TouchPointStates(touch_point_states),
+            touch_points,
+        )
+        event.setTimestamp(replayed_event.timestamp)
+
+        yield event
+
+
+def replay_touches(widget: "KeyboardWidget | JoysticksWidget", replay: TouchReplay, *, realtime: bool=False, process_events: bool=False) -> list[Stroke]:
+    """Sends the events of `replay` to `widget`.
+
+        :param realtime: Whether to wait between events as long as the user did, processing the Qt event loop in the
+        meantime. Otherwise, events are sent as fast as possible, and the widget's timers are fired from the event
+        timestamps.
+        :param process_events: Whether to process the Qt event loop after each event, so that the repaints caused by
+        each event are painted.
+        :returns: The strokes emitted by `widget` during the replay.
+    """
+
+    emitted_strokes: list[Stroke] = []
+    connection = widget.end_stroke.connect(emitted_strokes.append)
+
+    # Earlier replays or input must not leave the adaptive layout displaced
+    widget.reset_positions()
+    widget.manual_timers = not realtime
+
+    start_time = time.perf_counter()
+    first_timestamp = replay.events[0].timestamp if len(replay.events) > 0 else 0
+
+    try:
+        for event in replayed_touch_events(replay):
+            if realtime:
+                delay = (event.timestamp() - first_timestamp) / 1000 - (time.perf_counter() - start_time)
+                if delay > 0:
+                    time.sleep(delay)
+                QApplication.processEvents()
+            else:
+                widget.fire_timers_due_by(event.timestamp())
+
+            widget.event(event)
+
+            if process_events:
+                QApplication.processEvents()
+    finally:
+        widget.manual_timers = False
+        widget.end_stroke.disconnect(connection)
+
+    return emitted_strokes
+
+
+def assert_strokes_match(emitted_strokes: "list[Stroke]", expected_strokes: "list[int]"):
+    """Raises an `AssertionError` describing the first difference between the emitted and expected strokes."""
+
+    for i, (emitted_stroke, expected_stroke) in enumerate(zip(emitted_strokes, expected_strokes)):
+        if int(emitted_stroke) != expected_stroke:
+            raise AssertionError(f"stroke {i}: expected {Stroke.from_integer(expected_stroke).rtfcre}, got {emitted_stroke.rtfcre}")
+
+    if len(emitted_strokes) != len(expected_strokes):
+        raise AssertionError(f"expected {len(expected_strokes)} strokes, got {len(emitted_strokes)}")
+
+
+def create_replay_widget(replay: TouchReplay, *, joysticks: bool=False, plover_settings: bool=False) -> "tuple[QApplication, KeyboardWidget | JoysticksWidget]":
+    """Sets up a headless Qt application and Plover system, and shows a stenotype widget sized for `replay`.
+
+        :param plover_settings: Whether to use the plugin settings saved by Plover instead of the defaults.
+    """
+
+    import os
+    import sys
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    app = QApplication(sys.argv)
+    app.setOrganizationName("Open Steno Project")
+    app.setApplicationName("Plover")
+
+    from plover.registry import registry
+    from plover.config import DEFAULT_SYSTEM_NAME
+    from plover import system
+    registry.update()
+    system.setup(DEFAULT_SYSTEM_NAME)
+
+    from PyQt5.QtCore import QSettings
+    from ..settings import Settings
+    from .reactivity import Ref
+
+    settings = Settings()
+    if plover_settings:
+        qsettings = QSettings()
+        qsettings.beginGroup("touchscreen_stenotype")
+        settings.load(qsettings)
+        qsettings.endGroup()
+
+    widget: "KeyboardWidget | JoysticksWidget"
+    if joysticks:
+        from ..widgets.joysticks.JoysticksWidget import JoysticksWidget
+        widget = JoysticksWidget(settings, Ref(0.))
+    else:
+        from ..widgets.keyboard.KeyboardWidget import KeyboardWidget
+        widget = KeyboardWidget(settings, Ref(0.))
+
+    if replay.viewport_size is not None:
+        widget.resize(*replay.viewport_size)
+    widget.show()
+    app.processEvents()
+
+    return app, widget
+
+
+def main():
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Replays a touch log and checks the emitted strokes")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--realtime", action="store_true", help="Replay with the recorded timing instead of as fast as possible")
+    parser.add_argument("--joysticks", action="store_true", help="Replay into the joysticks widget instead of the keyboard")
+    parser.add_argument("--plover-settings", action="store_true", help="Use the plugin settings saved by Plover instead of the defaults")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of times to replay the log, for benchmarking")
+    parser.add_argument("--profile-paint", action="store_true", help="Paint after each event and report frame and paint times")
+    args = parser.parse_args()
+
+    replay = TouchReplay.from_file(args.path)
+    app, widget = create_replay_widget(replay, joysticks=args.joysticks, plover_settings=args.plover_settings)
+
+    if args.profile_paint:
+        paint_profiler.reset()
+        paint_profiler.enabled = True
+
+    start_time = time.perf_counter()
+    for _ in range(args.repeat):
+        emitted_strokes = replay_touches(widget, replay, realtime=args.realtime, process_events=args.profile_paint)
+        assert_strokes_match(emitted_strokes, replay.expected_strokes)
+    elapsed = time.perf_counter() - start_time
+
+    n_events = len(replay.events) * args.repeat
+    n_strokes = len(replay.expected_strokes) * args.repeat
+    print(f"{n_strokes} strokes matched from {n_events} events in {elapsed:.3f} s ({n_events / elapsed:.0f} events/s, {n_strokes / elapsed:.0f} strokes/s)")
+
+    if args.profile_paint:
+        paint_profiler.enabled = False
+        print(paint_profiler.report())
+
+
+if __name__ == "__main__":
+    main()
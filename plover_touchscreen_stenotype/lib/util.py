@@ -1,8 +1,10 @@
 import math
+from functools import cache
 from typing import Callable, TypeVar, Optional
 import importlib.util
 from importlib.machinery import SourceFileLoader
 
+from plover import system
 from plover.steno import Stroke
 
 from PyQt5.QtCore import (
@@ -14,12 +16,35 @@ from PyQt5.QtWidgets import (
     QWidget,
     QLayout,
 )
+from PyQt5.QtGui import (
+    QFont,
+)
+
+from .constants import FONT_FAMILY
 
 T = TypeVar("T")
 
 def empty_stroke() -> Stroke:
     return Stroke.from_integer(0)
 
+_substroke_cache: dict[tuple[str, str], Stroke] = {}
+
+def key_substroke(steno: str) -> Stroke:
+    """Parses the steno of a key. Results are cached per Plover system, so rebuilding a layout does not parse its keys
+    again. Steno that is not valid in the current system gives an empty stroke."""
+
+    cache_key = (system.NAME, steno)
+    substroke = _substroke_cache.get(cache_key)
+    if substroke is not None: return substroke
+
+    try:
+        substroke = Stroke.from_steno(steno)
+    except ValueError:
+        substroke = empty_stroke()
+
+    _substroke_cache[cache_key] = substroke
+    return substroke
+
 def immediate(fn: Callable[[], None]) -> Callable[[], None]:
     """Decorator that immediately calls a function"""
     fn()
@@ -55,17 +80,33 @@ def not_none(value: "T | None") -> T:
         raise Exception("value is None")
     return value
 
+def qt_round(value: float) -> int:
+    """Rounds like Qt's `qRound` (halves toward +∞), e.g., to match `QPointF.toPoint`."""
+    return math.floor(value + 0.5)
+
+@cache
+def font(*, point_size: "int | None"=None, pixel_size: "int | None"=None, family: str=FONT_FAMILY) -> QFont:
+    """Gets a shared font, so that widgets with the same font (e.g., every key label) do not each create and resolve
+    their own. The result must not be modified; `QWidget.setFont` copies it."""
+
+    font = QFont(family)
+    if point_size is not None:
+        font.setPointSize(point_size)
+    if pixel_size is not None:
+        font.setPixelSize(pixel_size)
+    return font
+
 class Point:
-    def __init__(self, x: float, y: float):
-        self.__tuple = (x, y)
+    """2D vector, treated as immutable. Slotted since many short-lived instances are created while handling touches."""
 
-    @property
-    def x(self):
-        return self.__tuple[0]
-    
-    @property
-    def y(self):
-        return self.__tuple[1]
+    __slots__ = ("x", "y")
+
+    x: float
+    y: float
+
+    def __init__(self, x: float, y: float):
+        self.x = x
+        self.y = y
     
     def __add__(self, other: "Point"):
         return Point(self.x + other.x, self.y + other.y)
@@ -102,5 +143,7 @@ class Point:
         return math.hypot(self.x, self.y)
     
     def with_hypot(self, hypot: float):
-        angle = math.atan2(self.y, self.x)
-        return hypot * Point(math.cos(angle), math.sin(angle))
\ No newline at end of file
+        current_hypot = math.hypot(self.x, self.y)
+        if current_hypot == 0:
+            return Point(hypot, 0)
+        return self * (hypot / current_hypot)
\ No newline at end of file
@@ -10,8 +10,9 @@ from PyQt5.QtCore import (
 )
 
 
-from .lib.reactivity import Ref, RefAttr, on_many
+from .lib.reactivity import Ref, RefAttr, batch, on_many
 from .lib.keyboard_layout.descriptors import DEFAULT_KEYBOARD_LAYOUT_NAME
+from .lib.keyboard_layout.DisplacementEstimator import DEFAULT_DISPLACEMENT_ESTIMATOR_NAME
 
 
 T = TypeVar("T")
@@ -21,21 +22,28 @@ class _PersistentSetting(RefAttr, Generic[T]):
     """
 
     setting_types_on_object: WeakKeyDictionary[Any, dict[str, type]] = WeakKeyDictionary()
+    profile_setting_names_on_class: dict[type, set[str]] = {}
 
     #region Overrides
 
-    def __init__(self, expected_type: type[T], qsettings_type_arg: "type | None"=None):
+    def __init__(self, expected_type: type[T], qsettings_type_arg: "type | None"=None, *, in_profiles: bool=False):
         """
             :param qsettings_type_arg: The type object that should be passed as `type` to `QSettings::value`. If
             `NoneType` (`type(None)`), then the parameter should be omitted.
+            :param in_profiles: Whether the setting is part of a person's layout, and so is saved in and applied from
+            settings profiles.
         """
         super().__init__(expected_type)
         self.__qsettings_type_arg = qsettings_type_arg if qsettings_type_arg is not None else expected_type
+        self.__in_profiles = in_profiles
 
     def __set_name__(self, owner_class: type, attr_name: str):
         super().__set_name__(owner_class, attr_name)
         self.__attr_name = attr_name
 
+        if self.__in_profiles:
+            _PersistentSetting.profile_setting_names_on_class.setdefault(owner_class, set()).add(attr_name)
+
     def __set__(self, instance: Any, value: T):
         # The owner instance is not accessible before any `__get__` and `__set__` calls, so the recording is done in
         # `__set__` (and `__set__` specifically since values are initialized in the constructor of `Settings`)
@@ -55,34 +63,58 @@ class KeyLayout(Enum):
     STAGGERED = auto()
     GRID = auto()
 
+class StenotypeMode(Enum):
+    """Stored in settings by value"""
+
+    KEYBOARD = "Keyboard"
+    JOYSTICKS = "Joysticks"
+
+class ViewportRenderer(Enum):
+    """Stored in settings by value"""
+
+    SOFTWARE = "Software"
+    OPENGL = "OpenGL"
+
+class ViewportUpdateMode(Enum):
+    """Stored in settings by value"""
+
+    MINIMAL = "Minimal"
+    SMART = "Smart"
+
+
+PROFILES_GROUP = "profiles"
+"""`QSettings` group under which named settings profiles are stored, each in a subgroup with the same keys as the
+current settings. Only the settings marked `in_profiles` are stored in profiles."""
+
 
 class Settings(QObject):
     # Lengths are in centimeters
 
-    keyboard_layout = _PersistentSetting(str, type(None))
+    stenotype_mode = _PersistentSetting(str, type(None), in_profiles=True)
+    keyboard_layout = _PersistentSetting(str, type(None), in_profiles=True)
 
     stroke_preview_stroke = _PersistentSetting(bool)
     stroke_preview_translation = _PersistentSetting(bool)
 
-    key_width = _PersistentSetting(float)
-    key_height = _PersistentSetting(float)
-    compound_key_size = _PersistentSetting(float)
+    key_width = _PersistentSetting(float, in_profiles=True)
+    key_height = _PersistentSetting(float, in_profiles=True)
+    compound_key_size = _PersistentSetting(float, in_profiles=True)
 
-    index_stretch = _PersistentSetting(float)
-    pinky_stretch = _PersistentSetting(float)
+    index_stretch = _PersistentSetting(float, in_profiles=True)
+    pinky_stretch = _PersistentSetting(float, in_profiles=True)
 
-    vowel_set_offset_fac = _PersistentSetting(float)
+    vowel_set_offset_fac = _PersistentSetting(float, in_profiles=True)
 
-    index_stagger_fac = _PersistentSetting(float)
-    middle_stagger_fac = _PersistentSetting(float)
-    ring_stagger_fac = _PersistentSetting(float)
-    pinky_stagger_fac = _PersistentSetting(float)
+    index_stagger_fac = _PersistentSetting(float, in_profiles=True)
+    middle_stagger_fac = _PersistentSetting(float, in_profiles=True)
+    ring_stagger_fac = _PersistentSetting(float, in_profiles=True)
+    pinky_stagger_fac = _PersistentSetting(float, in_profiles=True)
 
-    bank_angle = _PersistentSetting(float)
-    vowel_angle = _PersistentSetting(float)
+    bank_angle = _PersistentSetting(float, in_profiles=True)
+    vowel_angle = _PersistentSetting(float, in_profiles=True)
 
-    row_spacing = _PersistentSetting(float)
-    bank_spacing = _PersistentSetting(float)
+    row_spacing = _PersistentSetting(float, in_profiles=True)
+    bank_spacing = _PersistentSetting(float, in_profiles=True)
 
     window_opacity = _PersistentSetting(float)
     # Window size is not preserved through the Settings object; Setting object only allows window size to be edited
@@ -91,9 +123,23 @@ class Settings(QObject):
     window_height = RefAttr(float)
     frameless = _PersistentSetting(bool)
 
-    adaptive_layout = _PersistentSetting(bool)
+    adaptive_layout = _PersistentSetting(bool, in_profiles=True)
+    adaptive_layout_estimator = _PersistentSetting(str, type(None), in_profiles=True)
+
+    coalesce_touch_updates = _PersistentSetting(bool)
+    slide_chording = _PersistentSetting(bool)
+
+    viewport_renderer = _PersistentSetting(str, type(None))
+    viewport_update_mode = _PersistentSetting(str, type(None))
+    proxy_caching = _PersistentSetting(bool)
+    prerendered_keys = _PersistentSetting(bool)
 
+    touch_recording = _PersistentSetting(bool)
+    latency_overlay = _PersistentSetting(bool)
+    paint_profiling = RefAttr(bool)
 
+
+    stenotype_mode_ref = stenotype_mode.ref_getter()
     keyboard_layout_ref = keyboard_layout.ref_getter()
 
     stroke_preview_stroke_ref = stroke_preview_stroke.ref_getter()
@@ -125,13 +171,36 @@ class Settings(QObject):
     frameless_ref = frameless.ref_getter()
 
     adaptive_layout_ref = adaptive_layout.ref_getter()
+    adaptive_layout_estimator_ref = adaptive_layout_estimator.ref_getter()
+
+    coalesce_touch_updates_ref = coalesce_touch_updates.ref_getter()
+    slide_chording_ref = slide_chording.ref_getter()
+
+    viewport_renderer_ref = viewport_renderer.ref_getter()
+    viewport_update_mode_ref = viewport_update_mode.ref_getter()
+    proxy_caching_ref = proxy_caching.ref_getter()
+    prerendered_keys_ref = prerendered_keys.ref_getter()
+
+    touch_recording_ref = touch_recording.ref_getter()
+    latency_overlay_ref = latency_overlay.ref_getter()
+    paint_profiling_ref = paint_profiling.ref_getter()
 
 
     stroke_preview_change = pyqtSignal()
+    profiles_change = pyqtSignal()
+    profile_applied = pyqtSignal(str)
     
     def __init__(self):
         super().__init__()
 
+        self.__persisted_values: dict[str, Any] = {}
+        """Values of persistent settings as last loaded from or saved to `QSettings`, used to skip writing unchanged
+        settings"""
+
+        self.__profiles: dict[str, dict[str, Any]] = {}
+        self.__profiles_dirty = False
+
+        self.stenotype_mode = StenotypeMode.KEYBOARD.value
         self.keyboard_layout = DEFAULT_KEYBOARD_LAYOUT_NAME
 
         self.stroke_preview_stroke = True
@@ -163,6 +232,19 @@ class Settings(QObject):
         self.frameless = True
 
         self.adaptive_layout = True
+        self.adaptive_layout_estimator = DEFAULT_DISPLACEMENT_ESTIMATOR_NAME
+
+        self.coalesce_touch_updates = False
+        self.slide_chording = False
+
+        self.viewport_renderer = ViewportRenderer.SOFTWARE.value
+        self.viewport_update_mode = ViewportUpdateMode.MINIMAL.value
+        self.proxy_caching = False
+        self.prerendered_keys = False
+
+        self.touch_recording = False
+        self.latency_overlay = False
+        self.paint_profiling = False
 
         @on_many(self.stroke_preview_stroke_ref.change, self.stroke_preview_translation_ref.change)
         def emit_stroke_preview_change():
@@ -170,16 +252,137 @@ class Settings(QObject):
         
 
     def load(self, settings: QSettings):
-        for attr_name, setting_type in _PersistentSetting.setting_types_on_object[self].items():
-            default_value = getattr(self, attr_name)
-            if setting_type is type(None):
-                setattr(self, attr_name, settings.value(attr_name, default_value))
-            else:
-                setattr(self, attr_name, settings.value(attr_name, default_value, type=setting_type))
+        # Dependents are notified once all values are in place, and only of settings that differ from the defaults
+        with batch():
+            for attr_name, setting_type in self.__setting_types.items():
+                setattr(self, attr_name, self.__read_value(settings, attr_name, setting_type))
+
+                if settings.contains(attr_name):
+                    self.__persisted_values[attr_name] = getattr(self, attr_name)
+
+        profile_setting_names = self.__profile_setting_names
+
+        settings.beginGroup(PROFILES_GROUP)
+        for profile_name in settings.childGroups():
+            settings.beginGroup(profile_name)
+            self.__profiles[profile_name] = {
+                attr_name: self.__read_value(settings, attr_name, setting_type)
+                for attr_name, setting_type in self.__setting_types.items()
+                if attr_name in profile_setting_names and settings.contains(attr_name)
+            }
+
+            # Profiles saved by earlier versions held every setting; those are rewritten without the others
+            if any(key not in profile_setting_names for key in settings.childKeys()):
+                self.__profiles_dirty = True
+            settings.endGroup()
+        settings.endGroup()
+
+        self.profiles_change.emit()
 
     def save(self, settings: QSettings):
-        for attr_name in _PersistentSetting.setting_types_on_object[self].keys():
-            settings.setValue(attr_name, getattr(self, attr_name))
+        """Writes the settings that have changed since they were last loaded or saved."""
+
+        for attr_name in self.__setting_types.keys():
+            value = getattr(self, attr_name)
+            if attr_name in self.__persisted_values and self.__persisted_values[attr_name] == value: continue
+
+            settings.setValue(attr_name, value)
+            self.__persisted_values[attr_name] = value
+
+        if not self.__profiles_dirty: return
+
+        settings.remove(PROFILES_GROUP)
+        settings.beginGroup(PROFILES_GROUP)
+        for profile_name, snapshot in self.__profiles.items():
+            settings.beginGroup(profile_name)
+            for attr_name, value in snapshot.items():
+                settings.setValue(attr_name, value)
+            settings.endGroup()
+        settings.endGroup()
+
+        self.__profiles_dirty = False
+
+    def snapshot(self) -> dict[str, Any]:
+        """Copies the values of all persistent settings."""
+
+        return {attr_name: getattr(self, attr_name) for attr_name in self.__setting_types.keys()}
+
+    def restore(self, snapshot: dict[str, Any]):
+        """Applies the values from a `snapshot` together, so dependents never see a mix of old and new values. Names
+        that are not persistent settings are ignored."""
+
+        setting_types = self.__setting_types
+        with batch():
+            for attr_name, value in snapshot.items():
+                if attr_name not in setting_types: continue
+                setattr(self, attr_name, value)
+
+    @property
+    def profile_names(self) -> list[str]:
+        return sorted(self.__profiles.keys())
+
+    @staticmethod
+    def is_valid_profile_name(profile_name: str):
+        # Slashes would nest `QSettings` groups
+        return profile_name.strip() == profile_name and profile_name != "" and "/" not in profile_name and "\\" not in profile_name
+
+    def save_profile(self, profile_name: str):
+        """Saves the current layout and geometry settings as a named profile, replacing any profile with the same
+        name. Input, rendering and diagnostics settings belong to the device rather than the person using it, so they
+        are not saved."""
+
+        if not Settings.is_valid_profile_name(profile_name):
+            raise ValueError(f"invalid profile name: {profile_name!r}")
+
+        self.__profiles[profile_name] = {
+            attr_name: value
+            for attr_name, value in self.snapshot().items()
+            if attr_name in self.__profile_setting_names
+        }
+        self.__profiles_dirty = True
+        self.profiles_change.emit()
+
+    def delete_profile(self, profile_name: str):
+        if self.__profiles.pop(profile_name, None) is None: return
+
+        self.__profiles_dirty = True
+        self.profiles_change.emit()
+
+    def apply_profile(self, profile_name: str) -> bool:
+        """Applies a named profile in one batch.
+
+        :returns: Whether the profile exists
+        """
+
+        snapshot = self.__profiles.get(profile_name)
+        if snapshot is None:
+            return False
+
+        profile_setting_names = self.__profile_setting_names
+        self.restore({
+            attr_name: value
+            for attr_name, value in snapshot.items()
+            if attr_name in profile_setting_names
+        })
+        self.profile_applied.emit(profile_name)
+        return True
+
+    def __read_value(self, settings: QSettings, attr_name: str, setting_type: type):
+        """Reads a setting from `settings`, falling back to its current value."""
+
+        default_value = getattr(self, attr_name)
+        if setting_type is type(None):
+            return settings.value(attr_name, default_value)
+        else:
+            return settings.value(attr_name, default_value, type=setting_type)
+
+    @property
+    def __setting_types(self):
+        return _PersistentSetting.setting_types_on_object[self]
+
+    @property
+    def __profile_setting_names(self):
+        return _PersistentSetting.profile_setting_names_on_class.get(type(self), set())
 
     @property
     def stroke_preview_full(self):
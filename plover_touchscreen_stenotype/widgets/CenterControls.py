@@ -12,7 +12,6 @@ from PyQt5.QtWidgets import (
     QToolButton,
 )
 from PyQt5.QtGui import (
-    QFont,
     QMouseEvent,
 )
 
@@ -22,7 +21,7 @@ from typing import Callable
 from .DisplayAlignmentLayout import DisplayAlignmentLayout
 from ..lib.reactivity import Ref, watch
 from .composables.UseDpi import UseDpi
-from ..lib.constants import FONT_FAMILY
+from ..lib.util import font
 
 class CenterControls(QWidget):
     def __init__(
@@ -54,9 +53,7 @@ class CenterControls(QWidget):
         def set_dragger_size():
             dragger.setFixedWidth(dpi.dp(48))
 
-            dragger_font = QFont(FONT_FAMILY)
-            dragger_font.setPixelSize(dpi.dp(48 / 1.5))
-            dragger.setFont(dragger_font)
+            dragger.setFont(font(pixel_size=dpi.dp(48 / 1.5)))
         
 
         settings_button = QToolButton()
@@ -11,15 +11,20 @@ from PyQt5.QtWidgets import (
     QLabel,
 )
 from PyQt5.QtGui import (
-    QFont,
+    QColor,
+    QPainter,
+    QPaintEvent,
+    QPalette,
 )
 
 from plover.steno import Stroke
 
 from .composables.UseDpi import UseDpi
-from ..lib.reactivity import Ref, watch, watch_many
-from ..lib.constants import FONT_FAMILY
-from ..lib.util import child, empty_stroke, not_none, render
+from ..lib.reactivity import Ref, on, watch
+from ..lib.touch_occupancy import TouchOccupancy
+from ..lib.constants import KEY_LABEL_HIGHLIGHTED_COLOR
+from ..lib.key_pixmap_atlas import key_pixmap_atlas
+from ..lib.util import child, empty_stroke, font, not_none, render
 
 
 class KeyWidget(QToolButton):
@@ -31,7 +36,7 @@ class KeyWidget(QToolButton):
         label_maybe_ref: "str | Ref[str]",
         parent: "QWidget | None"=None,
         *,
-        touched_key_widgets: "Ref[set[KeyWidget]] | None"=None,
+        touch_occupancy: "TouchOccupancy[KeyWidget] | None"=None,
         current_stroke: "Ref[Stroke] | None"=None,
         dpi: "UseDpi | None"=None,
     ):
@@ -39,26 +44,34 @@ class KeyWidget(QToolButton):
         super().__init__(parent)
 
         self.substroke = substroke
+        self.substroke_mask = int(substroke)
+        """Integer form of `substroke`, for checking whether it is part of a stroke with a bitwise AND"""
 
         self.__touched = False
         self.__matched = False
         self.__matched_soft = False
         self.__key_label: "KeyLabel | None" = None
 
-        touched_key_widgets = touched_key_widgets or Ref(set())
         current_stroke = current_stroke or Ref(empty_stroke())
         dpi = dpi or UseDpi(self)
 
+        self.touch_ordinal = -1
+        """Ordinal of this key in `touch_occupancy`, if given"""
+        if touch_occupancy is not None:
+            def set_touched(touched: bool):
+                update_highlight_state()
+            self.touch_ordinal = touch_occupancy.register(self, set_touched)
 
-        @watch_many(touched_key_widgets.change, current_stroke.change, parent=self)
+
+        @watch(current_stroke.change, parent=self)
         def update_highlight_state():
             old_touched, old_matched = self.touched, self.matched
 
-            if self in touched_key_widgets.value:
+            if touch_occupancy is not None and touch_occupancy.is_touched(self.touch_ordinal):
                 self.touched = True
                 self.matched = True
 
-            elif substroke in current_stroke.value:
+            elif (int(current_stroke.value) & self.substroke_mask) == self.substroke_mask:
                 self.touched = False
                 self.matched = True
 
@@ -68,9 +81,7 @@ class KeyWidget(QToolButton):
 
 
             if (old_touched, old_matched) == (self.touched, self.matched): return
-            # Reload stylesheet for dynamic properties: https://stackoverflow.com/questions/1595476/are-qts-stylesheets-really-handling-dynamic-properties
-            # self.style().unpolish(key_widget)
-            not_none(self.style()).polish(self)
+            self.refresh_style()
 
 
         key_label: "KeyLabel | None" = None
@@ -99,6 +110,21 @@ class KeyWidget(QToolButton):
 
         self.__key_label = not_none(key_label)
 
+        @watch(key_pixmap_atlas.enabled_change, parent=self)
+        def set_prerendered():
+            # The label is drawn from a pixmap too, but still holds the text and font
+            not_none(self.__key_label).setVisible(not key_pixmap_atlas.enabled)
+            self.update()
+
+        @on(key_pixmap_atlas.enabled_change, parent=self)
+        def repolish():
+            # State changes were not applied to the stylesheet while keys were pre-rendered
+            if key_pixmap_atlas.enabled: return
+
+            not_none(self.style()).polish(self)
+            key_label = not_none(self.__key_label)
+            not_none(key_label.style()).polish(key_label)
+
 
         # self.setMinimumSize(0, 0)
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -114,8 +140,55 @@ class KeyWidget(QToolButton):
 
         return super().event(event)
 
+    def paintEvent(self, event: QPaintEvent):
+        """(override)"""
+
+        if not key_pixmap_atlas.enabled:
+            return super().paintEvent(event)
+
+        key_label = not_none(self.__key_label)
+        device_pixel_ratio = self.devicePixelRatioF()
+
+        label_color = (
+            QColor(KEY_LABEL_HIGHLIGHTED_COLOR)
+                if key_label.highlighted
+                else key_label.palette().color(QPalette.WindowText)
+        )
+        background = key_pixmap_atlas.background(self.__state_name(), self.width(), self.height(), device_pixel_ratio)
+        label = key_pixmap_atlas.label(key_label.text(), key_label.font(), label_color, device_pixel_ratio)
+
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, background)
+        painter.drawPixmap(
+            round((self.width() - label.width() / device_pixel_ratio) / 2),
+            round((self.height() - label.height() / device_pixel_ratio) / 2),
+            label,
+        )
+
     #endregion
 
+    def refresh_style(self):
+        """Redraws the key after its `touched`, `matched` or `matched_soft` state changes."""
+
+        if key_pixmap_atlas.enabled:
+            # Pre-rendered keys are drawn from their state directly, without matching the stylesheet again
+            self.update()
+            return
+
+        # Reload stylesheet for dynamic properties: https://stackoverflow.com/questions/1595476/are-qts-stylesheets-really-handling-dynamic-properties
+        # self.style().unpolish(key_widget)
+        not_none(self.style()).polish(self)
+
+    def __state_name(self):
+        # Same precedence as the stylesheet rules
+        if self.__touched:
+            return "touched"
+        if self.__matched:
+            return "matched"
+        if self.__matched_soft:
+            return "matched_soft"
+        return "normal"
+
 
     @pyqtProperty(bool)
     def touched(self):
@@ -158,7 +231,7 @@ class KeyLabel(QLabel):
 
         @watch(dpi.change, parent=self)
         def set_font():
-            self.setFont(QFont(FONT_FAMILY, dpi.dp(8)))
+            self.setFont(font(point_size=dpi.dp(8)))
 
     @pyqtProperty(bool)
     def highlighted(self):
@@ -169,5 +242,10 @@ class KeyLabel(QLabel):
         old_highlighted = self.__highlighted
 
         self.__highlighted = highlighted
-        if old_highlighted != highlighted:
+        if old_highlighted == highlighted: return
+
+        if key_pixmap_atlas.enabled:
+            # The label is hidden, and its key draws it from a pixmap
+            self.update()
+        else:
             not_none(self.style()).polish(self)
\ No newline at end of file
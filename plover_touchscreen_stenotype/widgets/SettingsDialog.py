@@ -1,5 +1,6 @@
 from PyQt5.QtCore import (
     Qt,
+    QTimer,
     pyqtBoundSignal,
 )
 from PyQt5.QtWidgets import (
@@ -15,6 +16,7 @@ from PyQt5.QtWidgets import (
     QLabel,
     QSizePolicy,
     QComboBox,
+    QPushButton,
 )
 from PyQt5.QtGui import (
     QFont,
@@ -29,13 +31,19 @@ else:
     Main = object
 
 from .FloatInput import FloatSlider, FloatEntry
-from ..settings import Settings
-from ..lib.reactivity import Ref, on, watch_many
+from .composables.UseTouchRecording import TOUCH_LOG_DIR
+from ..settings import Settings, StenotypeMode, ViewportRenderer, ViewportUpdateMode
+from ..lib.reactivity import Ref, on, watch, watch_many
 from ..lib.constants import FONT_FAMILY
 from ..lib.keyboard_layout.descriptors import KEYBOARD_LAYOUT_BUILDERS, DEFAULT_KEYBOARD_LAYOUT_NAME
+from ..lib.keyboard_layout.DisplacementEstimator import DISPLACEMENT_ESTIMATORS
 
 
 
+SLIDER_APPLY_INTERVAL = 16
+"""Minimum time in ms between applications of a setting while its slider is being dragged (about one frame at 60 Hz)"""
+
+
 class SettingsDialog(QDialog):
     def __init__(self, settings: Settings, parent: "Main | None"=None):
         super().__init__(parent)
@@ -61,6 +69,13 @@ class SettingsDialog(QDialog):
 
         layout_box = QGroupBox("Layout", self)
 
+        mode_combobox = QComboBox(layout_box)
+        mode_combobox.addItems(mode.value for mode in StenotypeMode)
+        mode_combobox.setCurrentText(settings.stenotype_mode)
+        @on(mode_combobox.currentTextChanged)
+        def update_stenotype_mode(mode_name: str):
+            settings.stenotype_mode = mode_name
+
         layout_combobox = QComboBox(layout_box)
         layout_combobox.addItems(KEYBOARD_LAYOUT_BUILDERS.keys())
         layout_combobox.setCurrentText(settings.keyboard_layout)
@@ -74,9 +89,26 @@ class SettingsDialog(QDialog):
         def update_adaptive_layout(checked: bool):
             settings.adaptive_layout = checked
 
+        estimator_combobox = QComboBox(layout_box)
+        estimator_combobox.addItems(DISPLACEMENT_ESTIMATORS.keys())
+        estimator_combobox.setCurrentText(settings.adaptive_layout_estimator)
+        @on(estimator_combobox.currentTextChanged)
+        def update_adaptive_layout_estimator(estimator_name: str):
+            settings.adaptive_layout_estimator = estimator_name
+
+        @watch_many(settings.stenotype_mode_ref.change, settings.adaptive_layout_ref.change, parent=self)
+        def set_keyboard_controls_enabled():
+            keyboard_mode = settings.stenotype_mode == StenotypeMode.KEYBOARD.value
+
+            layout_combobox.setEnabled(keyboard_mode)
+            adaptive_layout_checkbox.setEnabled(keyboard_mode)
+            estimator_combobox.setEnabled(keyboard_mode and settings.adaptive_layout)
+
         layout_box_layout = QVBoxLayout()
+        layout_box_layout.addWidget(mode_combobox)
         layout_box_layout.addWidget(layout_combobox)
         layout_box_layout.addWidget(adaptive_layout_checkbox)
+        layout_box_layout.addWidget(estimator_combobox)
 
         layout_box_layout.addStretch(1)
         layout_box.setLayout(layout_box_layout)
@@ -288,6 +320,159 @@ class SettingsDialog(QDialog):
         size_box.setLayout(size_box_layout)
 
 
+        input_box = QGroupBox("Input", self)
+
+        coalesce_touch_updates_checkbox = QCheckBox("Process touch movement once per frame", input_box)
+        coalesce_touch_updates_checkbox.setChecked(settings.coalesce_touch_updates)
+        coalesce_touch_updates_checkbox.setToolTip("Reduces CPU usage on touchscreens that report touches faster than the display refreshes")
+        @on(coalesce_touch_updates_checkbox.toggled)
+        def update_coalesce_touch_updates(checked: bool):
+            settings.coalesce_touch_updates = checked
+
+        slide_chording_checkbox = QCheckBox("Skip keys that sliding fingers pass over", input_box)
+        slide_chording_checkbox.setChecked(settings.slide_chording)
+        slide_chording_checkbox.setToolTip("After a finger's first key, only adds keys that the finger rests on, slows down on, or is lifted from")
+        @on(slide_chording_checkbox.toggled)
+        def update_slide_chording(checked: bool):
+            settings.slide_chording = checked
+
+        input_box_layout = QVBoxLayout()
+        input_box_layout.addWidget(coalesce_touch_updates_checkbox)
+        input_box_layout.addWidget(slide_chording_checkbox)
+
+        input_box_layout.addStretch(1)
+        input_box.setLayout(input_box_layout)
+
+
+        rendering_box = QGroupBox("Rendering", self)
+
+        viewport_renderer_combobox = QComboBox(rendering_box)
+        viewport_renderer_combobox.addItems(renderer.value for renderer in ViewportRenderer)
+        viewport_renderer_combobox.setCurrentText(settings.viewport_renderer)
+        viewport_renderer_combobox.setToolTip("OpenGL may not support a transparent background in frameless mode")
+        @on(viewport_renderer_combobox.currentTextChanged)
+        def update_viewport_renderer(renderer_name: str):
+            settings.viewport_renderer = renderer_name
+
+        viewport_update_mode_combobox = QComboBox(rendering_box)
+        viewport_update_mode_combobox.addItems(mode.value for mode in ViewportUpdateMode)
+        viewport_update_mode_combobox.setCurrentText(settings.viewport_update_mode)
+        @on(viewport_update_mode_combobox.currentTextChanged)
+        def update_viewport_update_mode(mode_name: str):
+            settings.viewport_update_mode = mode_name
+
+        proxy_caching_checkbox = QCheckBox("Cache key groups", rendering_box)
+        proxy_caching_checkbox.setChecked(settings.proxy_caching)
+        proxy_caching_checkbox.setToolTip("Repaints only the keys that change instead of whole key groups")
+        @on(proxy_caching_checkbox.toggled)
+        def update_proxy_caching(checked: bool):
+            settings.proxy_caching = checked
+
+        prerendered_keys_checkbox = QCheckBox("Pre-render keys", rendering_box)
+        prerendered_keys_checkbox.setChecked(settings.prerendered_keys)
+        prerendered_keys_checkbox.setToolTip("Draws keys from cached images instead of styling them on every change")
+        @on(prerendered_keys_checkbox.toggled)
+        def update_prerendered_keys(checked: bool):
+            settings.prerendered_keys = checked
+
+        rendering_box_layout = QGridLayout()
+        rendering_box_layout.addWidget(QLabel("Renderer"), 0, 0)
+        rendering_box_layout.addWidget(viewport_renderer_combobox, 0, 1)
+        rendering_box_layout.addWidget(QLabel("Updates"), 1, 0)
+        rendering_box_layout.addWidget(viewport_update_mode_combobox, 1, 1)
+        rendering_box_layout.addWidget(proxy_caching_checkbox, 2, 0, 1, 2)
+        rendering_box_layout.addWidget(prerendered_keys_checkbox, 3, 0, 1, 2)
+        rendering_box.setLayout(rendering_box_layout)
+
+
+        diagnostics_box = QGroupBox("Diagnostics", self)
+
+        touch_recording_checkbox = QCheckBox("Record touch sessions", diagnostics_box)
+        touch_recording_checkbox.setChecked(settings.touch_recording)
+        touch_recording_checkbox.setToolTip(f"Touch logs are saved to {TOUCH_LOG_DIR}")
+        @on(touch_recording_checkbox.toggled)
+        def update_touch_recording(checked: bool):
+            settings.touch_recording = checked
+
+        latency_overlay_checkbox = QCheckBox("Show stroke latency", diagnostics_box)
+        latency_overlay_checkbox.setChecked(settings.latency_overlay)
+        latency_overlay_checkbox.setToolTip("The full report can be logged with the touchscreen_stenotype.latency command")
+        @on(latency_overlay_checkbox.toggled)
+        def update_latency_overlay(checked: bool):
+            settings.latency_overlay = checked
+
+        paint_profiling_checkbox = QCheckBox("Profile painting", diagnostics_box)
+        paint_profiling_checkbox.setChecked(settings.paint_profiling)
+        paint_profiling_checkbox.setToolTip("Frame and paint times are written to the Plover log when this is unchecked")
+        @on(paint_profiling_checkbox.toggled)
+        def update_paint_profiling(checked: bool):
+            settings.paint_profiling = checked
+
+        diagnostics_box_layout = QVBoxLayout()
+        diagnostics_box_layout.addWidget(touch_recording_checkbox)
+        diagnostics_box_layout.addWidget(latency_overlay_checkbox)
+        diagnostics_box_layout.addWidget(paint_profiling_checkbox)
+
+        diagnostics_box_layout.addStretch(1)
+        diagnostics_box.setLayout(diagnostics_box_layout)
+
+
+        profiles_box = QGroupBox("Profiles", self)
+
+        profile_combobox = QComboBox(profiles_box)
+        profile_combobox.setEditable(True)
+        profile_combobox.setInsertPolicy(QComboBox.NoInsert)
+        profile_combobox.lineEdit().setPlaceholderText("Profile name")
+
+        save_profile_button = QPushButton("Save", profiles_box)
+        save_profile_button.setToolTip("Saves the current layout, key size and placement, and adaptive layout settings under this name")
+        apply_profile_button = QPushButton("Apply", profiles_box)
+        delete_profile_button = QPushButton("Delete", profiles_box)
+
+        @on(save_profile_button.clicked)
+        def save_profile():
+            settings.save_profile(profile_combobox.currentText())
+
+        @on(apply_profile_button.clicked)
+        def apply_profile():
+            settings.apply_profile(profile_combobox.currentText())
+
+        @on(delete_profile_button.clicked)
+        def delete_profile():
+            settings.delete_profile(profile_combobox.currentText())
+
+        @watch(settings.profiles_change, parent=self)
+        def update_profile_names():
+            profile_name = profile_combobox.currentText()
+            profile_combobox.clear()
+            profile_combobox.addItems(settings.profile_names)
+            profile_combobox.setCurrentText(profile_name)
+
+        @watch_many(profile_combobox.currentTextChanged, settings.profiles_change, parent=self)
+        def set_profile_buttons_enabled():
+            profile_name = profile_combobox.currentText()
+            profile_exists = profile_name in settings.profile_names
+
+            save_profile_button.setEnabled(Settings.is_valid_profile_name(profile_name))
+            apply_profile_button.setEnabled(profile_exists)
+            delete_profile_button.setEnabled(profile_exists)
+
+        # Sliders follow their settings already
+        @on(settings.profile_applied, parent=self)
+        def update_controls():
+            mode_combobox.setCurrentText(settings.stenotype_mode)
+            layout_combobox.setCurrentText(settings.keyboard_layout)
+            adaptive_layout_checkbox.setChecked(settings.adaptive_layout)
+            estimator_combobox.setCurrentText(settings.adaptive_layout_estimator)
+
+        profiles_box_layout = QGridLayout()
+        profiles_box_layout.addWidget(profile_combobox, 0, 0, 1, 3)
+        profiles_box_layout.addWidget(save_profile_button, 1, 0)
+        profiles_box_layout.addWidget(apply_profile_button, 1, 1)
+        profiles_box_layout.addWidget(delete_profile_button, 1, 2)
+        profiles_box.setLayout(profiles_box_layout)
+
+
         label_troubleshooting = QLabel("If there are issues with responsiveness, check the plugin description (§ Additional setup) for possible solutions",
                 self)
         label_troubleshooting.setWordWrap(True)
@@ -295,12 +480,16 @@ class SettingsDialog(QDialog):
 
 
         layout = QGridLayout()
-        layout.addWidget(layout_box, 0, 0)
-        layout.addWidget(stroke_preview_box, 1, 0)
-        layout.addWidget(window_box, 2, 0)
-        layout.addWidget(size_box, 0, 1, 4, 1)
-        layout.setRowStretch(3, 1)
-        layout.addWidget(label_troubleshooting, 4, 0, 1, 2)
+        layout.addWidget(profiles_box, 0, 0)
+        layout.addWidget(layout_box, 1, 0)
+        layout.addWidget(stroke_preview_box, 2, 0)
+        layout.addWidget(window_box, 3, 0)
+        layout.addWidget(input_box, 4, 0)
+        layout.addWidget(rendering_box, 5, 0)
+        layout.addWidget(diagnostics_box, 6, 0)
+        layout.addWidget(size_box, 0, 1, 8, 1)
+        layout.setRowStretch(7, 1)
+        layout.addWidget(label_troubleshooting, 8, 0, 1, 2)
         # layout.addWidget(sizes_box)
         self.setLayout(layout)
 
@@ -337,9 +526,39 @@ def _build_entry_slider_pair(
         nonlocal last_edit_from_slider
         last_edit_from_slider = True
 
-    @on(entry.input)
+    # Changing some settings (e.g., key sizes) rebuilds the geometry of the whole keyboard, and the slider emits for
+    # every pixel it is dragged. While dragging, only the latest value is applied, at most once per frame
+    pending_slider_value: "float | None" = None
+
+    apply_timer = QTimer(slider)
+    apply_timer.setSingleShot(True)
+
+    @on(apply_timer.timeout)
+    @on(slider.sliderReleased)
+    def apply_pending_slider_value():
+        nonlocal pending_slider_value
+
+        apply_timer.stop()
+        if pending_slider_value is None: return
+
+        value = pending_slider_value
+        pending_slider_value = None
+        ref.set(value)
+
     @on(slider.input)
+    def stage_slider_value(value: float):
+        nonlocal pending_slider_value
+        pending_slider_value = value
+
+        if not apply_timer.isActive():
+            apply_timer.start(SLIDER_APPLY_INTERVAL)
+
+    @on(entry.input)
     def update_settings(value: float):
+        nonlocal pending_slider_value
+        pending_slider_value = None
+        apply_timer.stop()
+
         ref.set(value)
 
     @on(ref.change)
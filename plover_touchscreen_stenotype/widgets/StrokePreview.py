@@ -14,9 +14,6 @@ from PyQt5.QtWidgets import (
     QSpacerItem,
     QSizePolicy,
 )
-from PyQt5.QtGui import (
-    QFont,
-)
 
 
 from math import cos, radians
@@ -24,9 +21,10 @@ from typing import Iterable
 
 from .DisplayAlignmentLayout import DisplayAlignmentLayout
 from ..settings import Settings
-from ..lib.reactivity import Ref, watch, watch_many
+from ..lib.reactivity import Ref, on, watch, watch_many
 from .composables.UseDpi import UseDpi
-from ..lib.constants import FONT_FAMILY
+from ..lib.util import font
+from ..lib.latency import latency_tracker, LatencyStage
 
 class StrokePreview(QWidget):
     def __init__(self, engine: Engine, settings: Settings, right_left_width_diff: Ref[float], parent: QWidget=None):
@@ -70,18 +68,19 @@ class StrokePreview(QWidget):
         labels_layout.addWidget(translation_label, 0, Qt.AlignCenter)
         labels_layout.addWidget(strut)
 
+        latency_label = QLabel(self)
+        latency_label.setTextFormat(Qt.PlainText)
+        latency_label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Fixed)
+        latency_label.setStyleSheet("color: #7f000000;")
+        labels_layout.addWidget(latency_label, 0, Qt.AlignCenter)
+
 
         @watch(dpi.change)
         def resize_label_fonts(): # Set font sizes in px rather than pt so they fit in the keyboard gaps
-            stroke_label_font = QFont(FONT_FAMILY)
-            translation_label_font = QFont(FONT_FAMILY)
-
-            stroke_label_font.setPixelSize(dpi.dp(16.8 if self.__settings.stroke_preview_translation else 21))
-            translation_label_font.setPixelSize(dpi.dp(21))
-
-            stroke_label.setFont(stroke_label_font)
+            stroke_label.setFont(font(pixel_size=dpi.dp(16.8 if self.__settings.stroke_preview_translation else 21)))
+            latency_label.setFont(font(point_size=dpi.dp(7)))
             middle_spacer.changeSize(0, dpi.dp(-4) if self.__settings.stroke_preview_full else 0)
-            translation_label.setFont(translation_label_font)
+            translation_label.setFont(font(pixel_size=dpi.dp(21)))
 
             labels_layout.invalidate()
 
@@ -112,6 +111,23 @@ class StrokePreview(QWidget):
 
             self.__display_translation(self.__last_translation, self.__last_stroke_matched)
             self.finish_stroke()
+
+        @on(latency_tracker.stroke_finished, parent=self)
+        def update_latency_label():
+            if not self.__settings.latency_overlay: return
+
+            last_latency = latency_tracker.last_stroke_latency
+            if last_latency is None:
+                latency_label.setText("")
+                return
+
+            histogram = latency_tracker.histograms[LatencyStage.STROKED]
+            latency_label.setText(f"{last_latency / 1000:.1f} ms (p50 {histogram.percentile(50) / 1000:.1f}, p95 {histogram.percentile(95) / 1000:.1f})")
+
+        @watch(self.__settings.latency_overlay_ref.change, parent=self)
+        def set_latency_label_visible():
+            latency_label.setVisible(self.__settings.latency_overlay)
+            update_latency_label()
         #endregion
 
 
@@ -123,7 +139,8 @@ class StrokePreview(QWidget):
             self.__last_translation = None
             return
 
-        translation, stroke_matched = _coming_translation(self.__engine, stroke.keys())
+        with latency_tracker.measure(LatencyStage.PREVIEW_LOOKUP):
+            translation, stroke_matched = _coming_translation(self.__engine, stroke.keys())
         self.__display_translation(translation, stroke_matched)
 
 
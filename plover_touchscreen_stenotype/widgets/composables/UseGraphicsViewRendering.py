@@ -0,0 +1,57 @@
+from PyQt5.QtCore import (
+    QObject,
+)
+from PyQt5.QtWidgets import (
+    QWidget,
+    QGraphicsItem,
+    QGraphicsView,
+    QGraphicsProxyWidget,
+    QOpenGLWidget,
+)
+
+from ...settings import Settings, ViewportRenderer, ViewportUpdateMode
+from ...lib.reactivity import watch
+from ...lib.util import not_none
+
+
+_VIEWPORT_UPDATE_MODES = {
+    ViewportUpdateMode.MINIMAL.value: QGraphicsView.MinimalViewportUpdate,
+    ViewportUpdateMode.SMART.value: QGraphicsView.SmartViewportUpdate,
+}
+
+class UseGraphicsViewRendering(QObject):
+    """Composable that applies the rendering settings to a graphics view and the proxy widgets in its scene."""
+
+    def __init__(self, view: QGraphicsView, settings: Settings):
+        super().__init__(view)
+
+        self.__view = view
+        self.__settings = settings
+
+        @watch(settings.viewport_renderer_ref.change, parent=self)
+        def set_viewport():
+            use_opengl = settings.viewport_renderer == ViewportRenderer.OPENGL.value
+            if use_opengl == isinstance(view.viewport(), QOpenGLWidget): return
+
+            view.setViewport(QOpenGLWidget() if use_opengl else QWidget())
+
+        @watch(settings.viewport_update_mode_ref.change, parent=self)
+        def set_viewport_update_mode():
+            view.setViewportUpdateMode(_VIEWPORT_UPDATE_MODES.get(settings.viewport_update_mode, QGraphicsView.MinimalViewportUpdate))
+
+        @watch(settings.proxy_caching_ref.change, parent=self)
+        def set_proxy_caching():
+            self.update_item_caching()
+
+    def update_item_caching(self):
+        """Sets the cache mode of the proxy widgets in the scene. Must be called again when proxies are added.
+
+        Cached proxies are painted from a pixmap in device coordinates. Updates from an embedded widget (such as a key
+        changing state) only invalidate that widget's part of the pixmap, so only the keys that changed are repainted.
+        """
+
+        cache_mode = QGraphicsItem.DeviceCoordinateCache if self.__settings.proxy_caching else QGraphicsItem.NoCache
+
+        for item in not_none(self.__view.scene()).items():
+            if not isinstance(item, QGraphicsProxyWidget): continue
+            item.setCacheMode(cache_mode)
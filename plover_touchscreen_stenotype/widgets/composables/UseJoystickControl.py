@@ -1,5 +1,3 @@
-import math
-
 from PyQt5.QtCore import (
     QPointF,
 )
@@ -12,7 +10,7 @@ from PyQt5.QtGui import (
     QTouchEvent,
 )
 
-from ...lib.Joystick import Joystick, JoystickLayout, JoystickSemicircleSide, MAX_DISPLACEMENT, NEUTRAL_THRESHOLD_PROPORTION, TRIGGER_DISTANCE
+from ...lib.Joystick import Joystick, JoystickKinematics, JoystickLayout, MAX_DISPLACEMENT, NEUTRAL_THRESHOLD_PROPORTION
 from .UseDpi import UseDpi
 from ...lib.reactivity import watch
 
@@ -37,8 +35,13 @@ class UseJoystickControl:
             return proxy_transform_center_inverse().map(touch.pos())
         self.widget_touch_pos = pos_from_center
 
+        def scene_center():
+            return proxy.mapToScene(proxy_center)
+        self.scene_center = scene_center
+
         def touch_movement(touch: QTouchEvent.TouchPoint):
-            return proxy_transform_center_inverse().map(touch.pos()) - proxy_transform_center_inverse().map(touch.lastPos())
+            transform = proxy_transform_center_inverse()
+            return transform.map(touch.pos()) - transform.map(touch.lastPos())
 
         @watch(joystick.center.change)
         def update_proxy_center():
@@ -50,101 +53,32 @@ class UseJoystickControl:
             proxy.setRotation(joystick.angle.value)
 
 
+        kinematics = JoystickKinematics(joystick)
+
+        @watch(dpi.change)
+        def update_kinematics_limits():
+            kinematics.set_limits(dpi.cm(MAX_DISPLACEMENT), dpi.cm(MAX_DISPLACEMENT * NEUTRAL_THRESHOLD_PROPORTION))
+
+
         if joystick.layout == JoystickLayout.VERTICAL:
             def on_initial_touch(touch: QTouchEvent.TouchPoint):
                 joystick.center.value = QPointF(joystick.center.value.x(), pos_from_offset(touch).y())
-                joystick.displacement.value = QPointF(0, 0)
+                joystick.reset_displacement()
 
                 on_touch_begin(touch)
-            
-            def on_touch_begin(touch: QTouchEvent.TouchPoint):
-                on_touch_update(touch)
-
-            def on_touch_update(touch: QTouchEvent.TouchPoint):
-                movement = touch_movement(touch)
-                max_displacement = dpi.cm(MAX_DISPLACEMENT)
-
-                new_displacement = joystick.displacement.value + movement
-                if new_displacement.y() > max_displacement:
-                    joystick.center.value = joystick.center.value + QPointF(movement.x(), new_displacement.y() - max_displacement)
-                    joystick.displacement.value = QPointF(0, max_displacement)
-                elif new_displacement.y() < -max_displacement:
-                    joystick.center.value = joystick.center.value + QPointF(movement.x(), max_displacement + new_displacement.y())
-                    joystick.displacement.value = QPointF(0, -max_displacement)
-                else:
-                    joystick.center.value = joystick.center.value + QPointF(movement.x(), 0)
-                    joystick.displacement.value = QPointF(0, new_displacement.y())
-
-                if abs(joystick.displacement.value.y()) < dpi.cm(MAX_DISPLACEMENT * NEUTRAL_THRESHOLD_PROPORTION):
-                    joystick.selected_key_index.value = 1
-                elif joystick.displacement.value.y() > 0:
-                    joystick.selected_key_index.value = 2
-                else:
-                    joystick.selected_key_index.value = 0
-            self.on_touch_update = on_touch_update
-
-        elif joystick.layout == JoystickLayout.SEMICIRCLE:
+
+        else:
             def on_initial_touch(touch: QTouchEvent.TouchPoint):
                 joystick.center.value = pos_from_offset(touch)
 
                 on_touch_begin(touch)
-            
-            def on_touch_begin(touch: QTouchEvent.TouchPoint):
-                on_touch_update(touch)
-
-            def on_touch_update(touch: QTouchEvent.TouchPoint):
-                movement = touch_movement(touch)
-                new_displacement = joystick.displacement.value + movement
-
-                new_displacement_angle = math.atan2(new_displacement.y(), new_displacement.x())
-                new_displacement_hypot = math.hypot(new_displacement.x(), new_displacement.y())
 
-                max_displacement = dpi.cm(MAX_DISPLACEMENT)
+        def on_touch_begin(touch: QTouchEvent.TouchPoint):
+            on_touch_update(touch)
 
-                if new_displacement_hypot > max_displacement:
-                    joystick.center.value = joystick.center.value + (new_displacement_hypot - max_displacement) * QPointF(math.cos(new_displacement_angle), math.sin(new_displacement_angle))
-                    joystick.displacement.value = max_displacement * QPointF(math.cos(new_displacement_angle), math.sin(new_displacement_angle))
-                else:
-                    joystick.displacement.value = new_displacement
-
-                if joystick.displacement_hypot < dpi.cm(MAX_DISPLACEMENT * NEUTRAL_THRESHOLD_PROPORTION):
-                    joystick.selected_key_index.value = 0
-                else: 
-                    angle = (joystick.displacement_angle + math.tau / 16) % math.tau
-                    joystick.selected_key_index.value = math.floor(angle / (math.tau / 8)) + 1
-                
-
-
-        elif joystick.layout == JoystickLayout.CIRCLE:
-            def on_initial_touch(touch: QTouchEvent.TouchPoint):
-                joystick.center.value = pos_from_offset(touch)
-
-                on_touch_begin(touch)
-            
-            def on_touch_begin(touch: QTouchEvent.TouchPoint):
-                on_touch_update(touch)
-
-            def on_touch_update(touch: QTouchEvent.TouchPoint):
-                movement = touch_movement(touch)
-                new_displacement = joystick.displacement.value + movement
-
-                new_displacement_angle = math.atan2(new_displacement.y(), new_displacement.x())
-                new_displacement_hypot = math.hypot(new_displacement.x(), new_displacement.y())
-
-                max_displacement = dpi.cm(MAX_DISPLACEMENT)
-
-                if new_displacement_hypot > max_displacement:
-                    joystick.center.value = joystick.center.value + (new_displacement_hypot - max_displacement) * QPointF(math.cos(new_displacement_angle), math.sin(new_displacement_angle))
-                    joystick.displacement.value = max_displacement * QPointF(math.cos(new_displacement_angle), math.sin(new_displacement_angle))
-                else:
-                    joystick.displacement.value = new_displacement
-
-                if joystick.displacement_hypot < dpi.cm(MAX_DISPLACEMENT * NEUTRAL_THRESHOLD_PROPORTION):
-                    joystick.selected_key_index.value = 0
-                else: 
-                    angle = (joystick.displacement_angle + math.tau / 16) % math.tau
-                    joystick.selected_key_index.value = math.floor(angle / (math.tau / 8)) + 1
-            
+        def on_touch_update(touch: QTouchEvent.TouchPoint):
+            movement = touch_movement(touch)
+            kinematics.move(movement.x(), movement.y())
 
         def on_touch_end():
             joystick.selected_key_index.value = None
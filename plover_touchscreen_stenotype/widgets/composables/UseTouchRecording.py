@@ -0,0 +1,78 @@
+from datetime import datetime
+from pathlib import Path
+
+from PyQt5.QtCore import (
+    QObject,
+    QEvent,
+)
+from PyQt5.QtWidgets import (
+    QWidget,
+)
+from PyQt5.QtGui import (
+    QTouchEvent,
+)
+
+from plover.oslayer.config import CONFIG_DIR
+from plover.steno import Stroke
+
+from ...settings import Settings
+from ...lib.reactivity import on, watch
+from ...lib.touch_log import TouchLogWriter, TouchLogRecord, TouchLogRecordKind
+
+
+TOUCH_LOG_DIR = Path(CONFIG_DIR) / "touchscreen_stenotype_logs"
+
+class UseTouchRecording(QObject):
+    """Composable that records the touches received by a widget, and the keys and strokes resolved from them, to a
+    touch log while the `touch_recording` setting is enabled. Each recording session is written to a new file."""
+
+    def __init__(self, widget: QWidget, settings: Settings):
+        super().__init__(widget)
+
+        self.__widget = widget
+        self.__writer: "TouchLogWriter | None" = None
+        self.__last_timestamp = 0
+
+        @watch(settings.touch_recording_ref.change, parent=self)
+        def set_recording():
+            if settings.touch_recording and self.__writer is None:
+                self.__writer = TouchLogWriter(TOUCH_LOG_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.ptsl")
+            elif not settings.touch_recording and self.__writer is not None:
+                self.__writer.close()
+                self.__writer = None
+
+        @on(widget.destroyed)
+        def close_writer():
+            if self.__writer is None: return
+            self.__writer.close()
+            self.__writer = None
+
+    @property
+    def recording(self):
+        return self.__writer is not None
+
+    def record_event(self, event: QTouchEvent, touch_points: "list[QTouchEvent.TouchPoint]"):
+        writer = self.__writer
+        if writer is None: return
+
+        timestamp = self.__last_timestamp = event.timestamp()
+
+        if event.type() == QEvent.TouchBegin:
+            writer.write(TouchLogRecord(TouchLogRecordKind.VIEWPORT, 0, 0, timestamp, self.__widget.width(), self.__widget.height(), 0))
+
+        writer.write(TouchLogRecord(TouchLogRecordKind.EVENT, event.type(), 0, timestamp, 0, 0, 0))
+        for touch in touch_points:
+            pos = touch.pos()
+            writer.write(TouchLogRecord(TouchLogRecordKind.TOUCH_POINT, touch.state(), touch.id(), timestamp, pos.x(), pos.y(), 0))
+
+    def record_key(self, touch_id: int, substroke: Stroke):
+        writer = self.__writer
+        if writer is None: return
+
+        writer.write(TouchLogRecord(TouchLogRecordKind.KEY, 0, touch_id, self.__last_timestamp, 0, 0, int(substroke)))
+
+    def record_stroke(self, stroke: Stroke):
+        writer = self.__writer
+        if writer is None: return
+
+        writer.write(TouchLogRecord(TouchLogRecordKind.STROKE, 0, 0, self.__last_timestamp, 0, 0, int(stroke)))
@@ -30,12 +30,18 @@ from typing import TYPE_CHECKING
 
 from ..KeyWidget import KeyWidget
 from ...settings import Settings
-from ...lib.Joystick import Joystick, JoystickLayout, JoystickSemicircleSide, MAX_DISPLACEMENT, NEUTRAL_THRESHOLD_PROPORTION, TRIGGER_DISTANCE
+from ...lib.Joystick import Joystick, JoystickCenters, JoystickLayout, MAX_DISPLACEMENT, NEUTRAL_THRESHOLD_PROPORTION, TRIGGER_DISTANCE
 from ..composables.UseJoystickControl import UseJoystickControl
+from ...lib.joystick_layout.JoystickLayoutDescriptor import compile_joystick_centers
+from ...lib.joystick_layout.descriptors import get_joystick_layout_descriptor, DEFAULT_JOYSTICK_LAYOUT_NAME
 from ...lib.reactivity import Ref, computed, on, on_many, watch, watch_many
 from ..composables.UseDpi import UseDpi
+from ..composables.UseTouchRecording import UseTouchRecording
+from ..composables.UseGraphicsViewRendering import UseGraphicsViewRendering
 from ...lib.constants import GRAPHICS_VIEW_STYLE, KEY_GROUP_STYLESHEET
-from ...lib.util import child, empty_stroke, render, not_none
+from ...lib.util import child, empty_stroke, key_substroke, render, not_none
+from ...lib.latency import latency_tracker, LatencyStage
+from ...lib.paint_profiler import ProfiledGraphicsView, add_profiled_widget
 if TYPE_CHECKING:
     from ...Main import Main
 else:
@@ -54,6 +60,9 @@ class JoysticksWidget(QWidget):
     def __init__(self, settings: Settings, left_right_width_diff: Ref[float], parent: "QWidget | None"=None):
         super().__init__(parent)
 
+        self.manual_timers = False
+        """Unused, since the joysticks have no timers; see `KeyboardWidget.manual_timers`"""
+
         key_widgets: list[KeyWidget] = []
 
         tapped_joysticks: Ref[dict[Joystick, KeyWidget]] = Ref({})
@@ -78,144 +87,36 @@ class JoysticksWidget(QWidget):
 
 
         dpi = UseDpi(self)
+        recording = UseTouchRecording(self, settings)
 
+        # The joystick layout is symmetric
+        left_right_width_diff.value = 0
 
-        joysticks = (
-            Joystick(
-                (
-                    ("^+S", ""),
-                    ("S", "S"),
-                    ("S", "S"),
-                    ("+S", ""),
-                    ("+", "+"),
-                    ("^+", ""),
-                    ("^", "^"),
-                    ("^S", ""),
-                    ("S", "S"),
-                ),
-                center=QPointF(dpi.cm(-10), -dpi.cm(2 * settings.pinky_stagger_fac)),
-                layout=JoystickLayout.SEMICIRCLE,
-                semicircle_flat_side=JoystickSemicircleSide.RIGHT,
-            ),
-            Joystick(
-                (
-                    ("T", "T"),
-                    ("TK", ""),
-                    ("K", "K"),
-                ),
-                center=QPointF(dpi.cm(-7.5), -dpi.cm(2 * settings.ring_stagger_fac)),
-                layout=JoystickLayout.VERTICAL,
-            ),
-            Joystick(
-                (
-                    ("P", "P"),
-                    ("PW", ""),
-                    ("W", "W"),
-                ),
-                center=QPointF(dpi.cm(-5), -dpi.cm(2 * settings.middle_stagger_fac)),
-                layout=JoystickLayout.VERTICAL,
-            ),
-            Joystick(
-                (
-                    ("&HR", ""),
-                    ("&", "&&"),
-                    ("&", "&&"),
-                    ("&R", ""),
-                    ("R", "R"),
-                    ("HR", ""),
-                    ("H", "H"),
-                    ("&H", ""),
-                    ("&", "&&"),
-                ),
-                center=QPointF(dpi.cm(-2.5), -dpi.cm(2 * settings.index_stagger_fac)),
-                layout=JoystickLayout.SEMICIRCLE,
-                semicircle_flat_side=JoystickSemicircleSide.LEFT,
-            ),
-            Joystick(
-                (
-                    ("*FR", ""),
-                    ("-FR", ""),
-                    ("-R", "R"),
-                    ("*R", ""),
-                    ("*", "*"),
-                    ("*", "*"),
-                    ("*", "*"),
-                    ("*F", ""),
-                    ("-F", "F"),
-                ),
-                center=QPointF(dpi.cm(2.5), -dpi.cm(2 * settings.index_stagger_fac)),
-                layout=JoystickLayout.SEMICIRCLE,
-                semicircle_flat_side=JoystickSemicircleSide.RIGHT,
-            ),
-            Joystick(
-                (
-                    ("-P", "P"),
-                    ("-PB", ""),
-                    ("-B", "B"),
-                ),
-                center=QPointF(dpi.cm(5), -dpi.cm(2 * settings.middle_stagger_fac)),
-                layout=JoystickLayout.VERTICAL,
-            ),
-            Joystick(
-                (
-                    ("-L", "L"),
-                    ("-LG", ""),
-                    ("-G", "G"),
-                ),
-                center=QPointF(dpi.cm(7.5), -dpi.cm(2 * settings.ring_stagger_fac)),
-                layout=JoystickLayout.VERTICAL,
-            ),
-            Joystick(
-                (
-                    ("-TSDZ", ""),
-                    ("-DZ", ""),
-                    ("-Z", "Z"),
-                    ("-SZ", ""),
-                    ("-S", "S"),
-                    ("-TS", ""),
-                    ("-T", "T"),
-                    ("-TD", ""),
-                    ("-D", "D"),
-                ),
-                center=QPointF(dpi.cm(10), -dpi.cm(2 * settings.pinky_stagger_fac)),
-                layout=JoystickLayout.SEMICIRCLE,
-                semicircle_flat_side=JoystickSemicircleSide.LEFT,
-            ),
-            Joystick(
-                (
-                    ("#AO", ""),
-                    ("#O", ""),
-                    ("#", "#"),
-                    ("#", "#"),
-                    ("#", "#"),
-                    ("#A", ""),
-                    ("A", "A"),
-                    ("AO", ""),
-                    ("O", "O"),
-                ),
-                center=QPointF(dpi.cm(-2), dpi.cm(2)),
-                layout=JoystickLayout.SEMICIRCLE,
-                semicircle_flat_side=JoystickSemicircleSide.UP,
-            ),
+
+        layout_descriptor = get_joystick_layout_descriptor(DEFAULT_JOYSTICK_LAYOUT_NAME)
+
+        joysticks = tuple(
             Joystick(
-                (
-                    ("_EU", ""),
-                    ("_U", ""),
-                    ("_", "_"),
-                    ("_", "_"),
-                    ("_", "_"),
-                    ("_E", ""),
-                    ("E", "E"),
-                    ("EU", ""),
-                    ("U", "U"),
-                ),
-                center=QPointF(dpi.cm(2), dpi.cm(2)),
-                layout=JoystickLayout.SEMICIRCLE,
-                semicircle_flat_side=JoystickSemicircleSide.UP,
-            ),
+                joystick_descriptor.keys,
+                center=base_center,
+                layout=joystick_descriptor.layout,
+                semicircle_flat_side=joystick_descriptor.semicircle_flat_side,
+            )
+            for joystick_descriptor, base_center in zip(layout_descriptor.joysticks, compile_joystick_centers(layout_descriptor, settings, dpi))
         )
 
+        @on_many(dpi.change, *(getattr(settings, f"{setting_name}_ref").change for setting_name in layout_descriptor.stagger_settings), parent=self)
+        def update_base_centers():
+            for joystick, base_center in zip(joysticks, compile_joystick_centers(layout_descriptor, settings, dpi)):
+                joystick.set_base_center(base_center)
+
+                # Joysticks in use are moved back once the current stroke ends
+                if joystick in used_joysticks: continue
+                joystick.reset_center()
+
         joystick_widgets: "dict[Joystick, _GridJoystickWidget | _VerticalJoystickWidget]" = {}
+        joystick_centers = JoystickCenters(len(joysticks))
+        graphics_view: QGraphicsView
 
         for joystick in reversed(joysticks):
             @on(joystick.selected_key_index.change)
@@ -231,9 +132,10 @@ class JoysticksWidget(QWidget):
         def render_widget(widget: QWidget, layout: QGridLayout):
             scene = QGraphicsScene(widget)
 
-            @child(self, QGraphicsView(scene))
+            @child(self, ProfiledGraphicsView(scene))
             def render_widget(view: QGraphicsView, _: None):
                 nonlocal joystick_widgets
+                nonlocal graphics_view
 
                 view.setStyleSheet(GRAPHICS_VIEW_STYLE)
             
@@ -243,34 +145,41 @@ class JoysticksWidget(QWidget):
                 view.setSceneRect(rect)
 
                 joystick_widgets = {
-                    joysticks[0]: _GridJoystickWidget(view, joysticks[0], dpi=dpi),
-                    joysticks[1]: _VerticalJoystickWidget(view, joysticks[1], dpi=dpi),
-                    joysticks[2]: _VerticalJoystickWidget(view, joysticks[2], dpi=dpi),
-                    joysticks[3]: _GridJoystickWidget(view, joysticks[3], dpi=dpi),
-                    joysticks[4]: _GridJoystickWidget(view, joysticks[4], dpi=dpi),
-                    joysticks[5]: _VerticalJoystickWidget(view, joysticks[5], dpi=dpi),
-                    joysticks[6]: _VerticalJoystickWidget(view, joysticks[6], dpi=dpi),
-                    joysticks[7]: _GridJoystickWidget(view, joysticks[7], dpi=dpi),
-                    joysticks[8]: _GridJoystickWidget(view, joysticks[8], dpi=dpi),
-                    joysticks[9]: _GridJoystickWidget(view, joysticks[9], dpi=dpi),
+                    joystick: (
+                        _VerticalJoystickWidget(view, joystick, dpi=dpi)
+                            if joystick.layout == JoystickLayout.VERTICAL
+                            else _GridJoystickWidget(view, joystick, dpi=dpi)
+                    )
+                    for joystick in joysticks
                 }
                 for joystick_widget in joystick_widgets.values():
                     key_widgets.extend(joystick_widget.key_widgets)
 
-                left_bank = not_none(scene.createItemGroup(joystick_widgets[joystick].proxy for joystick in joysticks[0:4]))
-                right_bank = not_none(scene.createItemGroup(joystick_widgets[joystick].proxy for joystick in joysticks[4:8]))
-                left_vowels = not_none(scene.createItemGroup((joystick_widgets[joysticks[8]].proxy,)))
-                right_vowels = not_none(scene.createItemGroup((joystick_widgets[joysticks[9]].proxy,)))
+                UseGraphicsViewRendering(view, settings).update_item_caching()
 
-                @watch(settings.bank_angle_ref.change)
-                def set_bank_angle():
-                    left_bank.setRotation(settings.bank_angle)
-                    right_bank.setRotation(-settings.bank_angle)
+                def update_joystick_center(index: int):
+                    joystick_centers.set_center(index, joystick_widgets[joysticks[index]].scene_center())
 
-                @watch(settings.vowel_angle_ref.change)
-                def set_bank_angle():
-                    left_vowels.setRotation(settings.vowel_angle)
-                    right_vowels.setRotation(-settings.vowel_angle)
+                def update_all_joystick_centers():
+                    for index in range(len(joysticks)):
+                        update_joystick_center(index)
+
+                # Connected after the joystick widgets' own handlers, so the proxies have already been moved
+                for index, joystick in enumerate(joysticks):
+                    @watch(joystick.center.change)
+                    def update_center(*_, index=index):
+                        update_joystick_center(index)
+
+                for group in layout_descriptor.groups:
+                    item_group = not_none(scene.createItemGroup(joystick_widgets[joysticks[index]].proxy for index in group.joystick_indices))
+
+                    @watch(getattr(settings, f"{group.angle_setting}_ref").change, parent=self)
+                    def set_group_angle(*_, item_group=item_group, group=group):
+                        angle = getattr(settings, group.angle_setting)
+                        item_group.setRotation(-angle if group.mirrored else angle)
+                        update_all_joystick_centers()
+
+                graphics_view = view
 
                 return ()
             
@@ -288,6 +197,8 @@ class JoysticksWidget(QWidget):
 
         @on_many(tapped_key_widgets.change, selected_key_widgets.change, current_stroke.change)
         def update_key_widget_styles_and_state():
+            current_stroke_mask = int(current_stroke.value)
+
             for key_widget in key_widgets:
                 old_touched, old_matched, old_matched_soft = key_widget.touched, key_widget.matched, key_widget.matched_soft
 
@@ -301,7 +212,7 @@ class JoysticksWidget(QWidget):
                     key_widget.matched = False
                     key_widget.matched_soft = True
 
-                elif key_widget.substroke in current_stroke.value:
+                elif (current_stroke_mask & key_widget.substroke_mask) == key_widget.substroke_mask:
                     key_widget.touched = False
                     key_widget.matched = True
                     key_widget.matched_soft = False
@@ -313,28 +224,15 @@ class JoysticksWidget(QWidget):
 
 
                 if (old_touched, old_matched, old_matched_soft) != (key_widget.touched, key_widget.matched, key_widget.matched_soft):
-                    # Reload stylesheet for dynamic properties: https://stackoverflow.com/questions/1595476/are-qts-stylesheets-really-handling-dynamic-properties
-                    # self.style().unpolish(key_widget)
-                    not_none(self.style()).polish(key_widget)
+                    key_widget.refresh_style()
         
 
         n_expected_touches = 0
         state = JoysticksState.GATHERING_TOUCHES
 
         def joysticks_sorted_by_distance(touch: QTouchEvent.TouchPoint):
-            filtered_joysticks: list[tuple[Joystick, int]] = []
-
-            for joystick in joysticks:
-                joystick_widget = joystick_widgets[joystick]
-                distance = joystick.distance(joystick_widget.widget_touch_pos(touch))
-                
-                if distance > dpi.cm(TRIGGER_DISTANCE)**2:
-                    continue
-
-                filtered_joysticks.append((joystick, distance))
-
-            sorted_joysticks = sorted(filtered_joysticks, key=lambda pair: pair[1])
-            return tuple(pair[0] for pair in sorted_joysticks)
+            scene_touch_pos = graphics_view.viewportTransform().inverted()[0].map(touch.pos())
+            return tuple(joysticks[index] for index in joystick_centers.indices_near(scene_touch_pos, dpi.cm(TRIGGER_DISTANCE)))
 
 
         def handle_touch_event(event: QTouchEvent):
@@ -346,7 +244,10 @@ class JoysticksWidget(QWidget):
             nonlocal state
             nonlocal used_joysticks
 
+            latency_tracker.begin_event(event.timestamp())
+
             touch_points = event.touchPoints()
+            recording.record_event(event, touch_points)
 
             new_selected_joysticks = selected_joysticks.copy()
 
@@ -370,7 +271,10 @@ class JoysticksWidget(QWidget):
                             joystick_widget.on_touch_begin(touch)
 
                         if state == JoysticksState.AWAITING_TAPS:
-                            tapped_joysticks.value[joystick] = joystick_widget.key_widgets[not_none(joystick.selected_key_index.value)]
+                            tapped_key_widget = joystick_widget.key_widgets[not_none(joystick.selected_key_index.value)]
+                            recording.record_key(touch.id(), tapped_key_widget.substroke)
+
+                            tapped_joysticks.value[joystick] = tapped_key_widget
                             tapped_joysticks.emit()
 
                         break
@@ -386,6 +290,7 @@ class JoysticksWidget(QWidget):
                         del new_selected_joysticks[touch.id()]
 
             selected_joysticks = new_selected_joysticks
+            latency_tracker.record(LatencyStage.HIT_TEST)
 
             if new_release and state == JoysticksState.GATHERING_TOUCHES:
                 state = JoysticksState.AWAITING_TAPS
@@ -408,6 +313,9 @@ class JoysticksWidget(QWidget):
                     and len(selected_joysticks) == n_expected_touches
                     and len(current_stroke.value.keys()) > 0
             ):
+                recording.record_stroke(current_stroke.value)
+                latency_tracker.record(LatencyStage.STROKE_ASSEMBLY)
+                latency_tracker.begin_stroke()
                 self.end_stroke.emit(current_stroke.value)
 
                 for joystick in joysticks:
@@ -438,6 +346,14 @@ class JoysticksWidget(QWidget):
         self.__handle_touch_event(event)
 
         return True
+
+    def fire_timers_due_by(self, timestamp: int):
+        """The joysticks have no timers; see `KeyboardWidget.fire_timers_due_by`."""
+        pass
+
+    def reset_positions(self):
+        """The joysticks do not move; see `KeyboardWidget.reset_positions`."""
+        pass
     
 
 class _JoystickTriggerWidget(QToolButton):
@@ -468,7 +384,7 @@ class _VerticalJoystickWidget(QWidget):
             @child(widget, QWidget(), QVBoxLayout())
             def render_widget(joystick_container: QWidget, layout: QVBoxLayout):
                 nonlocal key_widgets
-                key_widgets = tuple(KeyWidget(Stroke.from_steno(steno), label, dpi=dpi) for steno, label in joystick.key_descriptors)
+                key_widgets = tuple(KeyWidget(key_substroke(steno), label, dpi=dpi) for steno, label in joystick.key_descriptors)
 
                 for key_widget in key_widgets:
                     layout.addWidget(key_widget)
@@ -483,7 +399,7 @@ class _VerticalJoystickWidget(QWidget):
             return ()
 
         self.__key_widgets = key_widgets
-        self.__proxy = proxy = not_none(not_none(view.scene()).addWidget(self))
+        self.__proxy = proxy = add_profiled_widget(not_none(view.scene()), self, " ".join(steno for steno, label in joystick.key_descriptors if label))
 
         joystick_control = UseJoystickControl(joystick, view, self, proxy, dpi=dpi)
 
@@ -525,7 +441,7 @@ class _GridJoystickWidget(QWidget):
             def render_widget(joystick_container: QWidget, layout: QGridLayout):
                 nonlocal key_widgets
 
-                key_widgets = tuple(KeyWidget(Stroke.from_steno(steno), label, dpi=dpi) for steno, label in joystick.key_descriptors)
+                key_widgets = tuple(KeyWidget(key_substroke(steno), label, dpi=dpi) for steno, label in joystick.key_descriptors)
 
                 @watch(dpi.change)
                 def set_size():
@@ -546,7 +462,7 @@ class _GridJoystickWidget(QWidget):
             return ()
 
         self.__key_widgets = key_widgets
-        self.__proxy = proxy = not_none(not_none(view.scene()).addWidget(self))
+        self.__proxy = proxy = add_profiled_widget(not_none(view.scene()), self, " ".join(steno for steno, label in joystick.key_descriptors if label))
 
         joystick_control = UseJoystickControl(joystick, view, self, proxy, dpi=dpi)
 
@@ -1,9 +1,7 @@
 from typing import cast
 
 from PyQt5.QtCore import (
-    pyqtSignal,
     pyqtBoundSignal,
-    QPointF,
 )
 from PyQt5.QtWidgets import (
     QWidget,
@@ -24,11 +22,15 @@ from plover.steno import Stroke
 import plover.log
 
 from ..KeyWidget import KeyWidget
-from ...lib.keyboard_layout.LayoutDescriptor import Group, GroupOrganizationType, KeyGroup, Key, GroupOrganizationType, ADAPTATION_RATE, MEAN_DEVIATION_FACTOR
+from ...lib.keyboard_layout.LayoutDescriptor import Group, GroupOrganizationType, KeyGroup, Key, GroupOrganizationType, MEAN_DEVIATION_FACTOR
+from ...lib.keyboard_layout.DisplacementEstimator import DisplacementEstimator, build_displacement_estimator
+from ...lib.keyboard_layout.AdaptiveTransformTable import AdaptiveTransformTable
 from ...lib.reactivity import on, on_many, watch, watch_many, Ref, computed
+from ...lib.touch_occupancy import TouchOccupancy
 from ..composables.UseDpi import UseDpi
 from ...lib.constants import KEY_GROUP_STYLESHEET
-from ...lib.util import empty_stroke, not_none, render, child, Point
+from ...lib.util import key_substroke, not_none, render, child, Point
+from ...lib.paint_profiler import add_profiled_widget
 
 
 def set_group_transforms(item: QGraphicsItem, group: "Group | KeyGroup", bounding_rect_change_signals: list[pyqtBoundSignal], *, displacement: Ref[Point], dpi: UseDpi):
@@ -53,9 +55,6 @@ def set_group_transforms(item: QGraphicsItem, group: "Group | KeyGroup", boundin
             item.setRotation(not_none(group.angle).value)
 
 class KeyGroupWidget(QWidget):
-    displacement_this_stroke_change = pyqtSignal(object, object)  # KeyGroupWidget, Point | None, Point | None,
-    last_displacement_change = pyqtSignal(object, object)  # KeyGroupWidget, Point | None, Point | None,
-
     def __init__(
         self,
         group: KeyGroup,
@@ -63,10 +62,12 @@ class KeyGroupWidget(QWidget):
         view: QGraphicsView,
         parent: "QWidget | None"=None,
         *,
-        touched_key_widgets: Ref[set[KeyWidget]],
+        touch_occupancy: TouchOccupancy[KeyWidget],
         current_stroke: Ref[Stroke],
         avg_group_displacement_this_stroke: Ref[Point],
         avg_group_displacement: Ref[Point],
+        adaptive_transform_table: AdaptiveTransformTable,
+        estimator_name: Ref[str],
         dpi: UseDpi,
     ):
         super().__init__(parent)
@@ -77,6 +78,8 @@ class KeyGroupWidget(QWidget):
 
         key_widgets_to_keys: dict[KeyWidget, Key] = {}
 
+        table_slot = adaptive_transform_table.add_slot()
+
 
         last_touch: "Ref[QTouchEvent.TouchPoint | None]" = Ref(None)
         last_touched_key_widget: "Ref[KeyWidget | None]" = Ref(None)
@@ -89,7 +92,18 @@ class KeyGroupWidget(QWidget):
         tapped_in_current_stroke = Ref(False)
         last_displacement = Ref(Point(0, 0))
 
+        estimator: DisplacementEstimator
+        @watch(estimator_name.change, parent=self)
+        def set_estimator():
+            nonlocal estimator
+            estimator = build_displacement_estimator(estimator_name.value)
+
+        last_release_point = Point(0, 0)
+        """Position of the last release in this stroke, relative to the undisplaced key center"""
+
         def recompute_displacement_this_stroke():
+            nonlocal last_release_point
+
             if not displacement_active.value:
                 return Point(0, 0)
             
@@ -100,31 +114,54 @@ class KeyGroupWidget(QWidget):
             key_widget_center = not_none(last_touched_key_widget.value).geometry().center()
             proxy_inverse_transform = proxy.deviceTransform(view.viewportTransform()).translate(-proxy_rect.x(), -proxy_rect.y()).inverted()[0]
             local_touch_pos = proxy_inverse_transform.map(not_none(last_touch.value).pos())
-            return Point(
-                dpi.px_to_cm(local_touch_pos.x() - key_widget_center.x()),# - (key.center_offset_x.value if key.center_offset_x is not None else 0),
-                dpi.px_to_cm(local_touch_pos.y() - key_widget_center.y()),# - (key.center_offset_y.value if key.center_offset_y is not None else 0),
-            ) * ADAPTATION_RATE
+            current = displacement.value
+            last_release_point = Point(
+                current.x + dpi.px_to_cm(local_touch_pos.x() - key_widget_center.x()),# - (key.center_offset_x.value if key.center_offset_x is not None else 0),
+                current.y + dpi.px_to_cm(local_touch_pos.y() - key_widget_center.y()),# - (key.center_offset_y.value if key.center_offset_y is not None else 0),
+            )
+
+            estimate_x, estimate_y = estimator.estimate((current.x, current.y), (last_release_point.x, last_release_point.y))
+            return Point(estimate_x - current.x, estimate_y - current.y)
         
         displacement_this_stroke = Ref(Point(0, 0))
         
         @on_many(last_touch.change, last_touched_key_widget.change, displacement_active.change)
         def update_displacement_this_stroke():
             displacement_this_stroke.value = recompute_displacement_this_stroke()
-            emit_displacement_update()
+            update_table_displacement_this_stroke()
         
         displacement = Ref(Point(0, 0))
+
+
+        def proxy_linear_transform():
+            """The linear part (rotation, scale) of the proxy's device transform. Displacements are vectors, so the
+            translation does not apply to them."""
+            transform = proxy.deviceTransform(view.viewportTransform())
+            return transform.m11(), transform.m12(), transform.m21(), transform.m22()
         
 
         @on(avg_group_displacement.change)
         def on_stroke_reset():
             if current_stroke.value: return
 
-            proxy_transform = proxy.deviceTransform(view.viewportTransform())
-            proxy_inverse_transform = proxy_transform.inverted()[0]
-            local_avg_group_displacement_this_stroke = Point.from_qpointf(proxy_inverse_transform.map(avg_group_displacement_this_stroke.value.to_qpointf() + proxy_transform.map(QPointF(0, 0))))
-            local_avg_group_displacement = Point.from_qpointf(proxy_inverse_transform.map(avg_group_displacement.value.to_qpointf() + proxy_transform.map(QPointF(0, 0))))
+            # Moving the proxy only changes the translation of its transform, so the linear part is computed once and
+            # used for mapping both into and out of local coordinates
+            m11, m12, m21, m22 = proxy_linear_transform()
+            determinant = m11 * m22 - m21 * m12
+
+            def to_local(point: Point):
+                return Point(
+                    (m22 * point.x - m21 * point.y) / determinant,
+                    (m11 * point.y - m12 * point.x) / determinant,
+                )
+
+            local_avg_group_displacement_this_stroke = to_local(avg_group_displacement_this_stroke.value)
+            local_avg_group_displacement = to_local(avg_group_displacement.value)
             
             if tapped_in_current_stroke.value:
+                current = displacement.value
+                estimator.commit((current.x, current.y), (last_release_point.x, last_release_point.y))
+
                 new_displacement_centered = last_displacement.value + displacement_this_stroke.value - local_avg_group_displacement
                 displacement.value = local_avg_group_displacement + new_displacement_centered * MEAN_DEVIATION_FACTOR 
             else:
@@ -134,17 +171,22 @@ class KeyGroupWidget(QWidget):
             tapped_in_current_stroke.value = False
             displacement_this_stroke.value = Point(0, 0)
 
-            proxy_transform = proxy.deviceTransform(view.viewportTransform())
-            absolute_last_displacement = Point.from_qpointf(proxy_transform.map(last_displacement.value.to_qpointf()) - proxy_transform.map(QPointF(0, 0)))
-            self.last_displacement_change.emit(self, absolute_last_displacement)
+            local_last_displacement = last_displacement.value
+            adaptive_transform_table.set_last_displacement(table_slot, Point(
+                m11 * local_last_displacement.x + m21 * local_last_displacement.y,
+                m12 * local_last_displacement.x + m22 * local_last_displacement.y,
+            ))
     
-        def emit_displacement_update():
+        def update_table_displacement_this_stroke():
             if displacement_active.value:
-                proxy_transform = proxy.deviceTransform(view.viewportTransform())
-                absolute_displacement_this_stroke = Point.from_qpointf(proxy_transform.map(displacement_this_stroke.value.to_qpointf()) - proxy_transform.map(QPointF(0, 0)))
-                self.displacement_this_stroke_change.emit(self, absolute_displacement_this_stroke)
+                m11, m12, m21, m22 = proxy_linear_transform()
+                local_displacement_this_stroke = displacement_this_stroke.value
+                adaptive_transform_table.set_displacement_this_stroke(table_slot, Point(
+                    m11 * local_displacement_this_stroke.x + m21 * local_displacement_this_stroke.y,
+                    m12 * local_displacement_this_stroke.x + m22 * local_displacement_this_stroke.y,
+                ))
             else:
-                self.displacement_this_stroke_change.emit(self, None)
+                adaptive_transform_table.set_displacement_this_stroke(table_slot, None)
 
 
         def notify_touch_release(touch: QTouchEvent.TouchPoint, key_widget: KeyWidget):
@@ -161,14 +203,10 @@ class KeyGroupWidget(QWidget):
             displacement_this_stroke.value = Point(0, 0)
             tapped_in_current_stroke.value = False
             displacement.value = Point(0, 0)
-        self.reset_position = reset_position
-
 
-        def get_key_stroke(key: Key) -> Stroke:
-            try:
-                return Stroke.from_steno(key.steno)
-            except ValueError:
-                return empty_stroke()
+            adaptive_transform_table.clear_slot(table_slot)
+            estimator.reset()
+        self.reset_position = reset_position
 
 
         if group.organization.type == GroupOrganizationType.VERTICAL:
@@ -187,7 +225,7 @@ class KeyGroupWidget(QWidget):
                 for key in group.elements:
                     assert key.height is not None
 
-                    @child(widget, KeyWidget(get_key_stroke(key), key.label, touched_key_widgets=touched_key_widgets, current_stroke=current_stroke, dpi=dpi))
+                    @child(widget, KeyWidget(key_substroke(key.steno), key.label, touch_occupancy=touch_occupancy, current_stroke=current_stroke, dpi=dpi))
                     def render_widget(key_widget: KeyWidget, _: None):
                         key_widgets_to_keys[key_widget] = key
                         current_key = key
@@ -216,7 +254,7 @@ class KeyGroupWidget(QWidget):
                 for key in group.elements:
                     assert key.width is not None
 
-                    @child(widget, KeyWidget(get_key_stroke(key), key.label, touched_key_widgets=touched_key_widgets, current_stroke=current_stroke, dpi=dpi))
+                    @child(widget, KeyWidget(key_substroke(key.steno), key.label, touch_occupancy=touch_occupancy, current_stroke=current_stroke, dpi=dpi))
                     def render_widget(key_widget: KeyWidget, _: None):
                         key_widgets_to_keys[key_widget] = key
                         current_key = key
@@ -247,7 +285,7 @@ class KeyGroupWidget(QWidget):
                 bounding_rect_change_signals.extend(width.change for width in widths)
 
                 for key in group.elements:
-                    @child(widget, KeyWidget(get_key_stroke(key), key.label, touched_key_widgets=touched_key_widgets, current_stroke=current_stroke, dpi=dpi))
+                    @child(widget, KeyWidget(key_substroke(key.steno), key.label, touch_occupancy=touch_occupancy, current_stroke=current_stroke, dpi=dpi))
                     def render_widget(key_widget: KeyWidget, _: None):
                         row_start = key.grid_location[0]
                         col_start = key.grid_location[1]
@@ -265,7 +303,7 @@ class KeyGroupWidget(QWidget):
                 return ()
             
                     
-        self.__proxy = proxy = not_none(scene.addWidget(self))
+        self.__proxy = proxy = add_profiled_widget(scene, self, " ".join(key.steno for key in group.elements))
         items.append(proxy)
 
 
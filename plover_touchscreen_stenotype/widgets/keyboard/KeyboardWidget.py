@@ -1,6 +1,6 @@
-from collections import Counter
-from typing import Callable, Generator
+from typing import Callable
 from pathlib import Path
+import math
 
 
 from PyQt5.QtCore import (
@@ -11,6 +11,7 @@ from PyQt5.QtCore import (
     QRectF,
     QTimer,
     QPoint,
+    QElapsedTimer,
 )
 from PyQt5.QtWidgets import (
     QWidget,
@@ -23,6 +24,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtGui import (
     QTouchEvent,
+    QTransform,
 )
 
 from plover.steno import Stroke
@@ -33,10 +35,17 @@ from .KeyGroupWidget import KeyGroupWidget
 from .GroupObject import GroupObject
 from ..KeyWidget import KeyWidget
 from ..composables.UseDpi import UseDpi
+from ..composables.UseTouchRecording import UseTouchRecording
+from ..composables.UseGraphicsViewRendering import UseGraphicsViewRendering
 from ...settings import Settings
-from ...lib.reactivity import Ref, RefAttr, computed, on, watch
+from ...lib.reactivity import Ref, RefAttr, on, watch
 from ...lib.constants import GRAPHICS_VIEW_STYLE, KEY_GROUP_STYLESHEET
-from ...lib.util import empty_stroke, not_none, render, child
+from ...lib.util import empty_stroke, not_none, qt_round, render, child
+from ...lib.touch_point_buffer import TouchPointBuffer
+from ...lib.touch_occupancy import TouchOccupancy
+from ...lib.slide_filter import SlideFilter, SLIDE_DWELL_TIME, SLIDE_MAX_SPEED
+from ...lib.latency import latency_tracker, LatencyStage
+from ...lib.paint_profiler import ProfiledGraphicsView
 from ...lib.keyboard_layout.descriptors import KEYBOARD_LAYOUT_BUILDERS, DEFAULT_KEYBOARD_LAYOUT_NAME
 
 
@@ -61,103 +70,302 @@ class KeyboardWidget(QWidget):
 
         current_stroke = Ref(empty_stroke())
 
-        touches_to_key_widgets: dict[int, KeyWidget] = {} # keys of dict are from QTouchPoint::id
-        key_widget_touch_counter: Ref[Counter[KeyWidget]] = Ref(Counter())
-
-        touched_key_widgets = computed(lambda: set(key_widget_touch_counter.value.keys()),
-                key_widget_touch_counter)
+        touch_occupancy: TouchOccupancy[KeyWidget] = TouchOccupancy()
 
         self.num_bar_pressed = False
 
         self.settings = settings
 
+        self.manual_timers = False
+        """When set, timers are not started, and the timeouts they would have had run only when `fire_timers_due_by` is
+        called. Used to replay touch logs faster than they were recorded, while keeping the same results."""
+
+        recording = UseTouchRecording(self, settings)
+
         
         #region Touch handling
 
+        pending_touch_points: dict[int, QTouchEvent.TouchPoint] = {}
+        """Moved touch points, by touch id, whose processing is deferred to the next frame when touch updates are
+        coalesced. Only the latest position of each touch is kept."""
+
+        coalesce_timer = QTimer(self)
+        coalesce_timer.setSingleShot(True)
+
+        event_timestamp = 0
+        """Timestamp (ms) of the latest touch event, which deferred touch points are also processed with"""
+        event_clock = QElapsedTimer()
+        """Time since the latest touch event, for relating the time outside of touch events to event timestamps"""
+        event_clock.start()
+
+        coalesce_deadline: "int | None" = None
+        position_reset_deadline: "int | None" = None
+        """Event timestamps at which the coalesce and position reset timers time out, if they are running"""
+
         def handle_touch_event(event: QTouchEvent):
-            if event.type() in (QEvent.TouchUpdate, QEvent.TouchEnd):
-                for touch in event.touchPoints():
-                    if touch.state() != Qt.TouchPointReleased: continue
+            nonlocal event_timestamp
+            nonlocal coalesce_deadline
+            event_timestamp = event.timestamp()
+            event_clock.restart()
+
+            latency_tracker.begin_event(event_timestamp)
+
+            touch_points = event.touchPoints()
+            recording.record_event(event, touch_points)
+
+            if settings.coalesce_touch_updates and event.type() == QEvent.TouchUpdate and only_moved(touch_points):
+                for touch in touch_points:
+                    if touch.state() == Qt.TouchPointStationary: continue
+                    pending_touch_points[touch.id()] = touch
+
+                if coalesce_deadline is None:
+                    coalesce_deadline = event_timestamp + frame_interval()
+                    if not self.manual_timers:
+                        coalesce_timer.start(frame_interval())
+                return
+
+            # Presses and releases are applied immediately, after any movement that preceded them
+            process_pending_touch_points()
+            process_touch_points(event.type(), touch_points)
+        self.__handle_touch_event = handle_touch_event
+
+
+        def only_moved(touch_points: list[QTouchEvent.TouchPoint]):
+            return all(touch.state() in (Qt.TouchPointMoved, Qt.TouchPointStationary) for touch in touch_points)
+
+        def frame_interval():
+            screen = self.screen()
+            refresh_rate = screen.refreshRate() if screen is not None else 0
+            return round(1000 / refresh_rate) if refresh_rate > 0 else 16
+
+        @on(coalesce_timer.timeout)
+        def process_pending_touch_points():
+            nonlocal coalesce_deadline
+
+            coalesce_timer.stop()
+            coalesce_deadline = None
+            if len(pending_touch_points) == 0: return
+
+            touch_points = list(pending_touch_points.values())
+            pending_touch_points.clear()
+
+            process_touch_points(QEvent.TouchUpdate, touch_points)
+
+
+        # Reused across events to avoid allocating per touch point
+        touch_buffer = TouchPointBuffer()
+        new_key_widgets: list[KeyWidget] = []
 
-                    result = key_and_group_widgets_at(touch.pos().toPoint())
+        # Distances are in px and times in ms; the speed threshold is set from the screen DPI below
+        slide_filter: SlideFilter[KeyWidget] = SlideFilter(SLIDE_DWELL_TIME, SLIDE_MAX_SPEED)
+
+        def process_touch_points(event_type: int, touch_points: list[QTouchEvent.TouchPoint]):
+            nonlocal position_reset_deadline
+
+            touch_buffer.fill(touch_points)
+            update_container_inverse_transforms()
+
+            if event_type in (QEvent.TouchUpdate, QEvent.TouchEnd):
+                states, xs, ys = touch_buffer.states, touch_buffer.xs, touch_buffer.ys
+                for i in range(touch_buffer.count):
+                    if states[i] != Qt.TouchPointReleased: continue
+
+                    result = key_and_group_widgets_at(xs[i], ys[i])
                     if result is None: continue
                     key_widget, key_group_widget = result
 
-                    key_group_widget.notify_touch_release(touch, key_widget)
+                    key_group_widget.notify_touch_release(touch_points[i], key_widget)
 
             # Variables for detecting changes post-update
             had_num_bar = "#" in current_stroke.value
 
-            if event.type() in (QEvent.TouchBegin, QEvent.TouchUpdate):
-                old_stroke_length = len(current_stroke.value)
-
-                for key_widget in updated_key_widgets(event.touchPoints()):
-                    current_stroke.value = current_stroke.value + key_widget.substroke
+            if event_type in (QEvent.TouchBegin, QEvent.TouchUpdate):
+                update_key_widgets()
+                latency_tracker.record(LatencyStage.HIT_TEST)
 
-                if len(current_stroke.value) > old_stroke_length and current_stroke.value:
-                    self.current_stroke_change.emit(current_stroke.value)
+                if add_new_key_widgets_to_stroke():
+                    latency_tracker.record(LatencyStage.STROKE_ASSEMBLY)
                 if not had_num_bar and "#" in current_stroke.value:
                     self.num_bar_pressed = True
                 
                 position_reset_timer.stop()
+                position_reset_deadline = None
+
+            elif event_type == QEvent.TouchEnd:
+                if settings.slide_chording:
+                    # Keys that the last touches are lifted from may not have been added yet
+                    update_key_widgets()
+                    add_new_key_widgets_to_stroke()
 
-            elif event.type() == QEvent.TouchEnd:
                 # This also filters out empty strokes (Plover accepts them and will insert extra spaces)
 
-                touches_to_key_widgets.clear()
-                key_widget_touch_counter.value.clear()
-                key_widget_touch_counter.emit()
+                touch_occupancy.release_all()
+                slide_filter.clear()
+                dwell_timer.stop()
 
                 if current_stroke.value:
+                    recording.record_stroke(current_stroke.value)
+                    latency_tracker.begin_stroke()
                     self.end_stroke.emit(current_stroke.value)
                     current_stroke.value = empty_stroke()
                 
                 if had_num_bar:
                     self.num_bar_pressed = False
 
-                position_reset_timer.start(POSITION_RESET_TIMEOUT)
-        self.__handle_touch_event = handle_touch_event
+                position_reset_deadline = event_timestamp + POSITION_RESET_TIMEOUT
+                if not self.manual_timers:
+                    position_reset_timer.start(POSITION_RESET_TIMEOUT)
+
+
+        def add_new_key_widgets_to_stroke():
+            """Adds the keys in `new_key_widgets` to the current stroke.
 
+                :returns: Whether the stroke changed.
+            """
 
-        def updated_key_widgets(touch_points: list[QTouchEvent.TouchPoint]) -> Generator[KeyWidget, None, None]:
-            for touch in touch_points:
-                if touch.state() == Qt.TouchPointStationary: continue
+            old_stroke_length = len(current_stroke.value)
 
-                if touch.id() in touches_to_key_widgets:
-                    old_key_widget = touches_to_key_widgets[touch.id()]
-                    key_widget_touch_counter.value[old_key_widget] -= 1
-                    key_widget_touch_counter.emit()
+            for key_widget in new_key_widgets:
+                current_stroke.value = current_stroke.value + key_widget.substroke
 
-                    del touches_to_key_widgets[touch.id()]
+            if len(current_stroke.value) == old_stroke_length: return False
 
-                    if key_widget_touch_counter.value[old_key_widget] == 0:
-                        del key_widget_touch_counter.value[old_key_widget]
-                        key_widget_touch_counter.emit()
+            self.current_stroke_change.emit(current_stroke.value)
+            return True
 
 
-                result = key_and_group_widgets_at(touch.pos().toPoint())
-                if result is None: continue
+        def update_key_widgets():
+            """Updates which key widgets are touched from the touch points in `touch_buffer`, and collects the key
+            widgets that were newly added to the stroke into `new_key_widgets`."""
+
+            new_key_widgets.clear()
+            slide_chording = settings.slide_chording
+
+            ids, states, xs, ys = touch_buffer.ids, touch_buffer.states, touch_buffer.xs, touch_buffer.ys
+            for i in range(touch_buffer.count):
+                state = states[i]
+                if state == Qt.TouchPointStationary: continue
+                touch_id = ids[i]
+                released = state == Qt.TouchPointReleased
+
+                if slide_chording:
+                    update_sliding_key_widget(touch_id, released, xs[i], ys[i])
+                    continue
+
+                result = key_and_group_widgets_at(xs[i], ys[i]) if not released else None
+                if result is None:
+                    touch_occupancy.release(touch_id)
+                    continue
                 key_widget, key_group_widget = result
 
-                if touch.state() == Qt.TouchPointReleased: continue
+                old_key_widget = touch_occupancy.key_touched_by(touch_id)
+                if key_widget is old_key_widget: continue
 
+                recording.record_key(touch_id, key_widget.substroke)
+
+                # Checked before the touch is moved, since the key becomes matched once it is touched
                 if not key_widget.matched:
-                    yield key_widget
+                    new_key_widgets.append(key_widget)
+
+                touch_occupancy.touch(touch_id, key_widget.touch_ordinal)
+
+            if slide_chording:
+                start_dwell_timer()
+
+        def update_sliding_key_widget(touch_id: int, released: bool, x: float, y: float):
+            """Like the body of `update_key_widgets`, but only adds the key under the touch once `slide_filter`
+            commits it."""
 
-                touches_to_key_widgets[touch.id()] = key_widget
-                key_widget_touch_counter.value[key_widget] += 1
-                key_widget_touch_counter.emit()
+            result = key_and_group_widgets_at(x, y)
+            key_widget = result[0] if result is not None else None
+
+            committed = (
+                slide_filter.release(touch_id, key_widget)
+                    if released
+                    else slide_filter.update(touch_id, event_timestamp, x, y, key_widget)
+            )
+
+            if committed and key_widget is not None:
+                add_sliding_key_widget(touch_id, key_widget)
+
+            if released or not committed or key_widget is None:
+                touch_occupancy.release(touch_id)
+                return
+
+            touch_occupancy.touch(touch_id, key_widget.touch_ordinal)
+
+        def add_sliding_key_widget(touch_id: int, key_widget: KeyWidget):
+            """Collects a key committed by `slide_filter` into `new_key_widgets`, unless the touch already held it."""
+
+            if key_widget is touch_occupancy.key_touched_by(touch_id): return
+
+            recording.record_key(touch_id, key_widget.substroke)
+
+            # Checked before the touch is moved, since the key becomes matched once it is touched
+            if not key_widget.matched:
+                new_key_widgets.append(key_widget)
+
+
+        dwell_timer = QTimer(self)
+        dwell_timer.setSingleShot(True)
+
+        def start_dwell_timer():
+            """Schedules `commit_dwelled_key_widgets` for when a touch will have rested on its key for long enough,
+            since touchscreens may not report touches again until they move."""
+
+            deadline = slide_filter.next_deadline()
+            if deadline is None or self.manual_timers:
+                dwell_timer.stop()
+                return
+
+            dwell_timer.start(max(math.ceil(deadline - current_timestamp()), 0))
+
+        def current_timestamp():
+            return event_timestamp + event_clock.elapsed()
+
+        @on(dwell_timer.timeout)
+        def commit_dwelled_key_widgets():
+            commit_key_widgets_dwelled_by(current_timestamp())
+
+        def commit_key_widgets_dwelled_by(timestamp: float):
+            new_key_widgets.clear()
+
+            for touch_id, key_widget in slide_filter.expire(timestamp):
+                add_sliding_key_widget(touch_id, key_widget)
+                touch_occupancy.touch(touch_id, key_widget.touch_ordinal)
+
+            had_num_bar = "#" in current_stroke.value
+            add_new_key_widgets_to_stroke()
+            if not had_num_bar and "#" in current_stroke.value:
+                self.num_bar_pressed = True
+
+            start_dwell_timer()
 
 
         containers: list[KeyGroupWidget]
         group_objects: list[GroupObject]
         graphics_view: QGraphicsView
-        def key_and_group_widgets_at(point: QPoint) -> "tuple[KeyWidget, KeyGroupWidget] | None":
+
+        container_inverse_transforms: list[tuple[KeyGroupWidget, QTransform]] = []
+        """Maps from viewport to key group widget coordinates. Key groups move while adaptive layouts are in use, so
+        these are recomputed for every event, but only once rather than for every touch point"""
+
+        def update_container_inverse_transforms():
+            viewport_transform = graphics_view.viewportTransform()
+
+            container_inverse_transforms.clear()
             for key_group_widget in containers:
-                proxy_transform = key_group_widget.proxy.deviceTransform(graphics_view.viewportTransform())
-                widget_coords = proxy_transform.inverted()[0].map(point)
+                proxy_transform = key_group_widget.proxy.deviceTransform(viewport_transform)
+                container_inverse_transforms.append((key_group_widget, proxy_transform.inverted()[0]))
+
+        def key_and_group_widgets_at(x: float, y: float) -> "tuple[KeyWidget, KeyGroupWidget] | None":
+            # Positions are rounded to whole pixels before mapping, as `QPointF.toPoint` and `QTransform.map(QPoint)` did
+            x, y = qt_round(x), qt_round(y)
 
-                key_widget = key_group_widget.childAt(widget_coords)
+            for key_group_widget, inverse_transform in container_inverse_transforms:
+                widget_x, widget_y = inverse_transform.map(x, y)
+
+                key_widget = key_group_widget.childAt(qt_round(widget_x), qt_round(widget_y))
                 if key_widget is None: continue
 
                 if not isinstance(key_widget, KeyWidget):
@@ -171,24 +379,54 @@ class KeyboardWidget(QWidget):
         position_reset_timer = QTimer(self)
         @on(position_reset_timer.timeout)
         def reset_group_positions():
+            nonlocal position_reset_deadline
+
+            position_reset_timer.stop()
+            position_reset_deadline = None
+
             for container in containers:
                 container.reset_position()
 
             for group_object in group_objects:
                 group_object.reset_position()
+        self.__reset_group_positions = reset_group_positions
+
+
+        def fire_timers_due_by(timestamp: int):
+            while True:
+                dwell_deadline = slide_filter.next_deadline()
+                due_deadlines = [
+                    deadline
+                    for deadline in (coalesce_deadline, dwell_deadline, position_reset_deadline)
+                    if deadline is not None and deadline <= timestamp
+                ]
+                if len(due_deadlines) == 0: return
+
+                first_deadline = min(due_deadlines)
+                if first_deadline == coalesce_deadline:
+                    process_pending_touch_points()
+                elif first_deadline == dwell_deadline:
+                    commit_key_widgets_dwelled_by(first_deadline)
+                else:
+                    reset_group_positions()
+        self.__fire_timers_due_by = fire_timers_due_by
 
         #endregion
         
 
         dpi = UseDpi(self)
 
+        @watch(dpi.change, parent=self)
+        def set_slide_max_speed():
+            slide_filter.max_speed = dpi.cm(SLIDE_MAX_SPEED) / 1000
+
         #region Render
 
         @render(self, QGridLayout())
         def render_widget(widget: QWidget, _: QGridLayout):
             scene = QGraphicsScene(self)
 
-            @child(self, QGraphicsView(scene))
+            @child(self, ProfiledGraphicsView(scene))
             def render_widget(view: QGraphicsView, _: None):
                 nonlocal graphics_view
 
@@ -196,20 +434,26 @@ class KeyboardWidget(QWidget):
 
                 view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
                 view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+
+                rendering = UseGraphicsViewRendering(view, settings)
                 
-                @watch(settings.keyboard_layout_ref.change)
+                @watch(settings.keyboard_layout_ref.change, parent=self)
                 def set_keyboard_layout():
                     nonlocal containers
                     nonlocal group_objects
 
+                    # The old key widgets are destroyed with the scene
+                    touch_occupancy.clear_keys()
                     scene.clear()
 
                     build_layout_descriptor = KEYBOARD_LAYOUT_BUILDERS.get(settings.keyboard_layout) or KEYBOARD_LAYOUT_BUILDERS[DEFAULT_KEYBOARD_LAYOUT_NAME]
                     layout_descriptor = build_layout_descriptor(self.settings, self)
 
-                    group_object = GroupObject(layout_descriptor, scene, view, settings, current_stroke=current_stroke, touched_key_widgets=touched_key_widgets, dpi=dpi)
+                    group_object = GroupObject(layout_descriptor, scene, view, settings, current_stroke=current_stroke, touch_occupancy=touch_occupancy, dpi=dpi)
                     containers = group_object.key_group_widgets
                     group_objects = group_object.group_objects
+
+                    rendering.update_item_caching()
                     
                     rect = QRectF(group_object.item_group.boundingRect())
                     # rect = QRectF(view.rect())
@@ -262,4 +506,16 @@ class KeyboardWidget(QWidget):
             return super().event(event)
 
         self.__handle_touch_event(event)
-        return True
\ No newline at end of file
+        return True
+
+    def fire_timers_due_by(self, timestamp: int):
+        """Runs the timeouts of the timers that would have timed out by the event timestamp `timestamp`, in the
+        order they would have. Used with `manual_timers`."""
+
+        self.__fire_timers_due_by(timestamp)
+
+    def reset_positions(self):
+        """Moves the key groups back to their initial positions and clears the adaptive layout's estimates, as happens
+        after a pause in typing."""
+
+        self.__reset_group_positions()
\ No newline at end of file